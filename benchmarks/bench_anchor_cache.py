@@ -0,0 +1,40 @@
+# Measures the effect of the year anchor cache on methods.day_of_week(), for
+# dates skewed towards a few dozen years and for uniformly random dates,
+# along with the memory held by the cache in each case.
+#
+#   $ python benchmarks/bench_anchor_cache.py [DATES]
+import random, sys, tracemalloc
+from timeit import default_timer as timer
+from doomsday import methods
+# The same kinds of dates as the suite benchmarks the bulk paths with.
+from suite import skewed_dates, uniform_dates
+
+def throughput(dates):
+    day_of_week = methods.day_of_week
+    start = timer()
+    for year, month, day in dates:
+        day_of_week(year, month, day, False)
+    return len(dates) / (timer() - start)
+
+def main(n=500000, maxsize=methods.DEFAULT_ANCHOR_CACHE_SIZE // 4):
+    rng = random.Random(0)
+    for label, dates in [('skewed', skewed_dates(n, rng)), ('uniform', uniform_dates(n, rng))]:
+        methods.disable_anchor_cache()
+        uncached = throughput(dates)
+        cache = methods.enable_anchor_cache(maxsize)
+        cached = throughput(dates)
+        info = cache.info()
+        # A second pass under tracemalloc, which is too slow to time, shows
+        # the memory held by the cache once it's full.
+        tracemalloc.start()
+        methods.enable_anchor_cache(maxsize)
+        throughput(dates)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'{label:<8} uncached: {uncached:>10,.0f} dates/s   cached: {cached:>10,.0f} dates/s ({cached/uncached:.2f}x)')
+        print(f'{"":<8} hit rate: {info["hits"]/n:.1%}, {info["evictions"]} evictions, {info["size"]}/{info["maxsize"]} years, '
+              f'{current/1024:.0f} KiB held ({peak/1024:.0f} KiB peak)')
+    methods.disable_anchor_cache()
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
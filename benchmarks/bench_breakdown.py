@@ -0,0 +1,59 @@
+# Compares getting the terms of the Doomsday calculation and the day of the
+# week for many dates with the methods functions (doomscentury(), doomsyear(),
+# doomsmonth() and day_of_week() for each date) with results.breakdown(), and
+# with results.breakdown_array() filling arrays allocated once. Reports the
+# throughput of each, and the memory allocated per date (measured in a
+# second pass under tracemalloc, which is too slow to time).
+#
+#   $ python benchmarks/bench_breakdown.py [DATES]
+import datetime, random, sys, tracemalloc
+from timeit import default_timer as timer
+from doomsday import methods, results
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def separate_calls(dates):
+    return [ (methods.doomscentury(year), methods.doomsyear(year), methods.doomsmonth(year, month, day), methods.day_of_week(year, month, day))
+             for year, month, day in dates ]
+
+def breakdowns(dates):
+    return [ results.breakdown(year, month, day) for year, month, day in dates ]
+
+def best_time(function, repeat=3):
+    seconds = []
+    for i in range(repeat):
+        start = timer()
+        function()
+        seconds.append(timer() - start)
+    return min(seconds)
+
+def allocated(function):
+    tracemalloc.start()
+    result = function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+def report(label, n, seconds, memory, baseline=None):
+    current, peak = memory
+    speedup = '' if baseline is None else f' ({baseline/seconds:.1f}x)'
+    print(f'{label:<28} {n/seconds:>12,.0f} dates/s{speedup:<8} {current/n:7.1f} bytes/date held, {peak/n:7.1f} peak')
+
+def main(n=200000):
+    rng = random.Random(0)
+    dates = [ datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600)) for i in range(n) ]
+    dates = [ (date.year, date.month, date.day) for date in dates ]
+    assert [ tuple(b[:3]) + (str(b.weekday),) for b in breakdowns(dates[:1000]) ] == separate_calls(dates[:1000])
+    baseline = best_time(lambda: separate_calls(dates))
+    report('methods (4 calls per date)', n, baseline, allocated(lambda: separate_calls(dates)))
+    report('results.breakdown()', n, best_time(lambda: breakdowns(dates)), allocated(lambda: breakdowns(dates)), baseline)
+    np = methods._numpy()
+    if np is not None:
+        years, months, days = [ np.asarray(column, dtype=np.int64) for column in zip(*dates) ]
+        out = results.empty_breakdown_array(n)
+        seconds = best_time(lambda: results.breakdown_array(years, months, days, out=out))
+        # Only what's allocated on top of the arrays in out, which are reused.
+        report('results.breakdown_array()', n, seconds, allocated(lambda: results.breakdown_array(years, months, days, out=out)), baseline)
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,47 @@
+# Compares asking `doomsday coprocess` one question at a time, waiting for
+# each answer before asking the next as a script would, with running the
+# doomsday command line utility once per question.
+#
+#   $ python benchmarks/bench_coprocess.py [QUESTIONS [RUNS]]
+import datetime, random, subprocess, sys
+from timeit import default_timer as timer
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def questions(n):
+    rng = random.Random(0)
+    return [ ('dayofweek', datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600)).isoformat()) for i in range(n) ]
+
+def coprocess(asked, explain=False):
+    process = subprocess.Popen([sys.executable, '-m', 'doomsday', 'coprocess'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+    answers = []
+    start = timer()
+    for command, argument in asked:
+        process.stdin.write(f'{command} {argument}{" --explain" if explain else ""}\n')
+        process.stdin.flush()
+        if explain:
+            answer = ''.join(iter(process.stdout.readline, '\n'))
+        else:
+            answer = process.stdout.readline()
+        answers.append(answer)
+    elapsed = timer() - start
+    process.stdin.close()
+    process.wait()
+    return answers, elapsed
+
+def invocations(asked):
+    start = timer()
+    answers = [ subprocess.run([sys.executable, '-m', 'doomsday', command, argument], capture_output=True, text=True).stdout for command, argument in asked ]
+    return answers, timer() - start
+
+def main(n=1000, runs=20):
+    asked = questions(n)
+    answers, elapsed = coprocess(asked)
+    print(f'coprocess:           {elapsed/n*1e6:8.1f} us per question ({n} questions)')
+    explained, elapsed = coprocess(asked, explain=True)
+    print(f'coprocess --explain: {elapsed/n*1e6:8.1f} us per question ({n} questions)')
+    invoked, elapsed = invocations(asked[:runs])
+    assert invoked == answers[:runs]
+    print(f'one process each:    {elapsed/runs*1e6:8.1f} us per question ({runs} questions)')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
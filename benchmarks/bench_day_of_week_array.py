@@ -0,0 +1,43 @@
+# Compares the throughput of methods.day_of_week_array() with a Python loop
+# over the scalar methods.day_of_week(), in rows per second.
+#
+#   $ python benchmarks/bench_day_of_week_array.py [ROWS]
+import sys
+from timeit import default_timer as timer
+import numpy as np
+from doomsday import methods
+from doomsday.methods import EPOCH_ORDINAL, OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def random_dates(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ordinals = rng.integers(OCTOBER_15TH_1582, DECEMBER_31ST_2600 + 1, rows)
+    # datetime64 counts days from 1970-01-01, ordinals from 0001-01-01.
+    return (ordinals - EPOCH_ORDINAL).astype('datetime64[D]')
+
+# The years, months and days of datetime64 dates, by NumPy's own arithmetic.
+def split(dates):
+    starts = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    return years, starts.astype(np.int64) % 12 + 1, (dates - starts).astype(np.int64) + 1
+
+def main(rows=1000000):
+    dates = random_dates(rows)
+    years, months, days = split(dates)
+    scalar_rows = min(rows, 200000)
+    ys, ms, ds = years[:scalar_rows].tolist(), months[:scalar_rows].tolist(), days[:scalar_rows].tolist()
+    start = timer()
+    for y, m, d in zip(ys, ms, ds):
+        methods.day_of_week(y, m, d, name=False)
+    scalar = scalar_rows / (timer() - start)
+    start = timer()
+    methods.day_of_week_array(years, months, days)
+    vectorized = rows / (timer() - start)
+    start = timer()
+    methods.day_of_week_array(dates)
+    vectorized_datetime64 = rows / (timer() - start)
+    print(f'scalar loop:                    {scalar:>14,.0f} rows/s')
+    print(f'day_of_week_array (y, m, d):    {vectorized:>14,.0f} rows/s ({vectorized/scalar:.0f}x)')
+    print(f'day_of_week_array (datetime64): {vectorized_datetime64:>14,.0f} rows/s ({vectorized_datetime64/scalar:.0f}x)')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,37 @@
+# Compares the per-call cost of doomscentury() and doomsyear() with the
+# earlier versions that took the century and year of the century from the
+# digits of str(year) and used float division.
+#
+#   $ python benchmarks/bench_doomscentury_doomsyear.py
+import timeit
+from doomsday import methods
+
+def string_doomscentury(year):
+    thursday = 4
+    c = int(str(year)[0:2]) + 1
+    return int((((5 * c) + ((c - 1) / 4)) % 7) + thursday) % 7
+
+def string_doomsyear(year):
+    x = int(str(year)[2:])
+    if x % 2 == 1:
+        x = x + 11
+    x = x / 2
+    if x % 2 == 1:
+        x = x + 11
+    x = x % 7
+    return int((7 - x) % 7)
+
+def per_call(function, years, repeat=5):
+    seconds = min(timeit.repeat(lambda: [function(year) for year in years], number=1, repeat=repeat))
+    return seconds / len(years) * 1e9
+
+def main():
+    years = list(range(1582, 2601)) * 100
+    assert [string_doomscentury(y) for y in years] == [methods.doomscentury(y) for y in years]
+    assert [string_doomsyear(y) for y in years] == [methods.doomsyear(y) for y in years]
+    for name, old, new in [('doomscentury', string_doomscentury, methods.doomscentury), ('doomsyear', string_doomsyear, methods.doomsyear)]:
+        old_ns, new_ns = per_call(old, years), per_call(new, years)
+        print(f'{name:<13} string: {old_ns:6.0f} ns/call   integer: {new_ns:6.0f} ns/call   ({old_ns/new_ns:.1f}x)')
+
+if __name__ == '__main__':
+    main()
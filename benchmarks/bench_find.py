@@ -0,0 +1,39 @@
+# Compares query.find_dates() with a brute force scan over the same range,
+# for finding every Friday the 13th and every Sunday December 25th.
+#
+#   $ python benchmarks/bench_find.py [START_YEAR END_YEAR]
+import datetime, sys
+from timeit import default_timer as timer
+from doomsday import methods, query
+
+def scan_candidates(weekday, day, months, start_year, end_year):
+    return [ datetime.date(year, month, day) for year in range(start_year, end_year + 1) for month in months
+             if day <= query.MONTH_LENGTHS[month] + (month == 2 and methods.leapyear(year))
+             and methods.day_of_week(year, month, day, name=False) == weekday ]
+
+def scan_days(weekday, day, months, start_year, end_year):
+    first, last = datetime.date(start_year, 1, 1).toordinal(), datetime.date(end_year, 12, 31).toordinal()
+    dates = (datetime.date.fromordinal(ordinal) for ordinal in range(first, last + 1))
+    return [ date for date in dates if date.day == day and date.month in months
+             and methods.day_of_week(date.year, date.month, date.day, name=False) == weekday ]
+
+def timed(function, *args):
+    start = timer()
+    result = function(*args)
+    return result, timer() - start
+
+def main(start_year=1600, end_year=2600):
+    for label, weekday, day, months in [('Friday the 13th', 5, 13, range(1, 13)), ('Sunday, December 25th', 0, 25, [12])]:
+        query.cycle_matches.cache_clear()
+        found, cold = timed(lambda *args: list(query.find_dates(*args)), weekday, day, months, start_year, end_year)
+        again, warm = timed(lambda *args: list(query.find_dates(*args)), weekday, day, months, start_year, end_year)
+        candidates, candidate_time = timed(scan_candidates, weekday, day, months, start_year, end_year)
+        days, day_time = timed(scan_days, weekday, day, months, start_year, end_year)
+        assert found == again == candidates == days
+        print(f'{label}, {start_year}-{end_year}: {len(found)} dates')
+        print(f'  find_dates:              {cold*1000:8.2f} ms ({warm*1000:.2f} ms with the cycle cached)')
+        print(f'  scan of candidate dates: {candidate_time*1000:8.2f} ms')
+        print(f'  scan of every day:       {day_time*1000:8.2f} ms')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
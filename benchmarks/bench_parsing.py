@@ -0,0 +1,45 @@
+# Compares parsing lines of bulk input with strptime() (as bulk.parse_date()
+# does) with parsing.parse_date() on each line of bytes and with
+# parsing.parse_dates() on a whole buffer at once, and times the batch
+# pipeline (bulk.annotate()) on the same input as strs and as bytes.
+#
+#   $ python benchmarks/bench_parsing.py [LINES]
+import datetime, random, sys
+from timeit import default_timer as timer
+from doomsday import bulk, methods, parsing
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def timed(function, n, repeat=3):
+    seconds = []
+    for i in range(repeat):
+        start = timer()
+        result = function()
+        seconds.append(timer() - start)
+    return result, min(seconds) / n
+
+def main(n=200000):
+    rng = random.Random(0)
+    dates = [ datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600)) for i in range(n) ]
+    # A tenth of the lines have times, as the batch command accepts.
+    text = [ f'{date.isoformat()}T12:00:00\n' if i % 10 == 0 else f'{date.isoformat()}\n' for i, date in enumerate(dates) ]
+    lines = [ line.encode() for line in text ]
+    buffer = b''.join(lines)
+    expected = [ (date.year, date.month, date.day) for date in dates ]
+    strptime, strptime_time = timed(lambda: [ bulk.parse_date(line.strip()) for line in text ], n)
+    assert [ (date.year, date.month, date.day) for date in strptime ] == expected
+    scalar, scalar_time = timed(lambda: [ parsing.parse_date(line) for line in lines ], n)
+    assert scalar == expected
+    print(f'strptime():             {strptime_time*1e9:8.1f} ns per line')
+    print(f'parsing.parse_date():   {scalar_time*1e9:8.1f} ns per line ({strptime_time/scalar_time:.1f}x)')
+    if methods._numpy() is not None:
+        (years, months, days, valid), vector_time = timed(lambda: parsing.parse_dates(buffer), n)
+        assert valid.all() and list(zip(years.tolist(), months.tolist(), days.tolist())) == expected
+        print(f'parsing.parse_dates():  {vector_time*1e9:8.1f} ns per line ({strptime_time/vector_time:.1f}x)')
+    annotated_text, text_time = timed(lambda: list(bulk.annotate(text)), n)
+    annotated_bytes, bytes_time = timed(lambda: list(bulk.annotate(lines)), n)
+    assert annotated_text == annotated_bytes
+    print(f'bulk.annotate(), strs:  {text_time*1e9:8.1f} ns per line')
+    print(f'bulk.annotate(), bytes: {bytes_time*1e9:8.1f} ns per line ({text_time/bytes_time:.1f}x)')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,46 @@
+# Measures the start up time of the doomsday command line utility: the
+# cumulative import time of its modules as reported by `python -X importtime`,
+# and the wall time of a plain `doomsday dayofweek` via the fast path in
+# doomsday/__main__.py compared with the full click interface in doomsday.cli.
+#
+#   $ python benchmarks/bench_startup.py [RUNS]
+import subprocess, sys
+from timeit import default_timer as timer
+
+# Returns the cumulative import time, in milliseconds, of the modules
+# imported by code, as reported by -X importtime, excluding the modules
+# that the interpreter imports before running any code.
+def import_time(code):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True).stderr
+    baseline = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'], capture_output=True, text=True, check=True).stderr
+    def top_level(report):
+        total = {}
+        for line in report.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                self_us, cumulative_us, name = line[len('import time:'):].split('|')
+                if not name.startswith('  ') and cumulative_us.strip().isdigit():
+                    total[name.strip()] = int(cumulative_us)
+        return total
+    before = top_level(baseline)
+    return sum(us for name, us in top_level(stderr).items() if name not in before) / 1000
+
+def wall_time(args, runs):
+    times = []
+    for i in range(runs):
+        start = timer()
+        subprocess.run([sys.executable] + args, stdout=subprocess.DEVNULL, check=True)
+        times.append(timer() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+def main(runs=20):
+    print(f'import doomsday.cli:      {import_time("import doomsday.cli"):6.1f} ms')
+    print(f'import doomsday.__main__: {import_time("import doomsday.__main__"):6.1f} ms')
+    interpreter = wall_time(['-c', 'pass'], runs)
+    full = wall_time(['-m', 'doomsday.cli', 'dayofweek', '2024-01-01'], runs)
+    fast = wall_time(['-m', 'doomsday', 'dayofweek', '2024-01-01'], runs)
+    print(f'python -c pass:                               {interpreter:6.1f} ms (median of {runs})')
+    print(f'doomsday dayofweek 2024-01-01 (click):        {full:6.1f} ms')
+    print(f'doomsday dayofweek 2024-01-01 (fast path):    {fast:6.1f} ms ({full - fast:.1f} ms less)')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,95 @@
+# Load tests `doomsday serve` on localhost: a number of concurrent clients
+# each make requests over one kept-alive connection, first for single dates
+# and then for batches, and the throughput and latency percentiles seen by
+# the clients are reported, along with the server's own /stats. For
+# comparison, it also times running `doomsday dayofweek` once per date.
+#
+#   $ python benchmarks/loadtest_server.py [--port PORT] [--clients N] [--requests N] [--batch-size N]
+#
+# Unless --port is given, a server is started (and stopped) on a free port.
+import argparse, datetime, http.client, json, random, socket, subprocess, sys, threading, time
+from timeit import default_timer as timer
+from doomsday import history
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def random_dates(n, rng):
+    return [ datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600)).isoformat() for i in range(n) ]
+
+def client(port, requests, batch_size, seed, latencies):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(requests):
+        start = timer()
+        if batch_size:
+            connection.request('POST', '/batch', body=json.dumps(random_dates(batch_size, rng)))
+        else:
+            connection.request('GET', f'/dayofweek/{random_dates(1, rng)[0]}')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200
+        latencies.append(timer() - start)
+    connection.close()
+
+def load(port, clients, requests, batch_size):
+    latencies = []
+    threads = [ threading.Thread(target=client, args=(port, requests, batch_size, seed, latencies)) for seed in range(clients) ]
+    start = timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = timer() - start
+    latencies.sort()
+    dates = clients * requests * max(batch_size, 1)
+    label = f'batches of {batch_size}' if batch_size else 'single dates'
+    print(f'{label}: {clients} clients x {requests} requests in {elapsed:.2f}s, {clients*requests/elapsed:,.0f} requests/s, {dates/elapsed:,.0f} dates/s')
+    print('  latency: ' + ', '.join(f'p{p} {history.percentile(latencies, p)*1000:.2f} ms' for p in [ 50, 90, 99 ]))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'no server on port {port}')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, help="Port of an already running server.")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per client.")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=20, help="Number of `doomsday dayofweek` runs to time.")
+    args = parser.parse_args()
+    process = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        process = subprocess.Popen([sys.executable, '-m', 'doomsday', 'serve', '--port', str(port)], stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        load(port, args.clients, args.requests, 0)
+        load(port, args.clients, max(1, args.requests // 10), args.batch_size)
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('GET', '/stats')
+        print('server stats:', connection.getresponse().read().decode())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    dates = random_dates(args.processes, random.Random(0))
+    start = timer()
+    for date in dates:
+        subprocess.run([sys.executable, '-m', 'doomsday', 'dayofweek', date], capture_output=True, check=True)
+    elapsed = timer() - start
+    print(f'doomsday dayofweek per date: {args.processes} runs in {elapsed:.2f}s, {args.processes/elapsed:,.0f} dates/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Simulates practicing with `doomsday test`, drawing dates uniformly and with
+# the adaptive scheduler, and compares how many questions (and how much
+# practice time) it takes a simulated learner to reach a target speed.
+#
+# The learner takes a base time per question plus a time for each step of
+# the calculation, which depends on the century, the year of the century and
+# the month of the date, with a few values of each being much harder than the
+# rest. Each time a value is practiced its time shrinks, and the slower the
+# answer, the more likely it is to be wrong. The learner's speed is their
+# expected time for a question about a uniformly drawn date, i.e. the speed a
+# plain `doomsday test` measures.
+#
+#   $ python benchmarks/simulate_scheduler.py [TARGET_SECONDS [RUNS]]
+import collections, datetime, random, sys
+from doomsday import history
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+from doomsday.scheduler import Scheduler
+
+BASE_SECONDS = 2.0
+LEARNING_RATE = 0.1
+MAX_QUESTIONS = 20000
+
+# How often each value of each component comes up in uniformly drawn dates.
+def frequencies():
+    counts = { 'century': collections.Counter(), 'year_of_century': collections.Counter(), 'month': collections.Counter() }
+    for ordinal in range(OCTOBER_15TH_1582, DECEMBER_31ST_2600 + 1):
+        date = datetime.date.fromordinal(ordinal)
+        counts['century'][date.year // 100] += 1
+        counts['year_of_century'][date.year % 100] += 1
+        counts['month'][date.month] += 1
+    total = DECEMBER_31ST_2600 - OCTOBER_15TH_1582 + 1
+    return { component: { value: count / total for value, count in counter.items() } for component, counter in counts.items() }
+
+class Learner:
+    def __init__(self, rng, frequencies):
+        self.rng = rng
+        self.frequencies = frequencies
+        # Most values take a second; one in five takes several.
+        self.seconds = { component: { value: 1.0 + (rng.uniform(3.0, 8.0) if rng.random() < 0.2 else 0.0) for value in values }
+                         for component, values in frequencies.items() }
+
+    def components(self, date):
+        return { 'century': date.year // 100, 'year_of_century': date.year % 100, 'month': date.month }
+
+    def answer(self, date):
+        components = self.components(date)
+        latency = BASE_SECONDS + sum(self.seconds[component][value] for component, value in components.items())
+        latency *= self.rng.uniform(0.8, 1.2)
+        correct = self.rng.random() > min(0.9, latency / 40)
+        for component, value in components.items():
+            self.seconds[component][value] *= 1 - LEARNING_RATE
+        return latency, correct
+
+    def expected_latency(self):
+        return BASE_SECONDS + sum(sum(p * self.seconds[component][value] for value, p in values.items())
+                                  for component, values in self.frequencies.items())
+
+def simulate(seed, target, adaptive, frequencies):
+    rng = random.Random(seed)
+    learner = Learner(random.Random(seed), frequencies)
+    scheduler = Scheduler(rng=rng)
+    practice = 0.0
+    for question in range(1, MAX_QUESTIONS + 1):
+        if adaptive:
+            date = scheduler.next_date()
+        else:
+            date = datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600))
+        latency, correct = learner.answer(date)
+        practice += latency
+        if adaptive:
+            scheduler.record(history.answer(date, latency, correct, 0, 0.0))
+        if learner.expected_latency() <= target:
+            return question, practice
+    return MAX_QUESTIONS, practice
+
+def main(target=4.0, runs=10):
+    runs = int(runs)
+    freqs = frequencies()
+    print(f'Questions (and practice time) until the expected time per question is {target:.1f}s, over {runs} learners:')
+    for label, adaptive in [('uniform', False), ('adaptive', True)]:
+        results = [ simulate(seed, target, adaptive, freqs) for seed in range(runs) ]
+        questions = sum(question for question, practice in results) / runs
+        practice = sum(practice for question, practice in results) / runs
+        print(f'  {label:<9} {questions:8.0f} questions, {practice/3600:6.2f} hours')
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,164 @@
+# Benchmark suite for the doomsday package, covering the scalar functions in
+# doomsday.methods, the explain_* walkthroughs, the cold start of the CLI,
+# and the bulk paths on uniformly distributed and skewed dates. Every result
+# is a time per operation (lower is better), and results are written as JSON
+# so that runs can be compared, with regressions against a baseline flagged.
+#
+#   $ python benchmarks/suite.py --output results.json
+#   $ python benchmarks/suite.py --baseline results.json [--threshold 0.15]
+#
+# With --baseline, the exit status is 1 if any benchmark is slower than its
+# baseline by more than the threshold.
+import argparse, contextlib, datetime, io, json, os, platform, random, subprocess, sys, tempfile, timeit
+from timeit import default_timer as timer
+from doomsday import bulk, cli, explanations, methods, table
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def uniform_dates(n, rng):
+    dates = (datetime.date.fromordinal(rng.randint(methods.OCTOBER_15TH_1582, methods.DECEMBER_31ST_2600)) for i in range(n))
+    return [(d.year, d.month, d.day) for d in dates]
+
+# 99% of the dates fall in a few dozen years, as in our event logs.
+def skewed_dates(n, rng, years=36):
+    hot_years = rng.sample(range(1583, 2601), years)
+    dates = []
+    for i in range(n):
+        year = rng.choice(hot_years) if rng.random() < 0.99 else rng.randint(1583, 2600)
+        date = datetime.date(year, 1, 1) + datetime.timedelta(days=rng.randrange(365))
+        dates.append((date.year, date.month, date.day))
+    return dates
+
+# The best time per operation over several repeats of calling function,
+# which handles ops operations per call.
+def best_time(function, ops, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat)) / ops
+
+def bench_scalar(results, dates, repeat):
+    years = [year for year, month, day in dates]
+    calls = {
+        'leapyear': lambda: [methods.leapyear(y) for y in years],
+        'doomscentury': lambda: [methods.doomscentury(y) for y in years],
+        'doomsyear': lambda: [methods.doomsyear(y) for y in years],
+        'doomsmonth': lambda: [methods.doomsmonth(y, m, d) for y, m, d in dates],
+        'day_of_week': lambda: [methods.day_of_week(y, m, d) for y, m, d in dates],
+    }
+    for name, function in calls.items():
+        results[f'methods.{name}'] = best_time(function, len(dates), repeat)
+
+def bench_explain(results, dates, repeat):
+    dates = dates[:1000]
+    calls = {
+        'explain_leapyear': lambda y, m, d: cli.explain_leapyear(y),
+        'explain_doomscentury': lambda y, m, d: cli.explain_doomscentury(y),
+        'explain_doomsyear': lambda y, m, d: cli.explain_doomsyear(y),
+        'explain_doomsmonth': cli.explain_doomsmonth,
+        'explain_day_of_week': cli.explain_day_of_week,
+    }
+    for name, explain in calls.items():
+        def render():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for y, m, d in dates:
+                    explain(y, m, d)
+        results[f'cli.{name}'] = best_time(render, len(dates), repeat)
+    for format in explanations.RENDERERS:
+        results[f'explanations.explain_many.{format}'] = best_time(lambda: list(explanations.explain_many(dates, format)), len(dates), repeat)
+
+def bench_cold_start(results, repeat):
+    commands = {
+        'dayofweek': ['doomsday', 'dayofweek', '2024-01-01'],
+        'dayofweek_click': ['doomsday.cli', 'dayofweek', '2024-01-01'],
+        'dayofweek_explain': ['doomsday', 'dayofweek', '2024-01-01', '--explain'],
+        'help': ['doomsday', '--help'],
+    }
+    for name, args in commands.items():
+        command = [sys.executable, '-m'] + args
+        def run():
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        results[f'startup.{name}'] = best_time(run, 1, repeat)
+
+def bench_bulk(results, label, dates, repeat):
+    results[f'bulk.{label}.day_of_week'] = best_time(lambda: [methods.day_of_week(y, m, d) for y, m, d in dates], len(dates), repeat)
+    methods.enable_anchor_cache()
+    results[f'bulk.{label}.day_of_week_anchor_cache'] = best_time(lambda: [methods.day_of_week(y, m, d) for y, m, d in dates], len(dates), repeat)
+    methods.disable_anchor_cache()
+    lines = [f'{y:04d}-{m:02d}-{d:02d}\n' for y, m, d in dates]
+    for name, use_table in [('annotate', False), ('annotate_table', True)]:
+        results[f'bulk.{label}.{name}'] = best_time(lambda: list(bulk.annotate(lines, use_table=use_table)), len(lines), repeat)
+    byte_lines = [line.encode() for line in lines]
+    results[f'bulk.{label}.annotate_bytes'] = best_time(lambda: list(bulk.annotate(byte_lines)), len(byte_lines), repeat)
+    weekdays = table.default_table()
+    ordinals = [datetime.date(y, m, d).toordinal() for y, m, d in dates]
+    results[f'bulk.{label}.table_lookup'] = best_time(lambda: [weekdays.day_of_week_ordinal(o) for o in ordinals], len(ordinals), repeat)
+    if np is not None:
+        years, months, days = (np.array(column) for column in zip(*dates))
+        results[f'bulk.{label}.day_of_week_array'] = best_time(lambda: methods.day_of_week_array(years, months, days), len(dates), repeat)
+
+def run(scale, repeat):
+    rng = random.Random(0)
+    n = int(100000 * scale)
+    uniform, skewed = uniform_dates(n, rng), skewed_dates(n, rng)
+    results = {}
+    bench_scalar(results, uniform, repeat)
+    bench_explain(results, uniform, repeat)
+    bench_cold_start(results, repeat)
+    # Build the weekday table in a scratch directory rather than the user's cache.
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.setdefault('DOOMSDAY_CACHE_DIR', workdir)
+        for label, dates in [('uniform', uniform), ('skewed', skewed)]:
+            bench_bulk(results, label, dates, repeat)
+    return results
+
+# Returns the benchmarks that are slower than in the baseline by more than
+# the threshold, as (name, baseline, result) triples.
+def regressions(results, baseline, threshold):
+    return [ (name, baseline[name], value) for name, value in results.items()
+             if name in baseline and value > baseline[name] * (1 + threshold) ]
+
+def format_time(seconds):
+    for unit, scale in [('s', 1), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= scale:
+            return f'{seconds/scale:8.2f} {unit}'
+    return f'{seconds/1e-9:8.1f} ns'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the doomsday package.')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare the results with those in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.15, help='relative slowdown counted as a regression (default: 0.15)')
+    parser.add_argument('--scale', type=float, default=1.0, help='scale the number of dates benchmarked (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repeats, of which the best is kept (default: 5)')
+    args = parser.parse_args(argv)
+    start = timer()
+    results = run(args.scale, args.repeat)
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__ if np is not None else None,
+        'scale': args.scale,
+        'unit': 'seconds per operation',
+        'results': results,
+    }
+    for name, value in results.items():
+        print(f'{name:<45} {format_time(value)}/op')
+    print(f'\n{len(results)} benchmarks in {timer() - start:.1f}s.')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        slower = regressions(results, baseline, args.threshold)
+        for name, before, after in slower:
+            print(f'REGRESSION {name}: {format_time(before)} -> {format_time(after)} ({after/before - 1:+.0%})')
+        if slower:
+            return 1
+        print(f'No regressions against {args.baseline}.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
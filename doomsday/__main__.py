@@ -0,0 +1,73 @@
+import datetime, os, sys
+from time import perf_counter, process_time
+from . import methods
+
+# The entry point of the doomsday command line utility. Scripts often invoke
+# it once per date, so for the plain compute commands (e.g. `doomsday
+# dayofweek 2024-01-01`) we answer directly, without importing click or
+# building the command group. Anything else, including invalid arguments
+# (so that the usual error messages are given), is handed to doomsday.cli,
+# as is everything when profiling, which also times importing it.
+
+# Parses text in one of the formats accepted by click.DateTime(), i.e.
+# %Y-%m-%d, %Y-%m-%dT%H:%M:%S or %Y-%m-%d %H:%M:%S, with two-digit months,
+# days and times, returning (year, month, day), or None if it can't.
+def _parse_date(text):
+    if len(text) == 19:
+        if text[10] not in 'T ' or text[13] != ':' or text[16] != ':':
+            return None
+        time = text[11:13] + text[14:16] + text[17:19]
+        if not (time.isascii() and time.isdigit()) or int(time[0:2]) > 23 or int(time[2:4]) > 59 or int(time[4:6]) > 59:
+            return None
+    elif len(text) != 10:
+        return None
+    digits = text[0:4] + text[5:7] + text[8:10]
+    if text[4] != '-' or text[7] != '-' or not (digits.isascii() and digits.isdigit()):
+        return None
+    year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+    try:
+        datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return year, month, day
+
+# Returns the output of a plain compute command, or None if the command or
+# its argument needs the full command line interface.
+def _compute(command, argument):
+    if command in ('leapyear', 'doomscentury', 'doomsyear'):
+        if not (argument.isascii() and argument.isdigit()):
+            return None
+        year = int(argument)
+        if year < methods.MIN_YEAR or year > methods.MAX_YEAR:
+            return None
+        return str(getattr(methods, command)(year))
+    date = _parse_date(argument)
+    if date is None:
+        return None
+    elif command == 'doomsmonth':
+        return str(methods.doomsmonth(*date))
+    else:
+        return methods.day_of_week(*date)
+
+FAST_COMMANDS = ('leapyear', 'doomscentury', 'doomsyear', 'doomsmonth', 'dayofweek')
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    profile = os.environ.get('DOOMSDAY_PROFILE') or os.environ.get('DOOMSDAY_PROFILE_OUTPUT') or '--profile' in argv or any(arg.startswith('--profile-output') for arg in argv)
+    if len(argv) == 2 and argv[0] in FAST_COMMANDS and not profile:
+        output = _compute(*argv)
+        if output is not None:
+            sys.stdout.write(output + '\n')
+            return 0
+    if profile:
+        wall, cpu = perf_counter(), process_time()
+        from .cli import cli
+        from . import profiling
+        profiling.record_import(perf_counter() - wall, process_time() - cpu)
+    else:
+        from .cli import cli
+    return cli.main(args=argv, prog_name='doomsday')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import collections, datetime, itertools, os
+from timeit import default_timer as timer
+from . import engines, methods, parsing, profiling, regions, table
+
+# The date formats accepted on each line of bulk input, which are the same
+# formats that click.DateTime() accepts for the dayofweek command.
+DATE_FORMATS = [ '%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S' ]
+
+# The number of lines read, computed and written at a time, which bounds
+# the memory used by the pipeline regardless of the size of the input.
+DEFAULT_CHUNK_SIZE = 10000
+
+# Returns the date given by text in one of DATE_FORMATS, or None if text
+# isn't a valid date.
+def parse_date(text):
+    for format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, format).date()
+        except ValueError:
+            pass
+    return None
+
+# Splits an iterable of lines into lists of at most size lines, yielding
+# each list along with the (1-based) line number of its first line.
+def chunks(lines, size=DEFAULT_CHUNK_SIZE):
+    lines = iter(lines)
+    start = 1
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+# Returns a line of input (a str, or bytes read from a binary file) as a
+# str without surrounding whitespace.
+def _text(line):
+    if isinstance(line, str):
+        return line.strip()
+    return bytes(line).decode('utf-8', 'replace').strip()
+
+# Returns (year, month, day) for a line of input (a str or bytes), or None
+# if it isn't a valid date. Lines are parsed with parsing.parse_date(), with
+# February 29th valid in the years that leapyear says are leap years, and
+# only given to parse_date() (i.e. strptime()) if that rejects them.
+def parse_line(line, leapyear=methods.leapyear):
+    date = parsing.parse_date(line.encode() if isinstance(line, str) else line, leapyear)
+    if date is not None:
+        return date
+    date = parse_date(_text(line))
+    return None if date is None else (date.year, date.month, date.day)
+
+# Splits a line of input for a region (see regions.py) into its date and the
+# code of its region, which is the region given after the date, separated by
+# whitespace (e.g. '1752-09-02 GB'), if there is one, or default otherwise.
+def split_region(line, default):
+    text = _text(line)
+    parts = text.rsplit(None, 1)
+    if len(parts) == 2 and parts[1].isalpha():
+        return parts[0], parts[1]
+    return text, default
+
+# Calculates the day of the week for each line in a chunk. Returns the list
+# of results, with None in place of the result for a line that isn't a valid
+# date, and a list of (line number, line) pairs for those invalid lines.
+# With use_table, days of the week are looked up in table.default_table()
+# rather than calculated, and dates outside of the table count as invalid.
+# With engine, the name of one of engines.ENGINES, days of the week are
+# calculated by that engine rather than by methods.day_of_week(). Lines may
+# be strs or bytes; chunks of bytes are parsed and calculated as a whole
+# with NumPy, if it's installed, with the anchor cache (if it's on) looking
+# up each distinct year in the chunk once. With region, the code of one of
+# regions.REGIONS, the lines are dates as written there, or in the region
+# given after the date (see split_region()), and each is calculated in the
+# calendar in use there at the time.
+def annotate_chunk(start, lines, name=True, use_table=False, engine=None, region=None):
+    if region is not None:
+        return _annotate_regions(start, lines, name, region)
+    if lines and not isinstance(lines[0], str) and methods._numpy() is not None:
+        return _annotate_buffer(start, lines, name, use_table, engine)
+    weekdays = table.default_table() if use_table else None
+    engine_day_of_week = engines.get(engine).day_of_week if engine else None
+    results = []
+    errors = []
+    for line_number, line in enumerate(lines, start):
+        date = parse_line(line)
+        try:
+            if date is None:
+                raise ValueError(line)
+            elif weekdays is not None:
+                dow = weekdays.day_of_week_ordinal(datetime.date(*date).toordinal())
+            elif engine_day_of_week is not None:
+                dow = engine_day_of_week(*date)
+            else:
+                dow = methods.day_of_week(*date, name=False)
+        except ValueError:
+            results.append(None)
+            errors.append((line_number, _text(line)))
+        else:
+            results.append(methods.DAYS_OF_THE_WEEK_NAMES[dow] if name else str(dow))
+    return results, errors
+
+# Returns a line of bytes (or a bytearray or memoryview) as bytes ending in a newline.
+def _terminated(line):
+    line = bytes(line)
+    return line if line.endswith(b'\n') else line + b'\n'
+
+# annotate_chunk() for a chunk of lines of bytes, parsing the whole chunk
+# with parsing.parse_dates() and calculating the days of the week with the
+# array functions.
+def _annotate_buffer(start, lines, name, use_table, engine):
+    np = methods._numpy()
+    buffer = b''.join(map(_terminated, lines))
+    years, months, days, valid = parsing.parse_dates(buffer)
+    for index in np.flatnonzero(~valid).tolist():
+        date = parse_date(_text(lines[index]))
+        if date is not None:
+            years[index], months[index], days[index], valid[index] = date.year, date.month, date.day, True
+    dows = np.zeros(len(lines), dtype=np.uint8)
+    if use_table or engine == 'table':
+        weekdays = table.default_table()
+        index = engines.epoch_days(np, years, months, days) + methods.EPOCH_ORDINAL - weekdays.first
+        valid &= (index >= 0) & (index < len(weekdays))
+        dows[valid] = np.frombuffer(weekdays.data, dtype=np.uint8)[index[valid]]
+    else:
+        if engine:
+            day_of_week_array = engines.get(engine, 'batch').day_of_week_array
+        elif methods.anchor_cache is not None:
+            day_of_week_array = methods.anchor_cache.day_of_week_array
+        else:
+            day_of_week_array = methods.day_of_week_array
+        dows[valid] = day_of_week_array(years[valid], months[valid], days[valid])
+    labels = methods.DAYS_OF_THE_WEEK_NAMES if name else [ str(dow) for dow in range(7) ]
+    results = [ labels[dow] if ok else None for dow, ok in zip(dows.tolist(), valid.tolist()) ]
+    errors = [ (start + index, _text(lines[index])) for index in np.flatnonzero(~valid).tolist() ]
+    return results, errors
+
+# annotate_chunk() for lines of dates in regions. Dates are parsed allowing
+# February 29th in every fourth year, as in the Julian calendar, and then
+# checked against the calendar of their region. With NumPy, the whole chunk
+# is parsed and calculated at once.
+def _annotate_regions(start, lines, name, region):
+    # Splitting the lines as they are (str or bytes) is the bulk of the work
+    # with NumPy, so it's done with as few steps per line as we can manage.
+    if lines and not isinstance(lines[0], (str, bytes)):
+        lines = [ bytes(line) for line in lines ]
+    parts = [ line.rsplit(None, 1) for line in lines ]
+    tagged = [ len(part) == 2 and part[1].isalpha() for part in parts ]
+    texts = [ part[0] if tag else line.strip() for line, part, tag in zip(lines, parts, tagged) ]
+    codes = [ part[1] if tag else region for part, tag in zip(parts, tagged) ]
+    if lines and not isinstance(lines[0], str):
+        decoded = { code: code.decode() for code in set(codes) if not isinstance(code, str) }
+        codes = [ decoded.get(code, code) for code in codes ]
+    np = methods._numpy()
+    if np is not None:
+        buffer = b''.join(text + b'\n' for text in texts) if lines and not isinstance(lines[0], str) else ''.join(text + '\n' for text in texts).encode()
+        years, months, days, valid = parsing.parse_dates(buffer, methods.julian_leapyear_array)
+        for index in np.flatnonzero(~valid).tolist():
+            date = parse_date(_text(texts[index]))
+            if date is not None:
+                years[index], months[index], days[index] = date.year, date.month, date.day
+        dows, _, valid = regions.day_of_week_array(codes, years, months, days)
+        dows, valid = dows.tolist(), valid.tolist()
+    else:
+        dows, valid = [], []
+        for text, code in zip(texts, codes):
+            date = parse_line(text, methods.julian_leapyear)
+            try:
+                if date is None:
+                    raise ValueError(text)
+                dows.append(regions.day_of_week(code, *date, name=False))
+                valid.append(True)
+            except ValueError:
+                dows.append(0)
+                valid.append(False)
+    labels = methods.DAYS_OF_THE_WEEK_NAMES if name else [ str(dow) for dow in range(7) ]
+    results = [ labels[dow] if ok else None for dow, ok in zip(dows, valid) ]
+    errors = [ (line_number, _text(line)) for line_number, (line, ok) in enumerate(zip(lines, valid), start) if not ok ]
+    return results, errors
+
+# Runs annotate_chunk(), also returning the process that ran it along with
+# the number of lines it handled and how long that took.
+def _timed_annotate_chunk(start, lines, name, use_table, engine, region=None):
+    begin = timer()
+    results, errors = annotate_chunk(start, lines, name, use_table, engine, region)
+    return results, errors, os.getpid(), len(lines), timer() - begin
+
+# Adds the lines and time taken for a chunk to the per-process totals in stats.
+def _record(stats, pid, lines, seconds):
+    if stats is not None:
+        total_lines, total_seconds = stats.get(pid, (0, 0.0))
+        stats[pid] = (total_lines + lines, total_seconds + seconds)
+
+# Sets up a worker process to match the main process.
+def _initialize_worker(anchor_cache_size):
+    if anchor_cache_size:
+        methods.enable_anchor_cache(anchor_cache_size)
+
+# Lazily calculates the day of the week for each line of an iterable of
+# lines, e.g. an open file, yielding the output of annotate_chunk() for
+# each chunk of the input in turn. With more than one worker, chunks are
+# farmed out to a pool of processes, and at most max_pending chunks (by
+# default twice the number of workers) are read ahead of the chunk being
+# yielded, so a fast reader can't buffer the whole input. Results are still
+# yielded in input order. If a stats dict is given, it is filled in with the
+# total (lines, seconds) spent computing for each process id.
+def annotate(lines, chunk_size=DEFAULT_CHUNK_SIZE, name=True, workers=1, max_pending=None, stats=None, use_table=False, engine=None, region=None):
+    if workers <= 1:
+        for start, chunk in chunks(lines, chunk_size):
+            with profiling.phase('compute'):
+                results, errors, pid, count, seconds = _timed_annotate_chunk(start, chunk, name, use_table, engine, region)
+            _record(stats, pid, count, seconds)
+            yield results, errors
+        return
+    # Imported here since it's relatively slow to import and only needed with workers.
+    from concurrent.futures import ProcessPoolExecutor
+    if max_pending is None:
+        max_pending = 2 * workers
+    anchor_cache_size = methods.anchor_cache.maxsize if methods.anchor_cache is not None else 0
+    with ProcessPoolExecutor(workers, initializer=_initialize_worker, initargs=(anchor_cache_size,)) as executor:
+        pending = collections.deque()
+        for start, chunk in chunks(lines, chunk_size):
+            if len(pending) >= max_pending:
+                with profiling.phase('compute'):
+                    results, errors, pid, count, seconds = pending.popleft().result()
+                _record(stats, pid, count, seconds)
+                yield results, errors
+            pending.append(executor.submit(_timed_annotate_chunk, start, chunk, name, use_table, engine, region))
+        while pending:
+            with profiling.phase('compute'):
+                results, errors, pid, count, seconds = pending.popleft().result()
+            _record(stats, pid, count, seconds)
+            yield results, errors
@@ -0,0 +1,153 @@
+import bisect, datetime
+from . import methods
+
+# Counting business days (Monday to Friday, less any holidays) and stepping
+# a number of business days from a date, in constant time rather than day by
+# day: every 7 days hold exactly 5 business days, so only the days left over
+# after the whole weeks need looking at, and those are fixed by the day of
+# the week of the first date, which we get from the Doomsday rule. Holidays
+# are kept sorted, so the number falling in a range is found by bisection.
+# The semantics follow numpy.busday_count() and numpy.busday_offset() (with
+# roll='forward'), which the array versions are tested against.
+
+BUSINESS_DAYS = frozenset([ 1, 2, 3, 4, 5 ])
+
+# LEADING_BUSINESS_DAYS[w][k] is the number of business days among the k
+# consecutive days (k < 7) starting on day of the week w.
+LEADING_BUSINESS_DAYS = [ [ sum(1 for i in range(k) if (w + i) % 7 in BUSINESS_DAYS) for k in range(7) ] for w in range(7) ]
+
+# A sorted collection of the holidays that fall on business days (holidays
+# at weekends don't change any counts), stored as ordinals.
+class Holidays:
+    def __init__(self, dates=()):
+        ordinals = set()
+        for date in dates:
+            if methods.day_of_week(date.year, date.month, date.day, name=False) in BUSINESS_DAYS:
+                ordinals.add(date.toordinal())
+        self.ordinals = sorted(ordinals)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __contains__(self, ordinal):
+        index = bisect.bisect_left(self.ordinals, ordinal)
+        return index < len(self.ordinals) and self.ordinals[index] == ordinal
+
+    # The number of holidays with ordinals from first up to, but not including, last.
+    def count(self, first, last):
+        return bisect.bisect_left(self.ordinals, last) - bisect.bisect_left(self.ordinals, first)
+
+# Returns holidays as a Holidays, so functions can take any iterable of dates.
+def _holidays(holidays):
+    if holidays is None or isinstance(holidays, Holidays):
+        return holidays
+    return Holidays(holidays)
+
+# Returns the number of business days from start up to, but not including,
+# end. If end is before start, returns minus the number of business days
+# after end up to and including start.
+def count_business_days(start, end, holidays=None):
+    if end < start:
+        day = datetime.timedelta(days=1)
+        return -count_business_days(end + day, start + day, holidays)
+    holidays = _holidays(holidays)
+    days = end.toordinal() - start.toordinal()
+    dow = methods.day_of_week(start.year, start.month, start.day, name=False)
+    count = days // 7 * 5 + LEADING_BUSINESS_DAYS[dow][days % 7]
+    if holidays:
+        count -= holidays.count(start.toordinal(), end.toordinal())
+    return count
+
+# Returns the weekday that is n weekdays (Monday to Friday) from the weekday
+# with the given ordinal and day of the week, ignoring holidays.
+def _add_weekdays(ordinal, dow, n):
+    weeks, weekday = divmod(dow - 1 + n, 5)
+    return ordinal - (dow - 1) + 7 * weeks + weekday
+
+# Returns the date that is n (possibly negative) business days after date.
+# If date isn't itself a business day, we count from the next one. Each
+# holiday passed over pushes the result one more business day on, and as
+# those business days might pass over more holidays, we repeat until none
+# are left, which takes one bisection per round.
+def add_business_days(date, n, holidays=None):
+    holidays = _holidays(holidays)
+    ordinal = date.toordinal()
+    dow = methods.day_of_week(date.year, date.month, date.day, name=False)
+    while dow not in BUSINESS_DAYS or (holidays and ordinal in holidays):
+        ordinal += 1
+        dow = (dow + 1) % 7
+    while True:
+        target = _add_weekdays(ordinal, dow, n)
+        if not holidays:
+            break
+        if n >= 0:
+            skipped = holidays.count(ordinal + 1, target + 1)
+        else:
+            skipped = -holidays.count(target, ordinal)
+        if skipped == 0:
+            break
+        dow = (dow + target - ordinal) % 7
+        ordinal, n = target, skipped
+    return datetime.date.fromordinal(target)
+
+# Returns a sorted int64 array of the days (since 1970-01-01) of the
+# holidays that fall on business days.
+def _holiday_days(np, holidays):
+    if isinstance(holidays, Holidays):
+        return np.array(holidays.ordinals, dtype=np.int64) - methods.EPOCH_ORDINAL
+    days = np.unique(np.asarray(holidays, dtype='datetime64[D]').astype(np.int64))
+    dows = methods.day_of_week_array(days.astype('datetime64[D]'))
+    return days[(dows >= 1) & (dows <= 5)]
+
+# Whole-array version of count_business_days(), for arrays of start and
+# end dates (anything convertible to datetime64[D]).
+def count_business_days_array(starts, ends, holidays=None):
+    np = methods._require_numpy()
+    starts = np.asarray(starts, dtype='datetime64[D]')
+    ends = np.asarray(ends, dtype='datetime64[D]')
+    backwards = ends < starts
+    sign = np.where(backwards, -1, 1)
+    first = np.where(backwards, ends + 1, starts)
+    last = np.where(backwards, starts + 1, ends)
+    days = (last - first).astype(np.int64)
+    dows = methods.day_of_week_array(first)
+    counts = days // 7 * 5 + np.asarray(LEADING_BUSINESS_DAYS)[dows, days % 7]
+    if holidays is not None:
+        holiday_days = _holiday_days(np, holidays)
+        counts -= np.searchsorted(holiday_days, last.astype(np.int64)) - np.searchsorted(holiday_days, first.astype(np.int64))
+    return sign * counts
+
+# Whole-array version of add_business_days(), for arrays of dates and of
+# numbers of business days (or a single number), returning datetime64[D]s.
+def add_business_days_array(dates, offsets, holidays=None):
+    np = methods._require_numpy()
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    days = dates.astype(np.int64)
+    n = np.broadcast_to(np.asarray(offsets, dtype=np.int64), days.shape).copy()
+    dows = methods.day_of_week_array(dates).astype(np.int64)
+    holiday_days = _holiday_days(np, holidays) if holidays is not None else np.zeros(0, dtype=np.int64)
+    def rest_days(days, dows):
+        rest = (dows == 0) | (dows == 6)
+        if len(holiday_days):
+            index = np.minimum(np.searchsorted(holiday_days, days), len(holiday_days) - 1)
+            rest |= holiday_days[index] == days
+        return rest
+    roll = rest_days(days, dows)
+    while roll.any():
+        days[roll] += 1
+        dows[roll] = (dows[roll] + 1) % 7
+        roll = rest_days(days, dows)
+    while True:
+        weeks, weekday = np.divmod(dows - 1 + n, 5)
+        targets = days - (dows - 1) + 7 * weeks + weekday
+        if not len(holiday_days):
+            return targets.astype('datetime64[D]')
+        forward = np.searchsorted(holiday_days, targets + 1) - np.searchsorted(holiday_days, days + 1)
+        backward = np.searchsorted(holiday_days, targets) - np.searchsorted(holiday_days, days)
+        skipped = np.where(n >= 0, forward, backward)
+        pending = skipped != 0
+        if not pending.any():
+            return targets.astype('datetime64[D]')
+        dows = np.where(pending, (dows + targets - days) % 7, dows)
+        days = np.where(pending, targets, days)
+        n = np.where(pending, skipped, n)
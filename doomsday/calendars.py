@@ -0,0 +1,208 @@
+import bisect, json
+from . import methods
+from .explanations import MONTH_NAMES
+from .methods import DAYS_OF_THE_WEEK_NAMES, LEAP_MONTH_DOOMSDAYS, MONTH_DOOMSDAYS
+from .query import LEAP_MONTH_LENGTHS, MONTH_LENGTHS
+
+# Wall calendars for whole years, with weeks starting on Sunday. Rather than
+# working out the day of the week of every day, we take the year's Doomsday
+# (doomscentury + doomsyear) once, and the first of each month falls
+# (1 - the month's Doomsday) days after it, using the same Doomsdays of the
+# month as doomsmonth(). The layout of a year only depends on its Doomsday
+# and whether it's a leap year, so there are only 14 different layouts (or
+# templates), and when rendering many years, each template is rendered once
+# and reused for every year that shares it, with only the year filled in.
+
+# Returns the template of year, i.e. (the day of the week of its Doomsday,
+# whether it's a leap year).
+def template(year):
+    if methods.anchor_cache is not None:
+        return methods.anchor_cache.get(year)
+    return (methods.doomscentury(year) + methods.doomsyear(year)) % 7, methods.leapyear(year)
+
+# Returns the template of each year in an array of years, as an array of
+# anchor + 7 * leap (i.e. 0 to 13).
+def template_array(years):
+    np = methods._require_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    return (methods.doomscentury_array(years) + methods.doomsyear_array(years)) % 7 + 7 * methods.leapyear_array(years)
+
+# Returns (the day of the week of the first, the number of days) for each
+# month of the years with the given template.
+def months(anchor, leap):
+    doomsdays, lengths = (LEAP_MONTH_DOOMSDAYS, LEAP_MONTH_LENGTHS) if leap else (MONTH_DOOMSDAYS, MONTH_LENGTHS)
+    return [ ((anchor + 1 - doomsdays[month]) % 7, lengths[month]) for month in range(1, 13) ]
+
+# Returns the weeks of a month starting on first_weekday, as lists of the
+# days of the month from Sunday to Saturday, with None before the first and
+# after the last day of the month.
+def weeks(first_weekday, length):
+    days = [ None ] * first_weekday + list(range(1, length + 1))
+    days += [ None ] * (-len(days) % 7)
+    return [ days[i:i + 7] for i in range(0, len(days), 7) ]
+
+# Returns the weeks of each month of year (see weeks()).
+def year_grid(year):
+    return [ weeks(first_weekday, length) for first_weekday, length in months(*template(year)) ]
+
+# Renderers for the years with a template, each of which returns a function
+# giving the rendering of a year with that template.
+
+# Text, three months across, like cal -y. Every month is six weeks high, so
+# that the months line up.
+MONTH_WIDTH = 20
+GUTTER = '  '
+WEEKDAY_HEADER = ' '.join(name[:2] for name in DAYS_OF_THE_WEEK_NAMES)
+
+def _text_month(month, first_weekday, length):
+    cells = [ '  ' ] * first_weekday + [ f'{day:2}' for day in range(1, length + 1) ]
+    cells += [ '  ' ] * (42 - len(cells))
+    return [ MONTH_NAMES[month].center(MONTH_WIDTH), WEEKDAY_HEADER ] + [ ' '.join(cells[i:i + 7]) for i in range(0, 42, 7) ]
+
+def render_text(anchor, leap):
+    blocks = [ _text_month(month, *layout) for month, layout in enumerate(months(anchor, leap), 1) ]
+    lines = []
+    for row in range(0, 12, 3):
+        lines.append('')
+        lines.extend(GUTTER.join(line).rstrip() for line in zip(*blocks[row:row + 3]))
+    body = '\n'.join(lines) + '\n'
+    width = 3 * MONTH_WIDTH + 2 * len(GUTTER)
+    return lambda year: str(year).center(width).rstrip() + '\n' + body
+
+# CSV, with a row for each week: year, month, week of the month, and the
+# days of the month from Sunday to Saturday (blank before the first and
+# after the last).
+CSV_HEADER = 'year,month,week,' + ','.join(DAYS_OF_THE_WEEK_NAMES) + '\n'
+
+# Stands in for the year in the rendered rows, until it's filled in.
+YEAR = '\0'
+
+def render_csv(anchor, leap):
+    rows = []
+    for month, layout in enumerate(months(anchor, leap), 1):
+        for week, days in enumerate(weeks(*layout), 1):
+            rows.append(f'{YEAR},{month},{week},' + ','.join('' if day is None else str(day) for day in days) + '\n')
+    body = ''.join(rows)
+    return lambda year: body.replace(YEAR, str(year))
+
+# JSON, an object per year on a line of its own.
+def render_json(anchor, leap):
+    months_json = json.dumps([ { 'month': month, 'name': MONTH_NAMES[month], 'weeks': weeks(*layout) } for month, layout in enumerate(months(anchor, leap), 1) ])
+    return lambda year: f'{{"year": {year}, "months": {months_json}}}\n'
+
+RENDERERS = {
+    'text': render_text,
+    'csv': render_csv,
+    'json': render_json,
+}
+
+# Text before the first year and between years for each format.
+HEADERS = { 'text': '', 'csv': CSV_HEADER, 'json': '' }
+SEPARATORS = { 'text': '\n', 'csv': '', 'json': '' }
+
+# Returns the rendering of a single year in output_format.
+def render_year(year, output_format='text'):
+    return RENDERERS[output_format](*template(year))(year)
+
+# Lazily yields the calendars of the years from first to last in
+# output_format, as a header (if the format has one) followed by a string
+# per year. Each of the 14 templates is rendered at most once.
+def render_years(first, last, output_format='text'):
+    renderer, separator = RENDERERS[output_format], SEPARATORS[output_format]
+    rendered = {}
+    if HEADERS[output_format]:
+        yield HEADERS[output_format]
+    for year in range(first, last + 1):
+        key = template(year)
+        render = rendered.get(key)
+        if render is None:
+            render = rendered[key] = renderer(*key)
+        yield render(year) if year == first else separator + render(year)
+
+# Writes the calendars of the years from first to last to file, a chunk of
+# years at a time, returning the number of years written.
+def write_calendars(file, first, last, output_format='text', chunk_years=100):
+    chunk = []
+    for text in render_years(first, last, output_format):
+        chunk.append(text)
+        if len(chunk) >= chunk_years:
+            file.write(''.join(chunk))
+            chunk = []
+    file.write(''.join(chunk))
+    return last - first + 1
+
+# An index of the years from first to last by template, for finding the
+# years with the same calendar as a year by looking its template up and
+# bisecting the sorted years with that template, rather than scanning.
+class TemplateIndex:
+    def __init__(self, first=methods.MIN_YEAR, last=methods.MAX_YEAR):
+        self.first = first
+        self.last = last
+        self.years = {}
+        for year in range(first, last + 1):
+            self.years.setdefault(template(year), []).append(year)
+        self._arrays = None
+
+    # The other years in the index with the same calendar as year.
+    def same_years(self, year):
+        return [ other for other in self.years.get(template(year), []) if other != year ]
+
+    # The latest year in the index before year with the same calendar, or None.
+    def previous(self, year):
+        years = self.years.get(template(year), [])
+        i = bisect.bisect_left(years, year)
+        return years[i - 1] if i > 0 else None
+
+    # The earliest year in the index after year with the same calendar, or None.
+    def next(self, year):
+        years = self.years.get(template(year), [])
+        i = bisect.bisect_right(years, year)
+        return years[i] if i < len(years) else None
+
+    # The years of the index sorted by template (as numbered by
+    # template_array()) and then by year, along with sort keys combining the
+    # two (see _key()), and where each template's years start.
+    def arrays(self):
+        if self._arrays is None:
+            np = methods._require_numpy()
+            years = np.arange(self.first, self.last + 1)
+            templates = template_array(years)
+            order = np.argsort(templates, kind='stable')
+            years, templates = years[order], templates[order]
+            self._arrays = years, self._key(templates, years), np.searchsorted(templates, np.arange(15))
+        return self._arrays
+
+    # Sort keys for (template, year) pairs, with years outside the index
+    # clipped to just outside it, so that they stay within their template.
+    def _key(self, templates, years):
+        np = methods._require_numpy()
+        span = self.last - self.first + 3
+        return templates * span + np.clip(years, self.first - 1, self.last + 1) - (self.first - 1)
+
+    # Whole-array versions of previous() and next(), giving 0 where there is
+    # no such year. All of the years are found with one searchsorted() over
+    # the index.
+    def previous_array(self, years):
+        return self._neighbours(years, 'left', -1)
+
+    def next_array(self, years):
+        return self._neighbours(years, 'right', 0)
+
+    def _neighbours(self, years, side, offset):
+        np = methods._require_numpy()
+        years = np.asarray(years, dtype=np.int64)
+        indexed, keys, starts = self.arrays()
+        templates = template_array(years)
+        positions = np.searchsorted(keys, self._key(templates, years), side=side) + offset
+        found = (positions >= starts[templates]) & (positions < starts[templates + 1])
+        return np.where(found, indexed[np.clip(positions, 0, len(indexed) - 1)], 0)
+
+_default_index = None
+
+# Returns the index of the years the command line utility accepts, building
+# it on first use.
+def default_index():
+    global _default_index
+    if _default_index is None:
+        _default_index = TemplateIndex()
+    return _default_index
@@ -1,213 +1,661 @@
-import click, datetime, calendar, random
-from timeit import default_timer as timer
-from . import methods
-
-# Given that the Doomsday algorithm works for the Gregorian calendar,
-# we refrain from training on dates earlier than the date of its earliest
-# adoption, October 15th, 1582 (until such time as we manage to capture
-# conversion to old/new-style Julian calendars, regional adoption timeframes, etc.)
-OCTOBER_15TH_1582 = datetime.date(1582, 10, 15).toordinal()
-
-# Additionally, we arbitrarily limit training to dates no later than
-# the last day of the year 2600.
-DECEMBER_31ST_2600 = datetime.date(2600, 12, 31).toordinal()
-
-# From http://stackoverflow.com/questions/739241/python-date-ordinal-output,
-# we include a routine for providing an ordinal description of the day of the date.
-def date_ordinal(n):
-    if 10 <= n % 100 < 20:
-        return str(n) + 'th'
-    else:
-        return  str(n) + {1 : 'st', 2 : 'nd', 3 : 'rd'}.get(n % 10, "th")
-
-# Since datetime.strftime() doesn't handle years earlier than 1900, we provide own date string function.
-def date_str(date):
-    return "%s %s, %d" % (calendar.month_name[date.month], date_ordinal(date.day), date.year)
-
-# In the explanations of the day of week calculations, we want to use
-# the correct tense of the verbs "to fall" and "to be".
-def correct_tense(date, past, present, future):
-    today = datetime.date.today()
-    if date < today:
-        return past
-    elif date == today:
-        return present
-    else:
-        return future
+# Since the command line utility is often invoked once per date, we keep its
+# start up time down by importing modules that only some commands need (e.g.
+# random, NumPy and most of this package) in the functions that need them.
+import click, datetime, importlib, sys
+from time import perf_counter as timer, time
+from . import methods, profiling
+from .methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600, MIN_YEAR, MAX_YEAR
+
+# Returns a function giving the named attribute of a module of this package,
+# only importing the module when it's called, for the choices and defaults
+# of options that come from modules only some commands need.
+def deferred(module, attribute):
+    return lambda: getattr(importlib.import_module(f'.{module}', __package__), attribute)
+
+# click.Choice of the keys of the named attribute of a module of this
+# package (see deferred()), along with any extra choices, which are looked
+# up when they're needed, i.e. for help or to check a value. click.Choice
+# is given no choices, and its setting of them is ignored.
+class DeferredChoice(click.Choice):
+    def __init__(self, module, attribute, extra=(), case_sensitive=True):
+        self.deferred_choices = deferred(module, attribute)
+        self.extra = list(extra)
+        super().__init__((), case_sensitive)
+
+    @property
+    def choices(self):
+        return list(self.deferred_choices()) + self.extra
+
+    @choices.setter
+    def choices(self, choices):
+        pass
+
+# click.DateTime, with the parsing timed as the 'parse' phase when profiling.
+class DateTime(click.DateTime):
+    def convert(self, value, param, ctx):
+        with profiling.phase('parse'):
+            return super().convert(value, param, ctx)
+
+# DateTime, also taking February 29th in the years that are leap years only
+# in the Julian calendar (e.g. 1700), which datetime can't hold, so these are
+# given as an explanations.Date, to be checked against the calendar of the
+# --region they were written in.
+class RegionDateTime(DateTime):
+    def convert(self, value, param, ctx):
+        if isinstance(value, str) and value.strip()[4:10] == '-02-29':
+            from . import explanations, parsing
+            date = parsing.parse_date(value.encode('utf-8', 'replace'), methods.julian_leapyear)
+            if date is not None and not methods.leapyear(date[0]):
+                return explanations.Date(*date)
+        return super().convert(value, param, ctx)
+
+# A YEAR or a range of years FIRST..LAST, converted to (first, last).
+class YearRange(click.ParamType):
+    name = 'year_range'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, tuple):
+            return value
+        first, separator, last = value.partition('..')
+        years = click.IntRange(MIN_YEAR, MAX_YEAR)
+        first = years.convert(first, param, ctx)
+        last = years.convert(last, param, ctx) if separator else first
+        if last < first:
+            self.fail(f'{value!r} ends before it starts.', param, ctx)
+        return first, last
+
+# Echoes the output of a command, timed as the 'output' phase when profiling.
+def emit(message, **kwargs):
+    with profiling.phase('output'):
+        click.echo(message, **kwargs)
 
 def explain_leapyear(year):
-    if year % 400 == 0:
-        print(f'{year} is evenly divisible by 400, so it is a leap year.')
-    elif year % 100 == 0:
-        print(f'{year} is not evenly divisible by 400, but is evenly divisible by 100, so it is not a leap year.')
-    elif year % 4 == 0:
-        print(f'{year} is not evenly divisible by neither 400 nor 100, but is evenly divisible by 4, so it is a leap year.')
-    else:
-        print(f'{year} is not evenly divisible by neither 400, 100, nor 4, so it is not a leap year.')
+    from . import explanations
+    print(explanations.leapyear_text(explanations.explain_leapyear(year)), end='')
 
 def explain_doomscentury(year):
-    dc = methods.doomscentury(year)
-    c = int(str(year)[0:2]) + 1
-    print("doomcentury = ((5*%d + floor(%d/4)) mod 7 + Thursday) mod 7" % (c, c-1))
-    print("            = ((%d + %d) mod 7 + Thursday) mod 7" % (5*c, (c-1)/4))
-    print("            = (%d mod 7 + 4) mod 7" % (5*c+(c-1)/4))
-    print("            = (%d + 4) mod 7" % ((5*c+(c-1)/4)%7))
-    print("            = %d mod 7" % (((5*c+(c-1)/4) % 7)+4))
-    print("            = %d, i.e. %s" % (dc, methods.DAYS_OF_THE_WEEK_NAMES[dc]))
+    from . import explanations
+    print(explanations.doomscentury_text(explanations.explain_doomscentury(year)), end='')
 
 def explain_doomsyear(year):
-    dy = methods.doomsyear(year)
-    x = int(str(year)[2:])
-    x_str = str(x)
-    if x % 2 == 1:
-        x_str = "(%d+11)" % x
-        x = x + 11
-    x = x / 2
-    x_str = x_str + '/2'
-    if x % 2 == 1:
-        x_str = "(%s)+11" % x_str
-        x = x + 11
-    print("doomsyear   = 7's complement of (%s mod 7)" % x_str)
-    print("            = 7's complement of (%d mod 7)" % x)
-    print("            = 7's complement of %d" % (x%7))
-    print("            = %d, i.e. %s" % (dy, methods.DAYS_OF_THE_WEEK_NAMES[dy]))
+    from . import explanations
+    print(explanations.doomsyear_text(explanations.explain_doomsyear(year)), end='')
 
 def explain_doomsmonth(year, month, day):
-    dm = methods.doomsmonth(year, month, day)
-    date = datetime.date(year, month, day)
-    if month == 1:
-        print("%d %s%s a leap year, so" % (year, correct_tense(date, "was", "is", "will be"), "" if methods.leapyear(year) else " not")),
-        if methods.leapyear(year):
-            month_doomsday = 11
-        else:
-            month_doomsday = 10
-    elif month == 2:
-        print("%d %s%s a leap year, so" % (year, correct_tense(date, "was", "is", "will be"), "" if methods.leapyear(year) else " not")),
-        if methods.leapyear(year):
-            month_doomsday = 22
-        else:
-            month_doomsday = 21
-    elif month == 3:
-        month_doomsday = 7
-    elif month % 2 == 0:
-        month_doomsday = month
-    elif month == 5:
-        month_doomsday = 9
-    elif month == 9:
-        month_doomsday = 5
-    elif month == 7:
-        month_doomsday = 11
-    else: # month == 11
-        month_doomsday = 7
-    month_doomsday_date = datetime.date(year, month, month_doomsday)
-    print("%s %s on a Doomsday." % (date_str(month_doomsday_date), correct_tense(month_doomsday_date, "fell", "falls", "will fall")))
-    print("doomsmonth  = %d - %s" % (day, month_doomsday))
-    print("            = %d" % dm)
+    from . import explanations
+    print(explanations.doomsmonth_text(explanations.explain_doomsmonth(year, month), datetime.date(year, month, day)), end='')
 
 def explain_day_of_week(year, month, day):
-    dc = methods.doomscentury(year)
-    dy = methods.doomsyear(year)
-    dm = methods.doomsmonth(year, month, day)
-    dow = methods.day_of_week(year, month, day)
-    print("day of week = (doomscentury + doomsyear + doomsmonth) mod 7")
-    print("            = (%d + %d + %d) mod 7" % (dc, dy, dm))
-    sum = dc + dy + dm
-    print("            = %d mod 7" % sum)
-    if sum < 0:
-        print("            = 7's complement of (%d mod 7)" % -sum)
-        print("            = 7's complement of %d" % (-sum % 7))
-        print("            = %d, i.e. %s" % ((-sum % 7), dow))
-    else:
-        print("            = %d, i.e. %s" % ((sum % 7), dow))
+    from . import explanations
+    print(explanations.day_of_week_sum_text(explanations.explain_day_of_week(year, month, day)), end='')
 
 @click.group()
-def cli():
-    pass
+@click.option('--anchor-cache', type=click.IntRange(min=0), default=0, envvar='DOOMSDAY_ANCHOR_CACHE', help="Cache the Doomsdays of up to this many years (0 for no cache).")
+@click.option('--cache-stats', is_flag=True, help="Report anchor cache hits, misses and evictions on standard error when done.")
+@click.option('--profile', is_flag=True, envvar='DOOMSDAY_PROFILE', help="Report the wall clock and CPU time of each phase of the command on standard error.")
+@click.option('--profile-output', type=click.Path(dir_okay=False, writable=True), envvar='DOOMSDAY_PROFILE_OUTPUT', help="Also write cProfile statistics for pstats to this file (implies --profile).")
+def cli(anchor_cache, cache_stats, profile, profile_output):
+    if profile or profile_output:
+        click.get_current_context().with_resource(profiling.Profiler(profile_output, sys.stderr))
+    if anchor_cache:
+        cache = methods.enable_anchor_cache(anchor_cache)
+        if cache_stats:
+            info = cache.info
+            click.get_current_context().call_on_close(lambda: click.echo('Anchor cache: {hits} hits, {misses} misses, {evictions} evictions, {size}/{maxsize} years.'.format(**info()), err=True))
 
 @click.command()
-@click.argument('year', type=click.IntRange(1582, 2600))
+@click.argument('year', type=click.IntRange(MIN_YEAR, MAX_YEAR))
 @click.option('--explain', is_flag=True, help="Provide a walkthrough of the calculation.")
 def leapyear(year, explain):
     """Determine if YEAR is a leap year."""
     if explain:
-        explain_leapyear(year)
+        with profiling.phase('render'):
+            explain_leapyear(year)
     else:
-        click.echo(f'{methods.leapyear(year)}')
+        with profiling.phase('compute'):
+            result = methods.leapyear(year)
+        emit(f'{result}')
 
 @click.command()
-@click.argument('year', type=click.IntRange(1582, 2600))
+@click.argument('year', type=click.IntRange(MIN_YEAR, MAX_YEAR))
 @click.option('--explain', is_flag=True, help="Provide a walkthrough of the calculation.")
 def doomscentury(year, explain):
     """Calculate the anchor day for the century of YEAR."""
     if explain:
-        explain_doomscentury(year)
+        with profiling.phase('render'):
+            explain_doomscentury(year)
     else:
-        click.echo(f'{methods.doomscentury(year)}')
+        with profiling.phase('compute'):
+            result = methods.doomscentury(year)
+        emit(f'{result}')
 
 @click.command()
-@click.argument('year', type=click.IntRange(1582, 2600))
+@click.argument('year', type=click.IntRange(MIN_YEAR, MAX_YEAR))
 @click.option('--explain', is_flag=True, help="Provide a walkthrough of the calculation.")
 def doomsyear(year, explain):
     """Calculate the doomsyear for YEAR."""
     if explain:
-        explain_doomsyear(year)
+        with profiling.phase('render'):
+            explain_doomsyear(year)
     else:
-        click.echo(f'{methods.doomsyear(year)}')
+        with profiling.phase('compute'):
+            result = methods.doomsyear(year)
+        emit(f'{result}')
 
 @click.command()
-@click.argument('date', type=click.DateTime())
+@click.argument('date', type=DateTime())
 @click.option('--explain', is_flag=True, help="Provide a walkthrough of the calculation.")
 def doomsmonth(date, explain):
     """Calculate the doomsmonth for DATE."""
     if explain:
-        explain_doomsmonth(date.year, date.month, date.day)
+        with profiling.phase('render'):
+            explain_doomsmonth(date.year, date.month, date.day)
     else:
-        click.echo(f'{methods.doomsmonth(date.year, date.month, date.day)}')
+        with profiling.phase('compute'):
+            result = methods.doomsmonth(date.year, date.month, date.day)
+        emit(f'{result}')
+
+REGION_CHOICES = DeferredChoice('regions', 'REGIONS', case_sensitive=False)
+REGION_HELP = "Take dates as written in this region, i.e. Julian before it adopted the Gregorian calendar."
 
 @click.command()
-@click.argument('date', type=click.DateTime())
+@click.argument('date', type=RegionDateTime())
 @click.option('--explain', is_flag=True, help="Provide a walkthrough of the calculation.")
-def dayofweek(date, explain):
+@click.option('--format', 'explain_format', type=DeferredChoice('explanations', 'RENDERERS'), default='text', help="Format of the walkthrough.")
+@click.option('--region', type=REGION_CHOICES, help=REGION_HELP)
+def dayofweek(date, explain, explain_format, region):
     """Calculate the day of the week for DATE."""
+    from . import explanations, regions
+    calendar = 'gregorian'
+    if region is not None:
+        try:
+            calendar = regions.calendar(region, date.year, date.month, date.day)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'DATE'")
+    elif isinstance(date, explanations.Date):
+        raise click.BadParameter(f'{date.isoformat()} is only a date in the Julian calendar (see --region).', param_hint="'DATE'")
     if explain:
-        c = int(str(date.year)[0:2]) + 1
-        y = int(str(date.year)[2:])
-        print("1) Calculate the doomsyear for the %s year of the %s century." % (date_ordinal(y), date_ordinal(c)))
-        explain_doomsyear(date.year)
-        print("2) Calculate the anchor day for the %s century." % date_ordinal(c))
-        explain_doomscentury(date.year)
-        print("3) Calculate the doomsmonth for %s of the year." % calendar.month_name[date.month])
-        explain_doomsmonth(date.year, date.month, date.day)
-        print("4) Calculate the day of the week.")
-        explain_day_of_week(date.year, date.month, date.day)
+        render = explanations.RENDERERS[explain_format]
+        with profiling.phase('render'):
+            explanation = explanations.explain_day_of_week(date.year, date.month, date.day, calendar)
+            walkthrough = render(explanation)
+            if region is not None and explain_format == 'text':
+                walkthrough = explanations.calendar_text(regions.get(region), explanation) + walkthrough
+        emit(walkthrough, nl=explain_format == 'json')
     else:
-        click.echo(f'{methods.day_of_week(date.year, date.month, date.day)}')
+        with profiling.phase('compute'):
+            if calendar == 'julian':
+                result = methods.julian_day_of_week(date.year, date.month, date.day)
+            else:
+                result = methods.day_of_week(date.year, date.month, date.day)
+        emit(f'{result}')
 
 @click.command()
 @click.option('-n', '--num-of-tests', type=click.IntRange(min=1), default=10, help="Number of tests to perform.")
-def test(num_of_tests):
+@click.option('--history/--no-history', 'record', default=True, help="Record each answer in the history that `report` summarizes.")
+@click.option('--history-file', type=click.Path(dir_okay=False), help="Where the history is kept, by default in the user's data directory.")
+@click.option('--adaptive', is_flag=True, help="Ask more about the centuries, years and months you have been slowest or least accurate with.")
+def test(num_of_tests, record, history_file, adaptive):
     """Test your speed and accuracy in calculating the day of the week."""
+    import random
+    from . import history
+    from .explanations import correct_tense, date_str
+    history_file = history_file or history.default_path()
+    if adaptive:
+        from .scheduler import Scheduler
+        scheduler = Scheduler(history.read(history_file))
+    session = int(time())
     correct_answers = 0
     start_time = timer()
     for i in range(num_of_tests):
-        date = datetime.date.fromordinal(random.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600))
+        if adaptive:
+            date = scheduler.next_date()
+        else:
+            date = datetime.date.fromordinal(random.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600))
         correct_answer = methods.day_of_week(date.year, date.month, date.day)
+        asked = timer()
         answer = input(f'{date_str(date)}? ')
-        if answer.lower() == correct_answer.lower():
+        latency = timer() - asked
+        correct = answer.lower() == correct_answer.lower()
+        if correct:
             click.echo('Correct!')
             correct_answers += 1
         else:
             click.echo(f'Incorrect - {date_str(date)} {correct_tense(date, "was", "is", "will be")} a {correct_answer}.')
+        recorded = history.answer(date, latency, correct, session, time())
+        if adaptive:
+            scheduler.record(recorded)
+        # Each answer is saved as it is given, so an interrupted session isn't lost.
+        if record:
+            history.append(history_file, [ recorded ])
     time_elapsed = timer() - start_time
     click.echo(f'\nAccuracy: {correct_answers/num_of_tests:.0%} over {num_of_tests} tests.')
     click.echo(f'Speed:    {time_elapsed:.1f}s total, average of {time_elapsed/num_of_tests:.1f}s per test.')
 
+COMPONENT_LABELS = { 'century': 'Century', 'year_of_century': 'Year of century', 'month': 'Month', 'leap': 'Leap year' }
+
+def component_value(component, value):
+    if component == 'century':
+        return f'{value}00s'
+    if component == 'year_of_century':
+        return f'{value:02}'
+    if component == 'month':
+        from .explanations import MONTH_NAMES
+        return MONTH_NAMES[value]
+    return 'yes' if value else 'no'
+
+def summary_str(summary):
+    return f'{summary["answers"]} answers, {summary["accuracy"]:.0%} correct, mean {summary["mean"]:.1f}s, p50 {summary["p50"]:.1f}s, p90 {summary["p90"]:.1f}s'
+
+@click.command()
+@click.option('--history-file', type=click.Path(dir_okay=False), help="Where the history is kept, by default in the user's data directory.")
+@click.option('--top', type=click.IntRange(min=1), default=3, help="Number of slowest values of each date component to list.")
+@click.option('--sessions', 'last_sessions', type=click.IntRange(min=1), default=10, help="Number of most recent sessions to list.")
+@click.option('--json', 'as_json', is_flag=True, help="Output the full report as JSON.")
+def report(history_file, top, last_sessions, as_json):
+    """Summarize the speed and accuracy of your answers to `test` over time."""
+    from . import history
+    answers = history.read(history_file or history.default_path())
+    if not answers:
+        raise click.ClickException('No answers have been recorded yet - run `doomsday test` first.')
+    summary = history.report(answers)
+    if as_json:
+        import json
+        click.echo(json.dumps(summary, indent=2))
+        return
+    overall = summary['overall']
+    click.echo(f'Answers:  {overall["answers"]} over {summary["sessions"]} sessions, {overall["accuracy"]:.0%} correct.')
+    click.echo(f'Latency:  mean {overall["mean"]:.1f}s, p50 {overall["p50"]:.1f}s, p90 {overall["p90"]:.1f}s, p99 {overall["p99"]:.1f}s.')
+    for component in history.COMPONENTS:
+        click.echo(f'\nSlowest by {COMPONENT_LABELS[component].lower()}:')
+        for group in summary['by_component'][component][:top]:
+            click.echo(f'  {component_value(component, group["value"]):<10} {summary_str(group)}')
+    click.echo('\nRecent sessions:')
+    for session in summary['trend'][-last_sessions:]:
+        click.echo(f'  {session["started"]}  {summary_str(session)}')
+
+ENGINE_CHOICES = DeferredChoice('engines', 'ENGINES', [ 'auto' ])
+
+@click.command()
+@click.argument('input', type=click.File('rb'), default='-')
+@click.option('--numbers', is_flag=True, help="Output the day of the week as a number (0 = Sunday) rather than a name.")
+@click.option('--skip-invalid', is_flag=True, help="Silently drop lines that aren't valid dates instead of reporting them.")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=deferred('bulk', 'DEFAULT_CHUNK_SIZE'), help="Number of lines processed at a time.")
+@click.option('-w', '--workers', type=click.IntRange(min=1), default=1, help="Number of processes to spread the work across.")
+@click.option('--stats/--no-stats', default=None, help="Report throughput on standard error when done (the default with more than one worker).")
+@click.option('--table', 'use_table', is_flag=True, help="Look days of the week up in the precomputed weekday table.")
+@click.option('--engine', type=ENGINE_CHOICES, help="Calculate days of the week with this engine (auto for the fastest).")
+@click.option('--region', type=REGION_CHOICES, help=REGION_HELP + " A line may give its own region after the date.")
+def batch(input, numbers, skip_invalid, chunk_size, workers, stats, use_table, engine, region):
+    """Calculate the day of the week for each date in INPUT.
+
+    INPUT has one date per line, and defaults to standard input. With
+    --region, a date may be followed by the code of its region, e.g.
+    1752-09-02 GB."""
+    from . import bulk, engines
+    if region is not None and (use_table or engine):
+        raise click.UsageError('--region can\'t be used with --table or --engine.')
+    if stats is None:
+        stats = workers > 1
+    # Input is read as bytes, which bulk.annotate() parses and calculates a chunk at a time with NumPy, if it's installed.
+    if engine == 'auto':
+        engine = engines.select('batch' if methods._numpy() is not None else 'scalar')
+    throughput = {}
+    start_time = timer()
+    for results, errors in bulk.annotate(input, chunk_size, name=not numbers, workers=workers, stats=throughput, use_table=use_table, engine=engine, region=region):
+        if skip_invalid:
+            results = [ result for result in results if result is not None ]
+        else:
+            # Invalid lines get an empty output line, so that the output stays aligned with the input.
+            results = [ '' if result is None else result for result in results ]
+            for line_number, line in errors:
+                click.echo(f'Line {line_number}: invalid date {line!r}', err=True)
+        if results:
+            emit('\n'.join(results))
+    if stats:
+        time_elapsed = timer() - start_time
+        total_lines = sum(lines for lines, seconds in throughput.values())
+        for worker, (pid, (lines, seconds)) in enumerate(sorted(throughput.items()), 1):
+            click.echo(f'Worker {worker} (pid {pid}): {lines} lines in {seconds:.2f}s, {lines/max(seconds, 1e-9):,.0f} lines/s.', err=True)
+        click.echo(f'Total: {total_lines} lines in {time_elapsed:.2f}s, {total_lines/max(time_elapsed, 1e-9):,.0f} lines/s.', err=True)
+
+@click.command(name='table')
+@click.option('--path', type=click.Path(dir_okay=False), help="Where to cache the table, by default in the user's cache directory.")
+@click.option('--rebuild', is_flag=True, help="Rebuild the table even if it is already cached.")
+def weekday_table(path, rebuild):
+    """Precompute the day of the week for every supported date."""
+    from . import table
+    from .explanations import date_str
+    if path is None:
+        path = table.default_path()
+    with table.load_table(path, rebuild=rebuild) as weekdays:
+        first, last = datetime.date.fromordinal(weekdays.first), datetime.date.fromordinal(weekdays.last)
+        click.echo(f'{path}: {len(weekdays)} days from {date_str(first)} to {date_str(last)}.')
+
+@click.command()
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--ordinals', type=click.Path(exists=True, dir_okay=False), help="A column of int32 date ordinals (days since January 1st, 1 AD, counting from 1).")
+@click.option('--ymd', nargs=3, type=click.Path(exists=True, dir_okay=False), help="Columns of int16 years, int8 months and int8 days.")
+@click.option('--window', type=click.IntRange(min=1), default=deferred('columnar', 'DEFAULT_WINDOW'), help="Number of rows processed at a time.")
+@click.option('--engine', type=ENGINE_CHOICES, help="Calculate days of the week for --ymd with this engine (auto for the fastest).")
+def columns(output, ordinals, ymd, window, engine):
+    """Calculate the days of the week for binary date columns.
+
+    The days of the week are written to OUTPUT as a column of uint8s, with
+    255 for the rows that aren't dates."""
+    from . import columnar, engines
+    if (ordinals is None) == (not ymd):
+        raise click.UsageError('Give exactly one of --ordinals and --ymd.')
+    try:
+        if ordinals is not None:
+            rows, invalid = columnar.weekdays_from_ordinals(ordinals, output, window=window)
+        else:
+            if engine == 'auto':
+                engine = engines.select('batch')
+            rows, invalid = columnar.weekdays_from_columns(*ymd, output, window=window, engine=engine)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'{rows} rows written to {output}' + (f', {invalid} of them invalid.' if invalid else '.'), err=True)
+
+# Line formats for the range command, given a date's ISO format and its day of the week.
+RANGE_FORMATS = {
+    'text': '{} {}'.format,
+    'csv': '{},{}'.format,
+    'jsonl': '{{"date": "{}", "day_of_week": {}}}'.format,
+    'dates': lambda date, dow: date,
+}
+
+@click.command(name='range')
+@click.argument('start', type=DateTime())
+@click.argument('end', type=DateTime())
+@click.option('--step', type=click.IntRange(min=1), default=1, help="Number of days between successive dates.")
+@click.option('-d', '--weekday', 'weekdays', type=click.Choice(methods.DAYS_OF_THE_WEEK_NAMES, case_sensitive=False), multiple=True, help="Only list dates falling on this day of the week (may be repeated).")
+@click.option('--numbers', is_flag=True, help="Output the day of the week as a number (0 = Sunday) rather than a name.")
+@click.option('--format', 'output_format', type=click.Choice(list(RANGE_FORMATS)), default='text', help="Output format.")
+def date_range(start, end, step, weekdays, numbers, output_format):
+    """List the day of the week for each date from START to END."""
+    import itertools
+    from . import bulk, ranges
+    weekdays = { methods.DAYS_OF_THE_WEEK_NAMES.index(weekday) for weekday in weekdays } or None
+    names = [ str(dow) for dow in range(7) ] if numbers else methods.DAYS_OF_THE_WEEK_NAMES
+    if output_format == 'jsonl' and not numbers:
+        names = [ f'"{name}"' for name in names ]
+    line = RANGE_FORMATS[output_format]
+    dates = ranges.day_of_week_range(start.date(), end.date(), step, weekdays)
+    while True:
+        lines = [ line(date.isoformat(), names[dow]) for date, dow in itertools.islice(dates, bulk.DEFAULT_CHUNK_SIZE) ]
+        if not lines:
+            break
+        click.echo('\n'.join(lines))
+
+@click.command()
+@click.option('-d', '--weekday', type=click.Choice(methods.DAYS_OF_THE_WEEK_NAMES, case_sensitive=False), required=True, help="The day of the week to look for.")
+@click.option('--day', type=click.IntRange(1, 31), required=True, help="The day of the month to look for.")
+@click.option('-m', '--month', 'months', type=click.IntRange(1, 12), multiple=True, help="Only look in this month (may be repeated).")
+@click.option('--from', 'start_year', type=click.IntRange(1, 9999), default=MIN_YEAR, show_default=True, help="The first year to look in.")
+@click.option('--to', 'end_year', type=click.IntRange(1, 9999), default=MAX_YEAR, show_default=True, help="The last year to look in.")
+@click.option('--count', is_flag=True, help="Only output the number of dates found.")
+def find(weekday, day, months, start_year, end_year, count):
+    """Find the dates that are a given day of the month and day of the week.
+
+    Dates are in the proleptic Gregorian calendar, so with the default --from
+    of 1582 they include some before its adoption on October 15th, 1582."""
+    from . import query
+    dates = query.find_dates(methods.DAYS_OF_THE_WEEK_NAMES.index(weekday), day, months, start_year, end_year)
+    if count:
+        click.echo(sum(1 for date in dates))
+    else:
+        for date in dates:
+            click.echo(date.isoformat())
+
+# Returns the holidays given with --holiday and in the --holidays file, as a business.Holidays.
+def load_holidays(holiday, holidays_file):
+    from . import bulk, business
+    dates = [ date.date() for date in holiday ]
+    if holidays_file is not None:
+        for line_number, line in enumerate(holidays_file, 1):
+            if line.strip():
+                date = bulk.parse_line(line)
+                if date is None:
+                    raise click.BadParameter(f'line {line_number}: invalid date {line.strip()!r}', param_hint="'--holidays'")
+                dates.append(datetime.date(*date))
+    return business.Holidays(dates)
+
+@click.command()
+@click.argument('start', type=DateTime())
+@click.argument('end', type=DateTime())
+@click.option('--holiday', type=DateTime(), multiple=True, help="A holiday, which isn't a business day (may be repeated).")
+@click.option('--holidays', 'holidays_file', type=click.File('r'), help="A file of holidays, one date per line.")
+def busdays(start, end, holiday, holidays_file):
+    """Count the business days from START to END.
+
+    START is counted, but END isn't."""
+    from . import business
+    holidays = load_holidays(holiday, holidays_file)
+    click.echo(business.count_business_days(start.date(), end.date(), holidays))
+
+@click.command(context_settings={'ignore_unknown_options': True})
+@click.argument('date', type=DateTime())
+@click.argument('days', type=int)
+@click.option('--holiday', type=DateTime(), multiple=True, help="A holiday, which isn't a business day (may be repeated).")
+@click.option('--holidays', 'holidays_file', type=click.File('r'), help="A file of holidays, one date per line.")
+def addbusdays(date, days, holiday, holidays_file):
+    """Calculate the date DAYS business days after DATE.
+
+    DAYS may be negative, and if DATE isn't a business day, the count starts
+    from the next business day."""
+    from . import business
+    holidays = load_holidays(holiday, holidays_file)
+    click.echo(business.add_business_days(date.date(), days, holidays).isoformat())
+
+@click.command()
+@click.argument('input', type=click.File('r'), default='-')
+@click.option('--format', 'explain_format', type=DeferredChoice('explanations', 'RENDERERS'), default='text', help="Output format (JSON is written one explanation per line).")
+@click.option('--skip-invalid', is_flag=True, help="Silently skip lines that aren't valid dates instead of reporting them.")
+@click.option('--region', type=REGION_CHOICES, help=REGION_HELP + " A line may give its own region after the date.")
+def explain(input, explain_format, skip_invalid, region):
+    """Explain the day of the week calculation for each date in INPUT.
+
+    INPUT has one date per line, and defaults to standard input."""
+    from . import bulk, explanations, regions
+    # Markdown explanations already end with a blank line.
+    separator = '' if explain_format == 'markdown' else '\n'
+    for start, lines in bulk.chunks(input):
+        dates = []
+        for line_number, line in enumerate(lines, start):
+            text, code = bulk.split_region(line, region) if region is not None else (line, None)
+            # February 29th is a date in more years of the Julian calendar.
+            date = bulk.parse_line(text) if code is None else bulk.parse_line(text, methods.julian_leapyear)
+            try:
+                if date is None:
+                    raise ValueError(text)
+                calendar = regions.calendar(code, *date) if code is not None else 'gregorian'
+            except ValueError:
+                if not skip_invalid:
+                    click.echo(f'Line {line_number}: invalid date {line.strip()!r}', err=True)
+            else:
+                dates.append((*date, calendar))
+        for rendered in explanations.explain_many(dates, explain_format):
+            click.echo(rendered + separator, nl=False)
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help="The address to listen on.")
+@click.option('--port', type=click.IntRange(0, 65535), default=8000, show_default=True, help="The port to listen on.")
+def serve(host, port):
+    """Serve days of the week over HTTP as JSON.
+
+    GET /dayofweek/DATE gives the day of the week for DATE, POST /batch takes
+    a JSON array of dates and gives an array of days of the week, and GET
+    /stats gives request counts and latencies. Add ?numbers=1 to get days of
+    the week as numbers (0 = Sunday)."""
+    import asyncio
+    from . import server
+    def ready(listening):
+        for sock in listening.sockets:
+            address = sock.getsockname()
+            click.echo(f'Serving on http://{address[0]}:{address[1]}', err=True)
+    try:
+        asyncio.run(server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+# The commands that coprocess answers.
+COPROCESS_COMMANDS = ('leapyear', 'doomscentury', 'doomsyear', 'doomsmonth', 'dayofweek')
+
+@click.command()
+@click.option('--end', default='', help="Line written after each response to a command given --explain or --help (by default, an empty line).")
+def coprocess(end):
+    """Answer commands read one per line from standard input.
+
+    Each line is a command and its arguments as they would be given on the
+    command line, e.g. `dayofweek 2024-01-01`, for any of leapyear,
+    doomscentury, doomsyear, doomsmonth and dayofweek. Each answer is written
+    and flushed as soon as it is ready, so that scripts can interleave
+    questions with other work. Answers are one line, except for commands
+    given --explain or --help, whose answers are followed by the --end line.
+    Errors are one line starting with `error: `."""
+    import contextlib, io, shlex, sys
+    from .__main__ import _compute
+    stdout = sys.stdout
+    for line in sys.stdin:
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            args, response = None, f'error: {e}\n'
+        if args == []:
+            continue
+        if args is None:
+            pass
+        elif args[0] not in COPROCESS_COMMANDS:
+            response = f'error: unknown command {args[0]!r}\n'
+        else:
+            # Plain commands are answered directly, as by the doomsday entry point.
+            output = _compute(*args) if len(args) == 2 else None
+            if output is not None:
+                response = output + '\n'
+            else:
+                captured = io.StringIO()
+                try:
+                    with contextlib.redirect_stdout(captured):
+                        cli.commands[args[0]].main(args=args[1:], prog_name=f'doomsday {args[0]}', standalone_mode=False)
+                except click.ClickException as e:
+                    response = f'error: {e.format_message()}\n'
+                else:
+                    response = captured.getvalue()
+                    if '--explain' in args or '--help' in args:
+                        response += end + '\n'
+        stdout.write(response)
+        stdout.flush()
+
+@click.command(name='engines')
+@click.option('--check', is_flag=True, help="Check that every engine agrees with Python's datetime on every date from --from to --to.")
+@click.option('--from', 'start_year', type=click.IntRange(1, 9999), default=1583, show_default=True, help="The first year to check.")
+@click.option('--to', 'end_year', type=click.IntRange(1, 9999), default=MAX_YEAR, show_default=True, help="The last year to check.")
+@click.option('--benchmark', is_flag=True, help="Benchmark the engines again, rather than using the cached timings.")
+def list_engines(check, start_year, end_year, benchmark):
+    """List the engines for calculating the day of the week.
+
+    Shows each engine's time per date, one date at a time and in batches,
+    as measured by a benchmark that is run once and cached, with a * on the
+    engine --engine auto picks. The table engine, which only covers the
+    supported range of dates, is never picked."""
+    from . import engines
+    results = engines.cached_benchmark(rerun=benchmark)
+    fastest = { workload: engines.fastest(timings) for workload, timings in results.items() }
+    for engine in engines.ENGINES.values():
+        timings = [ f'{workload} {results[workload][engine.name]*1e9:7.1f} ns{"*" if fastest[workload] == engine.name else " "}' for workload in engines.WORKLOADS if workload in results ]
+        click.echo(f'{engine.name:<9} {"  ".join(timings)}  {engine.description}')
+    if check:
+        first = datetime.date(start_year, 1, 1).toordinal()
+        last = datetime.date(end_year, 12, 31).toordinal()
+        names = list(engines.ENGINES)
+        if first < OCTOBER_15TH_1582 or last > DECEMBER_31ST_2600:
+            for engine in engines.ENGINES.values():
+                if not engine.full_range:
+                    click.echo(f"Not checking the {engine.name} engine, which doesn't cover the whole range.", err=True)
+                    names.remove(engine.name)
+        disagreements = engines.cross_validate(first, last, names)
+        for d in disagreements:
+            click.echo(f'{d.engine} ({d.function}) disagrees on {d.date}: {d.actual} rather than {d.expected}.', err=True)
+        if disagreements:
+            raise click.ClickException('The engines disagree.')
+        click.echo(f'All engines agree on every date from {start_year} to {end_year}.')
+
+@click.command(name='verify')
+@click.option('--from', 'start', type=DateTime(), default='1582-10-15', show_default=True, help="The first date to check.")
+@click.option('--to', 'end', type=DateTime(), help=f"The last date to check (by default, December 31st, {MAX_YEAR}).")
+@click.option('-w', '--workers', type=click.IntRange(min=1), help="Number of processes to spread the work across (by default, one per CPU).")
+@click.option('--chunk-days', type=click.IntRange(min=1), default=deferred('verify', 'DEFAULT_CHUNK_DAYS'), help="Number of days checked at a time.")
+@click.option('--max-mismatches', type=click.IntRange(min=1), default=deferred('verify', 'MAX_MISMATCHES'), help="Number of mismatches to report.")
+def check_calculations(start, end, workers, chunk_days, max_mismatches):
+    """Check the calculations against Python's datetime for every date.
+
+    Checks day_of_week, doomsmonth, doomsyear and doomscentury, and their
+    array versions if NumPy is installed, for every date in the range."""
+    from . import verify
+    first = start.date().toordinal()
+    last = end.date().toordinal() if end else datetime.date(MAX_YEAR, 12, 31).toordinal()
+    start_time = timer()
+    checked, mismatches = verify.verify(first, last, workers, chunk_days, max_mismatches)
+    time_elapsed = timer() - start_time
+    for mismatch in mismatches:
+        click.echo(f'{mismatch.function} is {mismatch.actual} rather than {mismatch.expected} for {mismatch.date}.', err=True)
+    click.echo(f'Checked {checked:,} dates from {datetime.date.fromordinal(first)} to {datetime.date.fromordinal(last)} in {time_elapsed:.2f}s, {checked/max(time_elapsed, 1e-9):,.0f} dates/s.')
+    if mismatches:
+        raise click.ClickException('The calculations disagree with datetime.')
+    click.echo('Every calculation agrees with datetime.')
+
+@click.command(name='calendar')
+@click.argument('years', metavar='YEAR[..YEAR]', type=YearRange())
+@click.option('--format', 'output_format', type=DeferredChoice('calendars', 'RENDERERS'), default='text', help="Output format (json gives an object per year per line).")
+@click.option('-o', '--output', type=click.File('w'), default='-', help="Write the calendars to this file rather than standard output.")
+def wall_calendar(years, output_format, output):
+    """Print the calendar of a year, or of each year in a range."""
+    from . import calendars
+    with profiling.phase('render'):
+        calendars.write_calendars(output, *years, output_format)
+
+@click.command()
+@click.argument('years', metavar='YEAR...', type=click.IntRange(MIN_YEAR, MAX_YEAR), nargs=-1, required=True)
+@click.option('--all', 'which', flag_value='all', default=True, help="List every year with the same calendar (the default).")
+@click.option('--previous', 'which', flag_value='previous', help="Only give the latest earlier year with the same calendar.")
+@click.option('--next', 'which', flag_value='next', help="Only give the earliest later year with the same calendar.")
+def sameyear(years, which):
+    """Find the years with the same calendar as YEAR.
+
+    Gives a line for each YEAR, which is left empty if there is no such year
+    in the supported range of years."""
+    from . import calendars
+    index = calendars.default_index()
+    with profiling.phase('compute'):
+        if which == 'all':
+            lines = [ ' '.join(map(str, index.same_years(year))) for year in years ]
+        else:
+            find = index.previous if which == 'previous' else index.next
+            lines = [ str(find(year) or '') for year in years ]
+    emit('\n'.join(lines))
+
 cli.add_command(leapyear)
 cli.add_command(doomscentury)
 cli.add_command(doomsyear)
 cli.add_command(doomsmonth)
 cli.add_command(dayofweek)
 cli.add_command(test)
+cli.add_command(report)
+cli.add_command(batch)
+cli.add_command(weekday_table)
+cli.add_command(columns)
+cli.add_command(date_range)
+cli.add_command(find)
+cli.add_command(busdays)
+cli.add_command(addbusdays)
+cli.add_command(explain)
+cli.add_command(serve)
+cli.add_command(coprocess)
+cli.add_command(list_engines)
+cli.add_command(check_calculations)
+cli.add_command(wall_calendar)
+cli.add_command(sameyear)
 
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,100 @@
+import datetime
+from . import engines, methods, query
+
+# Days of the week for dates stored as flat binary columns, e.g. in data lake
+# exports, rather than as text. The input columns are memory mapped and
+# processed a window at a time, so that files larger than memory can be
+# handled without reading them in, and the results are written to a memory
+# mapped uint8 column (0 = Sunday, ..., 6 = Saturday) of the same length,
+# with INVALID for the rows that aren't dates.
+
+# The number of rows processed at a time, which bounds the memory used for
+# intermediate arrays.
+DEFAULT_WINDOW = 1 << 22
+
+# The default types of the input columns: little-endian int32 ordinals (as
+# given by datetime.date.toordinal()), or int16 years with int8 months and
+# days.
+ORDINAL_DTYPE = '<i4'
+YEAR_DTYPE = '<i2'
+MONTH_DTYPE = 'i1'
+DAY_DTYPE = 'i1'
+
+# The day of the week written for a row that isn't a date, e.g. with a month
+# of 13 or a day past the end of the month.
+INVALID = 255
+
+# The ordinal of December 31st, 9999, the last date datetime.date handles.
+MAX_ORDINAL = datetime.date.max.toordinal()
+
+# Maps a column file, allowing for empty files, which numpy can't map.
+def _map_column(path, dtype):
+    np = methods._require_numpy()
+    dtype = np.dtype(dtype)
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+    if size % dtype.itemsize:
+        raise ValueError(f"The size of {path} isn't a multiple of {dtype.itemsize} bytes.")
+    if size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+# Creates the output column at path, with the given number of rows.
+def _create_output(path, rows):
+    np = methods._require_numpy()
+    if rows == 0:
+        open(path, 'wb').close()
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='w+', shape=(rows,))
+
+# Writes the days of the week for the ordinals in the column at input_path
+# to a uint8 column at output_path, returning the number of rows and the
+# number of those that aren't dates (ordinals from 1 to MAX_ORDINAL are).
+# Since an ordinal counts days from Monday, January 1st, 1 AD, the day of the
+# week (numbered from Sunday) of each date is simply its ordinal mod 7.
+def weekdays_from_ordinals(input_path, output_path, dtype=ORDINAL_DTYPE, window=DEFAULT_WINDOW):
+    np = methods._require_numpy()
+    ordinals = _map_column(input_path, dtype)
+    output = _create_output(output_path, len(ordinals))
+    invalid = 0
+    for start in range(0, len(ordinals), window):
+        chunk = ordinals[start:start + window]
+        valid = (chunk >= 1) & (chunk <= MAX_ORDINAL)
+        output[start:start + window] = np.where(valid, chunk % 7, INVALID)
+        invalid += len(chunk) - int(np.count_nonzero(valid))
+    if len(output):
+        output.flush()
+    return len(output), invalid
+
+# Writes the days of the week for the dates in the year, month and day
+# columns at the given paths to a uint8 column at output_path, calculated
+# with methods.day_of_week_array() or with the array function of the named
+# engine (see engines.py), and returns the number of rows and the number of
+# those that aren't dates. Only the valid rows of each window are given to
+# the engine, so it never sees a month or day it can't handle.
+def weekdays_from_columns(years_path, months_path, days_path, output_path,
+                          dtypes=(YEAR_DTYPE, MONTH_DTYPE, DAY_DTYPE), window=DEFAULT_WINDOW, engine=None):
+    np = methods._require_numpy()
+    day_of_week_array = engines.get(engine, 'batch').day_of_week_array if engine else methods.day_of_week_array
+    years, months, days = [ _map_column(path, dtype) for path, dtype in zip((years_path, months_path, days_path), dtypes) ]
+    if not len(years) == len(months) == len(days):
+        raise ValueError('The year, month and day columns have different lengths.')
+    output = _create_output(output_path, len(years))
+    month_lengths = np.asarray(query.MONTH_LENGTHS, dtype=np.int64)
+    invalid = 0
+    for start in range(0, len(years), window):
+        end = start + window
+        year, month, day = [ np.asarray(column[start:end], dtype=np.int64) for column in (years, months, days) ]
+        valid = (month >= 1) & (month <= 12)
+        lengths = month_lengths[np.where(valid, month, 0)] + ((month == 2) & methods.leapyear_array(year))
+        valid &= (day >= 1) & (day <= lengths)
+        if valid.all():
+            output[start:end] = day_of_week_array(year, month, day)
+        else:
+            window_output = np.full(len(year), INVALID, dtype=np.uint8)
+            window_output[valid] = day_of_week_array(year[valid], month[valid], day[valid])
+            output[start:end] = window_output
+            invalid += len(year) - int(np.count_nonzero(valid))
+    if len(output):
+        output.flush()
+    return len(output), invalid
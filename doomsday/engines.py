@@ -0,0 +1,240 @@
+import collections, datetime, os, sys
+from timeit import default_timer as timer
+from . import methods, table
+from .methods import EPOCH_ORDINAL, OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+# Interchangeable algorithms for the day of the week, so that the Doomsday
+# rule can be compared with the alternatives and, for bulk use, the fastest
+# one for the job chosen. Each engine has a scalar function taking a year,
+# month and day, and an array function taking arrays of them (which needs
+# NumPy), both giving days of the week as numbers (0 = Sunday). Engines are
+# looked up by name with get(), where the name 'auto' picks the engine that
+# was fastest in a micro-benchmark, which is run once and cached on disk, of
+# those with full_range, i.e. that handle every date (which the table engine,
+# only covering the supported range of dates, doesn't).
+# (Like the command line utility, we import what only the benchmark needs
+# in the functions that need it, to keep start up time down.)
+
+Engine = collections.namedtuple('Engine', 'name description day_of_week day_of_week_array full_range')
+
+ENGINES = {}
+
+def register(name, description, day_of_week, day_of_week_array, full_range=True):
+    ENGINES[name] = Engine(name, description, day_of_week, day_of_week_array, full_range)
+
+# The number of days before the first of each month in a common year.
+DAYS_BEFORE_MONTH = [ 0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334 ]
+
+# The offsets of the months in Sakamoto's method.
+SAKAMOTO_OFFSETS = [ 0, 3, 2, 5, 0, 3, 5, 1, 4, 6, 2, 4 ]
+
+def _arrays(years, months, days):
+    np = methods._require_numpy()
+    return np, np.asarray(years, dtype=np.int64), np.asarray(months, dtype=np.int64), np.asarray(days, dtype=np.int64)
+
+# The number of days since 1970-01-01 of each date.
+def epoch_days(np, years, months, days):
+    first_of_month = ((years - 1970) * 12 + months - 1).astype('datetime64[M]').astype('datetime64[D]')
+    return first_of_month.astype(np.int64) + days - 1
+
+def doomsday(year, month, day):
+    return methods.day_of_week(year, month, day, name=False)
+
+def doomsday_array(years, months, days):
+    return methods.day_of_week_array(years, months, days)
+
+# Zeller's congruence, which counts January and February as the 13th and
+# 14th months of the year before, and numbers the days from Saturday.
+def zeller(year, month, day):
+    if month < 3:
+        month += 12
+        year -= 1
+    k, j = year % 100, year // 100
+    return (day + 13 * (month + 1) // 5 + k + k // 4 + j // 4 + 5 * j + 6) % 7
+
+def zeller_array(years, months, days):
+    np, years, months, days = _arrays(years, months, days)
+    early = months < 3
+    months = months + 12 * early
+    years = years - early
+    k, j = years % 100, years // 100
+    return ((days + 13 * (months + 1) // 5 + k + k // 4 + j // 4 + 5 * j + 6) % 7).astype(np.uint8)
+
+# Sakamoto's method, which also counts January and February with the year
+# before, and takes the months' offsets from a table.
+def sakamoto(year, month, day):
+    if month < 3:
+        year -= 1
+    return (year + year // 4 - year // 100 + year // 400 + SAKAMOTO_OFFSETS[month - 1] + day) % 7
+
+def sakamoto_array(years, months, days):
+    np, years, months, days = _arrays(years, months, days)
+    years = years - (months < 3)
+    return ((years + years // 4 - years // 100 + years // 400 + np.asarray(SAKAMOTO_OFFSETS)[months - 1] + days) % 7).astype(np.uint8)
+
+# Gauss's method for the day of the week of January 1st, counted on by the
+# day of the year.
+def gauss(year, month, day):
+    y = year - 1
+    january_1st = (1 + 5 * (y % 4) + 4 * (y % 100) + 6 * (y % 400)) % 7
+    return (january_1st + DAYS_BEFORE_MONTH[month] + (month > 2 and methods.leapyear(year)) + day - 1) % 7
+
+def gauss_array(years, months, days):
+    np, years, months, days = _arrays(years, months, days)
+    y = years - 1
+    january_1st = 1 + 5 * (y % 4) + 4 * (y % 100) + 6 * (y % 400)
+    leap_day = (months > 2) & methods.leapyear_array(years)
+    return ((january_1st + np.asarray(DAYS_BEFORE_MONTH)[months] + leap_day + days - 1) % 7).astype(np.uint8)
+
+# The date's ordinal, which counts days from Monday, January 1st, 1 AD, mod 7.
+def ordinal(year, month, day):
+    return datetime.date(year, month, day).toordinal() % 7
+
+def ordinal_array(years, months, days):
+    np, years, months, days = _arrays(years, months, days)
+    # 1970-01-01 was a Thursday.
+    return ((epoch_days(np, years, months, days) + 4) % 7).astype(np.uint8)
+
+# A look up in the precomputed weekday table (see table.py), which only
+# covers the supported range of dates.
+def lookup(year, month, day):
+    return table.default_table().day_of_week_ordinal(datetime.date(year, month, day).toordinal())
+
+def lookup_array(years, months, days):
+    np, years, months, days = _arrays(years, months, days)
+    weekdays = table.default_table()
+    index = epoch_days(np, years, months, days) + EPOCH_ORDINAL - weekdays.first
+    if len(index) and (index.min() < 0 or index.max() >= len(weekdays)):
+        raise ValueError('Some of the dates are outside the range of the weekday table.')
+    return np.frombuffer(weekdays.data, dtype=np.uint8)[index]
+
+register('doomsday', "The Doomsday rule, with Fong and Walters' Odds+11 method.", doomsday, doomsday_array)
+register('zeller', "Zeller's congruence.", zeller, zeller_array)
+register('sakamoto', "Sakamoto's method.", sakamoto, sakamoto_array)
+register('gauss', "Gauss's method for January 1st, plus the day of the year.", gauss, gauss_array)
+register('ordinal', "The date's ordinal (days since January 1st, 1 AD) mod 7.", ordinal, ordinal_array)
+register('table', "A look up in the precomputed weekday table.", lookup, lookup_array, full_range=False)
+
+# A disagreement between an engine and datetime over the day of the week of
+# date, found by the engine's scalar or array function.
+Disagreement = collections.namedtuple('Disagreement', 'engine function date expected actual')
+
+# Checks the engines (by default, all of them) against datetime for every
+# date from first to last (ordinals), returning a list of the first
+# disagreement, if any, of each engine's scalar and array functions. The
+# array functions are skipped if NumPy isn't installed.
+def cross_validate(first=OCTOBER_15TH_1582, last=DECEMBER_31ST_2600, names=None):
+    engines = [ ENGINES[name] for name in (names or ENGINES) ]
+    dates = [ datetime.date.fromordinal(ordinal) for ordinal in range(first, last + 1) ]
+    expected = [ date.isoweekday() % 7 for date in dates ]
+    disagreements = []
+    for engine in engines:
+        function = engine.day_of_week
+        for date, dow in zip(dates, expected):
+            actual = function(date.year, date.month, date.day)
+            if actual != dow:
+                disagreements.append(Disagreement(engine.name, 'scalar', date, dow, actual))
+                break
+    np = methods._numpy()
+    if np is not None:
+        since_epoch = np.arange(first, last + 1) - EPOCH_ORDINAL
+        years, months, days = methods._split_datetime64(since_epoch.astype('datetime64[D]'))
+        expected = np.asarray(expected, dtype=np.uint8)
+        for engine in engines:
+            mismatches = np.flatnonzero(engine.day_of_week_array(years, months, days) != expected)
+            if len(mismatches):
+                index = mismatches[0]
+                actual = int(engine.day_of_week_array(years[index:index + 1], months[index:index + 1], days[index:index + 1])[0])
+                disagreements.append(Disagreement(engine.name, 'array', dates[index], int(expected[index]), actual))
+    return disagreements
+
+# The shapes of workload that engines are benchmarked for: 'scalar', one
+# date at a time, and 'batch', whole arrays of dates at once.
+WORKLOADS = [ 'scalar', 'batch' ]
+
+# The number of dates, drawn at random from the supported range, and the
+# number of timing runs (of which the best is kept) in the benchmark.
+BENCHMARK_DATES = 20000
+BENCHMARK_RUNS = 3
+
+# Times the engines (by default, all of them), returning the seconds per
+# date for each workload and engine. The batch workload is only timed if
+# NumPy is installed.
+def benchmark(names=None, size=BENCHMARK_DATES, runs=BENCHMARK_RUNS):
+    import random
+    engines = [ ENGINES[name] for name in (names or ENGINES) ]
+    rng = random.Random(0)
+    dates = [ datetime.date.fromordinal(rng.randint(OCTOBER_15TH_1582, DECEMBER_31ST_2600)) for i in range(size) ]
+    dates = [ (date.year, date.month, date.day) for date in dates ]
+    def best(run):
+        seconds = []
+        for i in range(runs):
+            start = timer()
+            run()
+            seconds.append(timer() - start)
+        return min(seconds) / size
+    results = { 'scalar': {} }
+    for engine in engines:
+        function = engine.day_of_week
+        results['scalar'][engine.name] = best(lambda: [ function(*date) for date in dates ])
+    np = methods._numpy()
+    if np is not None:
+        years, months, days = [ np.asarray(column, dtype=np.int64) for column in zip(*dates) ]
+        results['batch'] = { engine.name: best(lambda: engine.day_of_week_array(years, months, days)) for engine in engines }
+    return results
+
+# Returns where the benchmark results are cached.
+def benchmark_path():
+    return os.path.join(table.cache_directory(), 'engines-benchmark.json')
+
+# Identifies what the cached benchmark results were measured with, so that
+# they are measured again after an upgrade of Python or NumPy, or when an
+# engine is added.
+def _benchmark_key():
+    np = methods._numpy()
+    return { 'python': sys.version.split()[0], 'numpy': None if np is None else np.__version__, 'engines': sorted(ENGINES) }
+
+# Returns the benchmark results cached at path (by default, benchmark_path()),
+# running the benchmark and caching its results first if there are none for
+# the current setup, or if rerun is True.
+def cached_benchmark(path=None, rerun=False):
+    import json
+    path = path or benchmark_path()
+    key = _benchmark_key()
+    if not rerun:
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return cached['results']
+        except (OSError, ValueError):
+            pass
+    results = benchmark()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump({ 'key': key, 'results': results }, f, indent=2)
+    os.replace(temporary, path)
+    return results
+
+# Returns the name of the fastest of the engines with full_range in timings
+# (the benchmark results for a workload).
+def fastest(timings):
+    return min((name for name in timings if name in ENGINES and ENGINES[name].full_range), key=timings.get)
+
+# Returns the name of the fastest engine with full_range for the workload,
+# according to the cached benchmark. Without NumPy, batches are computed a
+# date at a time, so the scalar timings are used for them too.
+def select(workload='scalar', path=None):
+    results = cached_benchmark(path)
+    return fastest(results.get(workload) or results['scalar'])
+
+# Returns the engine with the given name, or for 'auto', the fastest engine
+# for the workload.
+def get(name='doomsday', workload='scalar'):
+    if name == 'auto':
+        name = select(workload)
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f'There is no day of the week engine called {name!r}.')
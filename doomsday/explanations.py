@@ -0,0 +1,273 @@
+import collections, datetime, functools, json
+from . import methods
+
+# Structured explanations of the Doomsday calculations, for rendering worked
+# examples as plain text (the walkthroughs given by the --explain options),
+# JSON or Markdown, in bulk as well as one at a time. Each part of a day of
+# the week calculation only depends on part of the date: the doomscentury on
+# the century, the doomsyear on the year of the century, and the month's
+# Doomsday on the month and whether it's a leap year. So each part is built
+# (and its rendering, where that doesn't depend on the date) memoized on
+# just what it depends on, and shared between all the dates it applies to.
+
+MONTH_NAMES = [ None, 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+                'August', 'September', 'October', 'November', 'December' ]
+
+# From http://stackoverflow.com/questions/739241/python-date-ordinal-output,
+# we include a routine for providing an ordinal description of the day of the date.
+def date_ordinal(n):
+    if 10 <= n % 100 < 20:
+        return str(n) + 'th'
+    else:
+        return  str(n) + {1 : 'st', 2 : 'nd', 3 : 'rd'}.get(n % 10, "th")
+
+# Since datetime.strftime() doesn't handle years earlier than 1900, we provide own date string function.
+def date_str(date):
+    return "%s %s, %d" % (MONTH_NAMES[date.month], date_ordinal(date.day), date.year)
+
+# A date in either calendar, since datetime.date can't hold e.g. February
+# 29th, 1700, which was a date where the Julian calendar was in use.
+class Date(collections.namedtuple('Date', 'year month day')):
+    __slots__ = ()
+
+    def isoformat(self):
+        return '%04d-%02d-%02d' % self
+
+# In the explanations of the day of week calculations, we want to use
+# the correct tense of the verbs "to fall" and "to be".
+def correct_tense(date, past, present, future):
+    today = datetime.date.today()
+    date, today = (date.year, date.month, date.day), (today.year, today.month, today.day)
+    if date < today:
+        return past
+    elif date == today:
+        return present
+    else:
+        return future
+
+# Which rule decides whether or not a year is a leap year: divisible by
+# '400', by '100', by '4', or 'none' of them.
+LeapYearExplanation = collections.namedtuple('LeapYearExplanation', 'year rule leap')
+
+# The steps of the doomscentury formula for century c (i.e. year // 100 + 1).
+CenturyExplanation = collections.namedtuple('CenturyExplanation', 'c five_c quarter total remainder plus_thursday doomscentury')
+
+# The anchor day of a century of the Julian calendar (see methods.py).
+JulianCenturyExplanation = collections.namedtuple('JulianCenturyExplanation', 'century doomscentury')
+
+# The steps of the Odds+11 method for the year of the century x, where
+# expression shows the steps taken, e.g. '((3+11)/2)+11'.
+YearExplanation = collections.namedtuple('YearExplanation', 'x expression total remainder doomsyear')
+
+# The Doomsday of a month, which only depends on the month and, for January
+# and February, whether or not it's a leap year.
+MonthExplanation = collections.namedtuple('MonthExplanation', 'month leap doomsday')
+
+# The whole day of the week calculation for a date in calendar ('gregorian'
+# or 'julian').
+DayOfWeekExplanation = collections.namedtuple('DayOfWeekExplanation', 'date century year month doomsmonth total day_of_week calendar')
+
+@functools.lru_cache(maxsize=4096)
+def explain_leapyear(year):
+    if year % 400 == 0:
+        rule = '400'
+    elif year % 100 == 0:
+        rule = '100'
+    elif year % 4 == 0:
+        rule = '4'
+    else:
+        rule = 'none'
+    return LeapYearExplanation(year, rule, methods.leapyear(year))
+
+@functools.lru_cache(maxsize=1024)
+def _explain_century(c):
+    five_c = 5 * c
+    quarter = (c - 1) // 4
+    total = five_c + quarter
+    remainder = total % 7
+    return CenturyExplanation(c, five_c, quarter, total, remainder, remainder + 4, (remainder + 4) % 7)
+
+def explain_doomscentury(year):
+    return _explain_century(year // 100 + 1)
+
+@functools.lru_cache(maxsize=1024)
+def _explain_julian_century(century):
+    return JulianCenturyExplanation(century, (methods.JULIAN_CENTURY_ANCHOR - century) % 7)
+
+def explain_julian_doomscentury(year):
+    return _explain_julian_century(year // 100)
+
+@functools.lru_cache(maxsize=100)
+def _explain_year_of_century(x):
+    total = x
+    expression = str(x)
+    if total % 2 == 1:
+        expression = "(%d+11)" % x
+        total = total + 11
+    total = total // 2
+    expression = expression + '/2'
+    if total % 2 == 1:
+        expression = "(%s)+11" % expression
+        total = total + 11
+    return YearExplanation(x, expression, total, total % 7, (7 - total % 7) % 7)
+
+def explain_doomsyear(year):
+    return _explain_year_of_century(year % 100)
+
+@functools.lru_cache(maxsize=24)
+def _explain_month(month, leap):
+    return MonthExplanation(month, leap, (methods.LEAP_MONTH_DOOMSDAYS if leap else methods.MONTH_DOOMSDAYS)[month])
+
+def explain_doomsmonth(year, month):
+    return _explain_month(month, methods.leapyear(year))
+
+def explain_day_of_week(year, month, day, calendar='gregorian'):
+    if calendar == 'julian':
+        century = explain_julian_doomscentury(year)
+        month_doomsday = _explain_month(month, methods.julian_leapyear(year))
+    else:
+        century = explain_doomscentury(year)
+        month_doomsday = explain_doomsmonth(year, month)
+    year_of_century = explain_doomsyear(year)
+    doomsmonth = day - month_doomsday.doomsday
+    total = century.doomscentury + year_of_century.doomsyear + doomsmonth
+    return DayOfWeekExplanation(Date(year, month, day), century, year_of_century, month_doomsday, doomsmonth, total, total % 7, calendar)
+
+# Plain text renderings, which are the walkthroughs given by --explain.
+
+def _day_name(dow):
+    return methods.DAYS_OF_THE_WEEK_NAMES[dow]
+
+def leapyear_text(explanation):
+    year = explanation.year
+    if explanation.rule == '400':
+        return f'{year} is evenly divisible by 400, so it is a leap year.\n'
+    elif explanation.rule == '100':
+        return f'{year} is not evenly divisible by 400, but is evenly divisible by 100, so it is not a leap year.\n'
+    elif explanation.rule == '4':
+        return f'{year} is not evenly divisible by neither 400 nor 100, but is evenly divisible by 4, so it is a leap year.\n'
+    else:
+        return f'{year} is not evenly divisible by neither 400, 100, nor 4, so it is not a leap year.\n'
+
+@functools.lru_cache(maxsize=1024)
+def doomscentury_text(explanation):
+    e = explanation
+    return ("doomcentury = ((5*%d + floor(%d/4)) mod 7 + Thursday) mod 7\n" % (e.c, e.c-1) +
+            "            = ((%d + %d) mod 7 + Thursday) mod 7\n" % (e.five_c, e.quarter) +
+            "            = (%d mod 7 + 4) mod 7\n" % e.total +
+            "            = (%d + 4) mod 7\n" % e.remainder +
+            "            = %d mod 7\n" % e.plus_thursday +
+            "            = %d, i.e. %s\n" % (e.doomscentury, _day_name(e.doomscentury)))
+
+# In the Julian calendar, the anchor day goes back a day each century.
+@functools.lru_cache(maxsize=1024)
+def julian_doomscentury_text(explanation):
+    e = explanation
+    return ("doomcentury = (Sunday - %d) mod 7\n" % e.century +
+            "            = (0 - %d) mod 7\n" % e.century +
+            "            = %d, i.e. %s\n" % (e.doomscentury, _day_name(e.doomscentury)))
+
+@functools.lru_cache(maxsize=100)
+def doomsyear_text(explanation):
+    e = explanation
+    return ("doomsyear   = 7's complement of (%s mod 7)\n" % e.expression +
+            "            = 7's complement of (%d mod 7)\n" % e.total +
+            "            = 7's complement of %d\n" % e.remainder +
+            "            = %d, i.e. %s\n" % (e.doomsyear, _day_name(e.doomsyear)))
+
+# Unlike the other parts, this depends on the date (and today's date, for
+# the tense of the verbs), so isn't memoized.
+def doomsmonth_text(explanation, date):
+    e = explanation
+    text = ''
+    if e.month <= 2:
+        text += "%d %s%s a leap year, so\n" % (date.year, correct_tense(date, "was", "is", "will be"), "" if e.leap else " not")
+    month_doomsday_date = Date(date.year, e.month, e.doomsday)
+    text += "%s %s on a Doomsday.\n" % (date_str(month_doomsday_date), correct_tense(month_doomsday_date, "fell", "falls", "will fall"))
+    text += "doomsmonth  = %d - %s\n" % (date.day, e.doomsday)
+    text += "            = %d\n" % (date.day - e.doomsday)
+    return text
+
+# The final step of the day of the week calculation.
+def day_of_week_sum_text(explanation):
+    e = explanation
+    text = ("day of week = (doomscentury + doomsyear + doomsmonth) mod 7\n" +
+            "            = (%d + %d + %d) mod 7\n" % (e.century.doomscentury, e.year.doomsyear, e.doomsmonth) +
+            "            = %d mod 7\n" % e.total)
+    if e.total < 0:
+        text += "            = 7's complement of (%d mod 7)\n" % -e.total
+        text += "            = 7's complement of %d\n" % (-e.total % 7)
+    text += "            = %d, i.e. %s\n" % (e.day_of_week, _day_name(e.day_of_week))
+    return text
+
+# Which calendar a date was in, in a region (a regions.Region).
+def calendar_text(region, explanation):
+    e = explanation
+    if region.cutover is None:
+        return "%s is a date in %s.\n" % (date_str(e.date), region.name)
+    last_julian = Date(*region.cutover.last_julian)
+    return ("%s used the Julian calendar until %s, so %s %s a %s date.\n" %
+            (region.name, date_str(last_julian), date_str(e.date), correct_tense(e.date, "was", "is", "will be"), e.calendar.capitalize()))
+
+# The four steps of the day of the week calculation.
+def day_of_week_steps(explanation):
+    e = explanation
+    c, y = e.date.year // 100 + 1, e.date.year % 100
+    if e.calendar == 'julian':
+        century = ("Calculate the anchor day for the %s century of the Julian calendar." % date_ordinal(c), julian_doomscentury_text(e.century))
+    else:
+        century = ("Calculate the anchor day for the %s century." % date_ordinal(c), doomscentury_text(e.century))
+    return [
+        ("Calculate the doomsyear for the %s year of the %s century." % (date_ordinal(y), date_ordinal(c)), doomsyear_text(e.year)),
+        century,
+        ("Calculate the doomsmonth for %s of the year." % MONTH_NAMES[e.date.month], doomsmonth_text(e.month, e.date)),
+        ("Calculate the day of the week.", day_of_week_sum_text(e)),
+    ]
+
+def day_of_week_text(explanation):
+    return ''.join(f'{number}) {title}\n{text}' for number, (title, text) in enumerate(day_of_week_steps(explanation), 1))
+
+# Markdown renderings, as a heading followed by numbered steps, each with
+# the working as a code block.
+
+def day_of_week_markdown(explanation):
+    e = explanation
+    calendar = ' (Julian)' if e.calendar == 'julian' else ''
+    markdown = f'## {date_str(e.date)}{calendar}: {_day_name(e.day_of_week)}\n\n'
+    for number, (title, text) in enumerate(day_of_week_steps(explanation), 1):
+        markdown += f'{number}. {title}\n\n    ```\n' + ''.join(f'    {line}\n' for line in text.splitlines()) + '    ```\n\n'
+    return markdown
+
+# JSON renderings, nesting the parts of an explanation as objects, with the
+# days of the week given by name as well as by number.
+
+def to_dict(explanation):
+    d = {}
+    for field, value in explanation._asdict().items():
+        if isinstance(value, (Date, datetime.date)):
+            value = value.isoformat()
+        elif isinstance(value, tuple):
+            value = to_dict(value)
+        d[field] = value
+    for field in ('doomscentury', 'doomsyear', 'day_of_week'):
+        if field in d:
+            d[field + '_name'] = _day_name(d[field])
+    return d
+
+def day_of_week_json(explanation):
+    return json.dumps(to_dict(explanation))
+
+RENDERERS = {
+    'text': day_of_week_text,
+    'json': day_of_week_json,
+    'markdown': day_of_week_markdown,
+}
+
+# Lazily yields the explanations of the day of the week calculations for
+# an iterable of (year, month, day) triples, or (year, month, day, calendar)
+# for dates that aren't Gregorian, rendered in the given format ('text',
+# 'json' or 'markdown').
+def explain_many(dates, format='text'):
+    render = RENDERERS[format]
+    for date in dates:
+        yield render(explain_day_of_week(*date))
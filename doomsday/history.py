@@ -0,0 +1,91 @@
+import collections, datetime, os, struct
+from . import methods
+
+# A local, append-only record of the answers given in `doomsday test`
+# sessions, so that accuracy and speed can be tracked across sessions. Each
+# answer is stored as a fixed-size binary record, so appending is cheap and
+# reading tens of thousands of answers back is a single struct.iter_unpack().
+
+# Each record holds when the answer was given (seconds since the epoch), the
+# session it was given in (the session's start time, in whole seconds), the
+# ordinal of the date asked about, how long the answer took (in seconds),
+# whether it was correct, and the components of the date that the Doomsday
+# calculation works on: its century, year of the century, month, and
+# whether or not it's in a leap year.
+RECORD = struct.Struct('<dIif?hBB?')
+
+Answer = collections.namedtuple('Answer', 'timestamp session ordinal latency correct century year_of_century month leap')
+
+# Returns where the history is kept, by default under $XDG_DATA_HOME/doomsday
+# (or ~/.local/share/doomsday), or at $DOOMSDAY_HISTORY if that is set.
+def default_path():
+    path = os.environ.get('DOOMSDAY_HISTORY')
+    if path is None:
+        data_home = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        path = os.path.join(data_home, 'doomsday', 'history.bin')
+    return path
+
+# Returns the Answer for a question about date.
+def answer(date, latency, correct, session, timestamp):
+    year = date.year
+    return Answer(timestamp, session, date.toordinal(), latency, correct, year // 100, year % 100, date.month, methods.leapyear(year))
+
+# Appends answers to the history at path. A partly written record at the
+# end is cut off first, so that the new records stay aligned.
+def append(path, answers):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'ab') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size % RECORD.size:
+            f.truncate(size - size % RECORD.size)
+        f.write(b''.join(RECORD.pack(*answer) for answer in answers))
+
+# Returns all of the answers in the history at path, oldest first. A partly
+# written record at the end (e.g. from a crash while appending) is ignored.
+def read(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    data = data[:len(data) - len(data) % RECORD.size]
+    return [ Answer._make(fields) for fields in RECORD.iter_unpack(data) ]
+
+# Returns the pth percentile (nearest rank) of a sorted list of values.
+def percentile(values, p):
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+# Summarizes the latencies and accuracy of a list of answers.
+def _summary(answers):
+    latencies = sorted(answer.latency for answer in answers)
+    return {
+        'answers': len(answers),
+        'accuracy': sum(answer.correct for answer in answers) / len(answers) if answers else None,
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+    }
+
+# The components of a date that answers are grouped by in a report.
+COMPONENTS = [ 'century', 'year_of_century', 'month', 'leap' ]
+
+# Aggregates the answers: overall, by each component of the date (slowest
+# first, by mean latency), and by session (oldest first, giving the trend
+# over time). Answers are grouped in a single pass.
+def report(answers):
+    groups = { component: collections.defaultdict(list) for component in COMPONENTS }
+    sessions = collections.defaultdict(list)
+    for answer in answers:
+        for component in COMPONENTS:
+            groups[component][getattr(answer, component)].append(answer)
+        sessions[answer.session].append(answer)
+    by_component = {}
+    for component in COMPONENTS:
+        summaries = [ dict(_summary(group), value=value) for value, group in groups[component].items() ]
+        by_component[component] = sorted(summaries, key=lambda summary: summary['mean'], reverse=True)
+    trend = [ dict(_summary(group), session=session, started=datetime.datetime.fromtimestamp(session).isoformat(timespec='seconds'))
+              for session, group in sorted(sessions.items()) ]
+    return { 'overall': _summary(answers), 'sessions': len(sessions), 'by_component': by_component, 'trend': trend }
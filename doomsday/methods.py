@@ -1,3 +1,37 @@
+import collections, datetime, os
+
+# NumPy is only needed for the whole-array versions of the calculations
+# below, so we don't require it for the scalar functions or the trainer.
+# Since importing it takes longer than a whole command line invocation
+# otherwise does, it's imported on first use by _numpy() instead of here.
+np = None
+
+# Given that the Doomsday algorithm works for the Gregorian calendar,
+# we refrain from training on or tabulating dates earlier than the date of its earliest
+# adoption, October 15th, 1582. (Dates in the Julian calendar, and its
+# replacement at different times in different regions, are handled by the
+# julian_* functions below and regions.py.)
+OCTOBER_15TH_1582 = datetime.date(1582, 10, 15).toordinal()
+
+# Additionally, we arbitrarily limit training and tabulation to dates no later than
+# the last day of the year 2600.
+DECEMBER_31ST_2600 = datetime.date(2600, 12, 31).toordinal()
+
+# The ordinal of 1970-01-01, the epoch of NumPy's datetime64, from which it
+# counts days.
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# The default number of years held by the year anchor cache (see
+# YearAnchorCache below), which covers the whole training range.
+DEFAULT_ANCHOR_CACHE_SIZE = 1024
+
+# The range of years accepted by the command line utility for a YEAR, which
+# defaults to the range of years we train on, but can be widened (the
+# calculations work for any proleptic Gregorian year) by setting the
+# DOOMSDAY_MIN_YEAR and DOOMSDAY_MAX_YEAR environment variables.
+MIN_YEAR = int(os.environ.get('DOOMSDAY_MIN_YEAR', 1582))
+MAX_YEAR = int(os.environ.get('DOOMSDAY_MAX_YEAR', 2600))
+
 # We store the strings for the names of the days of the week so that we can map
 # the computed day of the week to its name.
 DAYS_OF_THE_WEEK_NAMES = [ 'Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday' ]
@@ -15,22 +49,26 @@ def leapyear(year):
 
 # The first term in the doomsday.day_of_week() calculation, using
 # the formula given in http://en.wikipedia.org/wiki/Doomsday_rule#Finding_a_century.27s_anchor_day.
+# We take the century with floor division rather than from the year's
+# leading digits, so that this (and doomsyear(), which takes the year of
+# the century as year % 100) works for any proleptic Gregorian year, e.g.
+# 258, 12345, or -1 (i.e. 2 BC, which is the 99th year of century -1).
 def doomscentury(year):
     thursday = 4
-    c = int(str(year)[0:2]) + 1
-    return int((((5 * c) + ((c - 1) / 4)) % 7) + thursday) % 7
+    c = year // 100 + 1
+    return ((5 * c + (c - 1) // 4) % 7 + thursday) % 7
 
 # The second term in the doomsday.day_of_week() calculation, using
 # Fong and Walters' Odds+11 method from http://arxiv.org/abs/1010.0765.
 def doomsyear(year):
-    x = int(str(year)[2:])
+    x = year % 100
     if x % 2 == 1:
         x = x + 11
-    x = x / 2
+    x = x // 2
     if x % 2 == 1:
         x = x + 11
     x = x % 7
-    return int((7 - x) % 7)
+    return (7 - x) % 7
 
 # The third term in the doomsday.day_of_week() calculation, calculating
 # the difference in days between the day of the month in question and
@@ -66,11 +104,200 @@ def doomsmonth(year, month, day):
     else: # month == 11
         return day - 7
 
+# The day of the month that is a Doomsday for each month of the year, indexed
+# by month (index 0 is unused), for common and leap years respectively. These
+# are the same reference days that doomsmonth() walks through case by case.
+MONTH_DOOMSDAYS = [ 0, 10, 21, 7, 4, 9, 6, 11, 8, 5, 10, 7, 12 ]
+LEAP_MONTH_DOOMSDAYS = [ 0, 11, 22, 7, 4, 9, 6, 11, 8, 5, 10, 7, 12 ]
+
+# A cache of the Doomsday of each year (i.e. doomscentury + doomsyear, mod 7)
+# along with whether or not the year is a leap year, for workloads where many
+# dates fall in relatively few years. The cache holds at most maxsize years,
+# evicting the least recently used year when full, and counts its hits,
+# misses and evictions.
+class YearAnchorCache:
+    def __init__(self, maxsize=DEFAULT_ANCHOR_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.anchors = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Returns (doomsday of year, leapyear(year)).
+    def get(self, year):
+        try:
+            anchor = self.anchors[year]
+        except KeyError:
+            self.misses += 1
+            anchor = ((doomscentury(year) + doomsyear(year)) % 7, leapyear(year))
+            self.anchors[year] = anchor
+            if len(self.anchors) > self.maxsize:
+                self.anchors.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self.anchors.move_to_end(year)
+        return anchor
+
+    # Whole-array version of day_of_week() with the cache, looking each
+    # distinct year up once, which counts as one hit or miss.
+    def day_of_week_array(self, years, months, days):
+        _require_numpy()
+        distinct, inverse = np.unique(np.asarray(years, dtype=np.int64), return_inverse=True)
+        anchors, leaps = zip(*map(self.get, distinct.tolist())) if len(distinct) else ((), ())
+        leap = np.asarray(leaps, dtype=bool)[inverse]
+        month_doomsdays = np.where(leap, np.asarray(LEAP_MONTH_DOOMSDAYS)[months], np.asarray(MONTH_DOOMSDAYS)[months])
+        dow = np.asarray(anchors, dtype=np.int64)[inverse] + np.asarray(days, dtype=np.int64) - month_doomsdays
+        return (dow % 7).astype(np.uint8)
+
+    def info(self):
+        return { 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.anchors), 'maxsize': self.maxsize }
+
+    def clear(self):
+        self.anchors.clear()
+        self.hits = self.misses = self.evictions = 0
+
+# The cache used by day_of_week(), if any. The cache is off by default, and
+# is switched on and off with enable_anchor_cache() and disable_anchor_cache().
+anchor_cache = None
+
+def enable_anchor_cache(maxsize=DEFAULT_ANCHOR_CACHE_SIZE):
+    global anchor_cache
+    anchor_cache = YearAnchorCache(maxsize)
+    return anchor_cache
+
+def disable_anchor_cache():
+    global anchor_cache
+    anchor_cache = None
+
 # The key equation for the Doomsday algorithm per Fong and Walters in
-# http://arxiv.org/abs/1010.0765.
+# http://arxiv.org/abs/1010.0765. With the anchor cache on, the first two
+# terms and the leap year come from the cache, and the third term from
+# the month's Doomsday in MONTH_DOOMSDAYS or LEAP_MONTH_DOOMSDAYS.
 def day_of_week(year, month, day, name=True):
-    dow = (doomscentury(year) + doomsyear(year) + doomsmonth(year, month, day)) % 7
+    if anchor_cache is None:
+        dow = (doomscentury(year) + doomsyear(year) + doomsmonth(year, month, day)) % 7
+    else:
+        anchor, leap = anchor_cache.get(year)
+        dow = (anchor + day - (LEAP_MONTH_DOOMSDAYS if leap else MONTH_DOOMSDAYS)[month]) % 7
     if name:
         return DAYS_OF_THE_WEEK_NAMES[dow]
     else:
         return dow
+
+# The Julian calendar, which the Gregorian calendar replaced (at different
+# times in different places, see regions.py), has a leap year every 4 years,
+# so the doomsyear, which only depends on the year of the century, is the
+# same. But a Julian century is 36525 days, 1 more than a multiple of 7, so
+# the anchor day of each century is a day earlier than the one before. The
+# anchor day of the century starting with year 0, Sunday, was calibrated by
+# counting the days to the Doomsdays of years 1 to 2999 with the Julian day
+# numbers of astronomy, which the tests do again.
+JULIAN_CENTURY_ANCHOR = 0
+
+def julian_leapyear(year):
+    return year % 4 == 0
+
+def julian_doomscentury(year):
+    return (JULIAN_CENTURY_ANCHOR - year // 100) % 7
+
+# The day of the week of a date in the Julian calendar, with the third term
+# from the month's Doomsday as in day_of_week() with the anchor cache on.
+def julian_day_of_week(year, month, day, name=True):
+    month_doomsday = (LEAP_MONTH_DOOMSDAYS if julian_leapyear(year) else MONTH_DOOMSDAYS)[month]
+    dow = (julian_doomscentury(year) + doomsyear(year) + day - month_doomsday) % 7
+    if name:
+        return DAYS_OF_THE_WEEK_NAMES[dow]
+    else:
+        return dow
+
+# Returns the numpy module, importing it on first use, or None if NumPy isn't installed.
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+def _require_numpy():
+    if _numpy() is None:
+        raise ImportError("NumPy is required for the array versions of the Doomsday calculations; install doomsday[numpy].")
+    return np
+
+# Splits a datetime64 array into arrays of years, months and days.
+def _split_datetime64(dates):
+    _require_numpy()
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    months_since_epoch = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = months_since_epoch.astype(np.int64) % 12 + 1
+    days = (dates - months_since_epoch).astype(np.int64) + 1
+    return years, months, days
+
+# Whole-array version of leapyear().
+def leapyear_array(years):
+    _require_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+# Whole-array version of doomscentury().
+def doomscentury_array(years):
+    _require_numpy()
+    c = np.asarray(years, dtype=np.int64) // 100 + 1
+    return ((5 * c + (c - 1) // 4) % 7 + 4) % 7
+
+# Whole-array version of doomsyear(), applying the Odds+11 steps with masks.
+def doomsyear_array(years):
+    _require_numpy()
+    x = np.asarray(years, dtype=np.int64) % 100
+    x = x + 11 * (x % 2)
+    x = x // 2
+    x = x + 11 * (x % 2)
+    return (7 - x % 7) % 7
+
+# Whole-array version of doomsmonth(), looking the month's Doomsday up in
+# MONTH_DOOMSDAYS or LEAP_MONTH_DOOMSDAYS.
+def doomsmonth_array(years, months, days):
+    _require_numpy()
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    month_doomsdays = np.where(leapyear_array(years),
+                               np.asarray(LEAP_MONTH_DOOMSDAYS)[months],
+                               np.asarray(MONTH_DOOMSDAYS)[months])
+    return days - month_doomsdays
+
+# Whole-array version of day_of_week(), for annotating many dates at once.
+# Takes arrays of years, months and days, or a single datetime64 array in
+# place of the years, and returns the day of the week of each date as a
+# uint8 array (0 = Sunday, ..., 6 = Saturday).
+def day_of_week_array(years, months=None, days=None):
+    _require_numpy()
+    if months is None and days is None:
+        years, months, days = _split_datetime64(years)
+    elif months is None or days is None:
+        raise ValueError("day_of_week_array() takes either a datetime64 array or arrays of years, months and days.")
+    years = np.asarray(years, dtype=np.int64)
+    dow = (doomscentury_array(years) + doomsyear_array(years) + doomsmonth_array(years, months, days)) % 7
+    return dow.astype(np.uint8)
+
+# Whole-array versions of the Julian calendar functions.
+def julian_leapyear_array(years):
+    _require_numpy()
+    return np.asarray(years, dtype=np.int64) % 4 == 0
+
+def julian_doomscentury_array(years):
+    _require_numpy()
+    return (JULIAN_CENTURY_ANCHOR - np.asarray(years, dtype=np.int64) // 100) % 7
+
+def julian_day_of_week_array(years, months, days):
+    _require_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    month_doomsdays = np.where(julian_leapyear_array(years),
+                               np.asarray(LEAP_MONTH_DOOMSDAYS)[months],
+                               np.asarray(MONTH_DOOMSDAYS)[months])
+    dow = julian_doomscentury_array(years) + doomsyear_array(years) + np.asarray(days, dtype=np.int64) - month_doomsdays
+    return (dow % 7).astype(np.uint8)
@@ -0,0 +1,117 @@
+from . import methods, query
+
+# Parsing dates in bulk input straight from the bytes read, rather than with
+# strptime(), which decodes each line to a str and then tries each of the
+# formats in turn. Both parsers here read the digits at fixed positions in
+# YYYY-MM-DD, YYYY-MM-DDTHH:MM:SS or YYYY-MM-DD HH:MM:SS (with surrounding
+# whitespace ignored), and check that the month, day and time are in range,
+# without creating any str or datetime objects along the way. parse_date()
+# takes one line at a time, while parse_dates() takes a buffer of many
+# lines and parses all of them at once with NumPy, which views the buffer
+# without copying it. Both are stricter than strptime(), which also accepts
+# e.g. months and days without leading zeros, so a line they reject should be
+# given to strptime() before being treated as invalid.
+
+WHITESPACE = b' \t\n\r\x0b\x0c'
+
+# The positions of the digits of the year, month and day, and of the hours,
+# minutes and seconds, in a date.
+DATE_DIGITS = [ 0, 1, 2, 3, 5, 6, 8, 9 ]
+TIME_DIGITS = [ 11, 12, 14, 15, 17, 18 ]
+
+# The lengths of a date without and with a time.
+DATE_LENGTH = 10
+DATE_TIME_LENGTH = 19
+
+DASH, COLON, T, SPACE = ord('-'), ord(':'), ord('T'), ord(' ')
+
+# Returns (year, month, day) for the date in buffer (bytes, a bytearray or a
+# memoryview holding one line), or None if it isn't a valid date in one of
+# the formats above. February 29th is valid in the years that leapyear()
+# (by default, the Gregorian one) says are leap years.
+def parse_date(buffer, leapyear=methods.leapyear):
+    start, end = 0, len(buffer)
+    while start < end and buffer[start] in WHITESPACE:
+        start += 1
+    while end > start and buffer[end - 1] in WHITESPACE:
+        end -= 1
+    if end - start == DATE_TIME_LENGTH:
+        if buffer[start + 10] not in (T, SPACE) or buffer[start + 13] != COLON or buffer[start + 16] != COLON:
+            return None
+        time = [ buffer[start + i] - 48 for i in TIME_DIGITS ]
+        for digit in time:
+            if not 0 <= digit <= 9:
+                return None
+        if time[0] * 10 + time[1] > 23 or time[2] > 5 or time[4] > 5:
+            return None
+    elif end - start != DATE_LENGTH:
+        return None
+    if buffer[start + 4] != DASH or buffer[start + 7] != DASH:
+        return None
+    digits = [ buffer[start + i] - 48 for i in DATE_DIGITS ]
+    for digit in digits:
+        if not 0 <= digit <= 9:
+            return None
+    year = digits[0] * 1000 + digits[1] * 100 + digits[2] * 10 + digits[3]
+    month = digits[4] * 10 + digits[5]
+    day = digits[6] * 10 + digits[7]
+    if year < 1 or not 1 <= month <= 12:
+        return None
+    month_lengths = query.LEAP_MONTH_LENGTHS if leapyear(year) else query.MONTH_LENGTHS
+    if not 1 <= day <= month_lengths[month]:
+        return None
+    return year, month, day
+
+# Returns arrays of the years, months and days of the dates on each line of
+# buffer (separated by newlines, with a final newline being optional), along
+# with a boolean array of which lines hold valid dates. The years, months
+# and days of the other lines are 0. As for parse_date(), February 29th is
+# valid in the years that leapyear_array() says are leap years.
+def parse_dates(buffer, leapyear_array=None):
+    np = methods._require_numpy()
+    leapyear_array = leapyear_array or methods.leapyear_array
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([ 0 ], newlines + 1))
+    ends = np.concatenate((newlines, [ len(data) ]))
+    if len(data) == 0 or data[-1] == ord('\n'):
+        starts, ends = starts[:-1], ends[:-1]
+    if len(data) == 0:
+        empty = np.zeros(len(starts), dtype=np.int64)
+        return empty, empty.copy(), empty.copy(), np.zeros(len(starts), dtype=bool)
+    # Strip whitespace from the ends of each line, a character at a time.
+    space = np.zeros(256, dtype=bool)
+    space[list(WHITESPACE)] = True
+    while True:
+        strip = (ends > starts) & space[data[np.maximum(ends - 1, 0)]]
+        if not strip.any():
+            break
+        ends = ends - strip
+    while True:
+        strip = (starts < ends) & space[data[np.minimum(starts, len(data) - 1)]]
+        if not strip.any():
+            break
+        starts = starts + strip
+    lengths = ends - starts
+    # Gather the first 19 characters of each line, as digit values. Lines
+    # shorter than that pick up characters from the lines after them (or
+    # repeat the last character of the buffer), which are ignored.
+    positions = np.minimum(starts[:, None] + np.arange(DATE_TIME_LENGTH), len(data) - 1)
+    fields = data[positions].astype(np.int64) - 48
+    date_digits = fields[:, DATE_DIGITS]
+    valid = ((lengths == DATE_LENGTH) | (lengths == DATE_TIME_LENGTH))
+    valid &= ((date_digits >= 0) & (date_digits <= 9)).all(axis=1)
+    valid &= (fields[:, 4] == DASH - 48) & (fields[:, 7] == DASH - 48)
+    time_digits = fields[:, TIME_DIGITS]
+    time_valid = ((fields[:, 10] == T - 48) | (fields[:, 10] == SPACE - 48))
+    time_valid &= (fields[:, 13] == COLON - 48) & (fields[:, 16] == COLON - 48)
+    time_valid &= ((time_digits >= 0) & (time_digits <= 9)).all(axis=1)
+    time_valid &= (time_digits[:, 0] * 10 + time_digits[:, 1] <= 23) & (time_digits[:, 2] <= 5) & (time_digits[:, 4] <= 5)
+    valid &= (lengths == DATE_LENGTH) | time_valid
+    years = date_digits[:, 0] * 1000 + date_digits[:, 1] * 100 + date_digits[:, 2] * 10 + date_digits[:, 3]
+    months = date_digits[:, 4] * 10 + date_digits[:, 5]
+    days = date_digits[:, 6] * 10 + date_digits[:, 7]
+    valid &= (years >= 1) & (months >= 1) & (months <= 12)
+    month_lengths = np.asarray(query.MONTH_LENGTHS)[np.clip(months, 0, 12)] + ((months == 2) & leapyear_array(years))
+    valid &= (days >= 1) & (days <= month_lengths)
+    return np.where(valid, years, 0), np.where(valid, months, 0), np.where(valid, days, 0), valid
@@ -0,0 +1,113 @@
+from time import perf_counter, process_time
+
+# Finding out where the time goes in a doomsday invocation. While a Profiler
+# is active, code wrapped in phase(name) has its wall clock and CPU time
+# added to the named phase (less the time of any phases nested in it), and
+# the profiler can also run cProfile and dump its statistics to a file for
+# pstats. When no profiler is active, phase() returns a shared do-nothing
+# context manager, so that leaving the phases in costs next to nothing.
+#
+#   with profiling.Profiler('doomsday.pstats', sys.stderr):
+#       with profiling.phase('compute'):
+#           ...
+
+# The profiler that phase() records to, if any.
+active = None
+
+# The (wall, CPU) seconds taken to import the command line interface, as
+# recorded by the doomsday entry point, or None.
+import_times = None
+
+def record_import(wall, cpu):
+    global import_times
+    import_times = (wall, cpu)
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NO_PHASE = _NoPhase()
+
+# Returns a context manager timing the code in it as the named phase of the
+# active profiler, if there is one.
+def phase(name):
+    if active is None:
+        return NO_PHASE
+    return _Phase(active, name)
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.stack.append([ 0.0, 0.0 ])
+        self.wall, self.cpu = perf_counter(), process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall, cpu = perf_counter() - self.wall, process_time() - self.cpu
+        nested_wall, nested_cpu = self.profiler.stack.pop()
+        self.profiler.add(self.name, wall - nested_wall, cpu - nested_cpu)
+        if self.profiler.stack:
+            self.profiler.stack[-1][0] += wall
+            self.profiler.stack[-1][1] += cpu
+        return False
+
+# Records the phases run while it is active (i.e. in a with block), and on
+# leaving the block, writes a summary of them to stream (if given) and the
+# cProfile statistics to output (if given). Time in the block outside of
+# any phase is counted as 'other'.
+class Profiler:
+    def __init__(self, output=None, stream=None):
+        self.output = output
+        self.stream = stream
+        self.phases = {}
+        self.stack = []
+        self.profile = None
+
+    def add(self, name, wall, cpu):
+        total_wall, total_cpu, calls = self.phases.get(name, (0.0, 0.0, 0))
+        self.phases[name] = (total_wall + wall, total_cpu + cpu, calls + 1)
+
+    def __enter__(self):
+        global active
+        self.previous, active = active, self
+        if self.output is not None:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.other = _Phase(self, 'other')
+        self.other.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        global active
+        self.other.__exit__(*exc_info)
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.output)
+        active = self.previous
+        if self.stream is not None:
+            self.stream.write(self.summary())
+            self.stream.flush()
+        return False
+
+    # A table of the wall clock and CPU time of each phase, in milliseconds,
+    # including importing the command line interface if that was recorded.
+    def summary(self):
+        rows = [ (name, wall, cpu, calls) for name, (wall, cpu, calls) in self.phases.items() ]
+        if import_times is not None:
+            rows.insert(0, ('import', import_times[0], import_times[1], 1))
+        lines = [ f'{"phase":<10} {"wall ms":>9} {"cpu ms":>9} {"calls":>6}' ]
+        for name, wall, cpu, calls in rows:
+            lines.append(f'{name:<10} {wall*1000:9.3f} {cpu*1000:9.3f} {calls:6}')
+        wall = sum(row[1] for row in rows)
+        cpu = sum(row[2] for row in rows)
+        lines.append(f'{"total":<10} {wall*1000:9.3f} {cpu*1000:9.3f}')
+        if self.output is not None:
+            lines.append(f'cProfile statistics written to {self.output}.')
+        return ''.join(line + '\n' for line in lines)
@@ -0,0 +1,54 @@
+import datetime, functools
+from . import methods
+
+# Queries for calendar patterns like "every Friday the 13th" or "every year
+# that December 25th falls on a Sunday", answered without checking every
+# candidate date. By the Doomsday rule, the day of the week of a given day of
+# a given month is fixed by the year's Doomsday (doomscentury + doomsyear)
+# and whether or not it is a leap year, and both repeat every 400 years (the
+# 146097 days of a Gregorian cycle are exactly 20871 weeks). So we find the
+# matches within one 400 year cycle once, and then jump from match to match
+# in each cycle of the range of years asked about.
+
+# The number of years in a cycle of the Gregorian calendar.
+CYCLE_YEARS = 400
+
+# The number of days in each month, for common and leap years respectively.
+MONTH_LENGTHS = [ 0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31 ]
+LEAP_MONTH_LENGTHS = [ 0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31 ]
+
+# Returns the (year within the cycle, month) pairs, in date order, for which
+# day of the month falls on weekday (0 = Sunday), for each of the months.
+@functools.lru_cache(maxsize=128)
+def cycle_matches(weekday, day, months=tuple(range(1, 13))):
+    matches = []
+    for year in range(CYCLE_YEARS):
+        anchor = (methods.doomscentury(year) + methods.doomsyear(year)) % 7
+        leap = methods.leapyear(year)
+        month_doomsdays = methods.LEAP_MONTH_DOOMSDAYS if leap else methods.MONTH_DOOMSDAYS
+        month_lengths = LEAP_MONTH_LENGTHS if leap else MONTH_LENGTHS
+        for month in months:
+            if day <= month_lengths[month] and (anchor + day - month_doomsdays[month]) % 7 == weekday:
+                matches.append((year, month))
+    return tuple(matches)
+
+# Lazily yields, in order, every date from start_year to end_year (inclusive)
+# that is the given day of one of the given months (by default, any month)
+# and falls on weekday (0 = Sunday).
+def find_dates(weekday, day, months=None, start_year=methods.MIN_YEAR, end_year=methods.MAX_YEAR):
+    if not 0 <= weekday <= 6:
+        raise ValueError('weekday must be from 0 (Sunday) to 6 (Saturday).')
+    if not 1 <= day <= 31:
+        raise ValueError('day must be from 1 to 31.')
+    months = tuple(sorted(set(months))) if months else tuple(range(1, 13))
+    if months[0] < 1 or months[-1] > 12:
+        raise ValueError('months must be from 1 to 12.')
+    matches = cycle_matches(weekday, day, months)
+    first_cycle = start_year - start_year % CYCLE_YEARS
+    for cycle in range(first_cycle, end_year + 1, CYCLE_YEARS):
+        for year, month in matches:
+            year = cycle + year
+            if year > end_year:
+                return
+            if year >= start_year:
+                yield datetime.date(year, month, day)
@@ -0,0 +1,33 @@
+import datetime
+from . import methods
+
+# Enumerating the days of the week for a range of dates doesn't need the
+# Doomsday rule for every date: once we know the day of the week of the first
+# date, each date that is step days later falls step days later in the week.
+
+# Lazily yields (date, day of week) pairs, with the day of the week as a
+# number (0 = Sunday), for every step-th date from start to end inclusive,
+# calculating the day of the week of start with the Doomsday rule and
+# advancing from there. If weekdays (a collection of day of week numbers)
+# is given, only dates falling on those days are yielded; since the days of
+# the week repeat every 7 steps, we work out which of 7 consecutive steps
+# match once and then jump straight from match to match.
+def day_of_week_range(start, end, step=1, weekdays=None):
+    if step < 1:
+        raise ValueError('step must be at least 1.')
+    first = start.toordinal()
+    last = end.toordinal()
+    dow = methods.day_of_week(start.year, start.month, start.day, name=False)
+    if weekdays is None:
+        for ordinal in range(first, last + 1, step):
+            yield datetime.date.fromordinal(ordinal), dow
+            dow = (dow + step) % 7
+        return
+    offsets = [ (k * step, (dow + k * step) % 7) for k in range(7) if (dow + k * step) % 7 in weekdays ]
+    fromordinal = datetime.date.fromordinal
+    for cycle in range(first, last + 1, 7 * step):
+        for offset, weekday in offsets:
+            ordinal = cycle + offset
+            if ordinal > last:
+                return
+            yield fromordinal(ordinal), weekday
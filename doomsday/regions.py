@@ -0,0 +1,149 @@
+import bisect, collections
+from . import methods
+from .query import LEAP_MONTH_LENGTHS, MONTH_LENGTHS
+
+# The Gregorian calendar was adopted at different times in different places,
+# which used the Julian calendar until then, so whether a historical date is
+# Julian or Gregorian depends on where it was recorded. Dates are taken as
+# written in the region at the time: Julian up to the last day of the Julian
+# calendar there, and Gregorian from the first day of the Gregorian calendar,
+# with the days skipped in between not being dates in the region at all.
+# (Every year is taken to start on January 1st, though e.g. in Great Britain
+# the year was numbered from March 25th until 1752.)
+#
+# Each region's calendars are held as a sorted list of the dates (as keys,
+# see date_key()) on which each period starts, so the calendar of a date is
+# found by bisecting the list. For arrays of dates, the periods of all of the
+# regions are held in one sorted array, keyed by region and then date, so
+# that the calendars of all of the dates are found with one searchsorted().
+
+JULIAN = 'julian'
+GREGORIAN = 'gregorian'
+
+# A region's change from the Julian calendar, on the day after last_julian,
+# to the Gregorian calendar, on first_gregorian (both (year, month, day)).
+Cutover = collections.namedtuple('Cutover', 'region name last_julian first_gregorian')
+
+CUTOVERS = [
+    Cutover('IT', 'Italy', (1582, 10, 4), (1582, 10, 15)),
+    Cutover('ES', 'Spain', (1582, 10, 4), (1582, 10, 15)),
+    Cutover('PT', 'Portugal', (1582, 10, 4), (1582, 10, 15)),
+    Cutover('PL', 'Poland', (1582, 10, 4), (1582, 10, 15)),
+    Cutover('FR', 'France', (1582, 12, 9), (1582, 12, 20)),
+    Cutover('DK', 'Denmark', (1700, 2, 18), (1700, 3, 1)),
+    Cutover('NO', 'Norway', (1700, 2, 18), (1700, 3, 1)),
+    Cutover('GB', 'Great Britain', (1752, 9, 2), (1752, 9, 14)),
+    Cutover('SE', 'Sweden', (1753, 2, 17), (1753, 3, 1)),
+    Cutover('BG', 'Bulgaria', (1916, 3, 31), (1916, 4, 14)),
+    Cutover('RU', 'Russia', (1918, 1, 31), (1918, 2, 14)),
+    Cutover('RS', 'Serbia', (1919, 1, 14), (1919, 1, 28)),
+    Cutover('RO', 'Romania', (1919, 3, 31), (1919, 4, 14)),
+    Cutover('GR', 'Greece', (1923, 2, 15), (1923, 3, 1)),
+]
+
+# A region, with its Cutover (if it has one), the dates its periods start on
+# (as keys) and the calendar of each period, which is None for the days
+# skipped at the cutover.
+Region = collections.namedtuple('Region', 'code name cutover starts calendars')
+
+# Orders dates (year, month, day) in either calendar by how they're written.
+def date_key(year, month, day):
+    return (year * 100 + month) * 100 + day
+
+# The key before any date.
+FIRST_KEY = date_key(-10 ** 6, 1, 1)
+
+# The arrays of the periods of all of the regions (see _arrays()).
+_index = None
+
+REGIONS = {
+    GREGORIAN: Region(GREGORIAN, 'the proleptic Gregorian calendar', None, [ FIRST_KEY ], [ GREGORIAN ]),
+    JULIAN: Region(JULIAN, 'the proleptic Julian calendar', None, [ FIRST_KEY ], [ JULIAN ]),
+}
+
+def register(cutover):
+    global _index
+    _index = None
+    last_julian = date_key(*cutover.last_julian)
+    REGIONS[cutover.region] = Region(cutover.region, cutover.name, cutover, [ FIRST_KEY, last_julian + 1, date_key(*cutover.first_gregorian) ], [ JULIAN, None, GREGORIAN ])
+
+for cutover in CUTOVERS:
+    register(cutover)
+
+# Returns the region with the given code, ignoring case.
+def get(code):
+    region = REGIONS.get(code) or REGIONS.get(code.upper()) or REGIONS.get(code.lower())
+    if region is None:
+        raise ValueError(f'There is no region called {code!r}.')
+    return region
+
+# Returns the calendar (JULIAN or GREGORIAN) of a date as written in the
+# region with the given code, raising ValueError if it isn't a date there,
+# i.e. it was skipped at the cutover, or the day is past the end of the month
+# (February 29th being a date in every fourth year of the Julian calendar).
+def calendar(code, year, month, day):
+    region = get(code)
+    period = region.calendars[bisect.bisect_right(region.starts, date_key(year, month, day)) - 1]
+    if period is None:
+        raise ValueError(f'{year:04}-{month:02}-{day:02} was skipped in {region.name}.')
+    leap = methods.julian_leapyear(year) if period == JULIAN else methods.leapyear(year)
+    if not 1 <= month <= 12 or not 1 <= day <= (LEAP_MONTH_LENGTHS if leap else MONTH_LENGTHS)[month]:
+        raise ValueError(f'{year:04}-{month:02}-{day:02} is not a date in the {period.capitalize()} calendar.')
+    return period
+
+# The day of the week of a date as written in the region with the given code.
+def day_of_week(code, year, month, day, name=True):
+    if calendar(code, year, month, day) == JULIAN:
+        return methods.julian_day_of_week(year, month, day, name)
+    return methods.day_of_week(year, month, day, name)
+
+# The calendars indexed by number in the arrays below, where -1 is none.
+CALENDARS = [ JULIAN, GREGORIAN ]
+
+# Returns the regions' numbers by code, and the starts (keyed by region
+# number and then date) and calendar numbers of all of their periods,
+# building them on first use.
+def _arrays():
+    global _index
+    if _index is None:
+        np = methods._require_numpy()
+        codes = list(REGIONS)
+        span = -2 * FIRST_KEY
+        keys, numbers = [], []
+        for number, code in enumerate(codes):
+            region = REGIONS[code]
+            keys.extend(number * span + start - FIRST_KEY for start in region.starts)
+            numbers.extend(-1 if calendar is None else CALENDARS.index(calendar) for calendar in region.calendars)
+        numbers_by_code = {}
+        for number, code in enumerate(codes):
+            numbers_by_code.update({ code.lower(): number, code.upper(): number, code: number })
+        _index = numbers_by_code, np.asarray(keys, dtype=np.int64), np.asarray(numbers, dtype=np.int8), span
+    return _index
+
+# Whole-array version of day_of_week(), where codes is a region code or a
+# sequence of them, one per date. Returns the days of the week (as a uint8
+# array), the calendars (as an int8 array of indexes into CALENDARS) and a
+# boolean array of which dates are dates in their region. The days of the
+# week and calendars of the other dates are 0 and -1.
+def day_of_week_array(codes, years, months, days):
+    np = methods._require_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    region_numbers_by_code, keys, numbers, span = _arrays()
+    if isinstance(codes, str):
+        region_numbers = np.full(years.shape, region_numbers_by_code.get(codes, -1), dtype=np.int64)
+    else:
+        region_numbers = np.fromiter((region_numbers_by_code.get(code, -1) for code in codes), dtype=np.int64, count=len(years))
+    known = region_numbers >= 0
+    dates = date_key(years, np.clip(months, 0, 99), np.clip(days, 0, 99))
+    positions = np.searchsorted(keys, region_numbers * span + dates - FIRST_KEY, side='right') - 1
+    calendars = np.where(known, numbers[np.clip(positions, 0, len(numbers) - 1)], -1)
+    julian = calendars == CALENDARS.index(JULIAN)
+    leap = np.where(julian, methods.julian_leapyear_array(years), methods.leapyear_array(years))
+    valid = (calendars >= 0) & (months >= 1) & (months <= 12)
+    month_lengths = np.asarray(MONTH_LENGTHS)[np.where(valid, months, 0)] + ((months == 2) & leap)
+    valid &= (days >= 1) & (days <= month_lengths)
+    safe_months = np.where(valid, months, 1)
+    dows = np.where(julian, methods.julian_day_of_week_array(years, safe_months, days), methods.day_of_week_array(years, safe_months, days))
+    return np.where(valid, dows, 0).astype(np.uint8), np.where(valid, calendars, -1).astype(np.int8), valid
@@ -0,0 +1,82 @@
+import collections, enum, functools
+from . import methods
+from .methods import DAYS_OF_THE_WEEK_NAMES, LEAP_MONTH_DOOMSDAYS, MONTH_DOOMSDAYS
+
+# Compact results for callers that want more than methods.day_of_week()'s
+# name or number. A Weekday is an int (0 = Sunday) that prints as its name,
+# and since its members are singletons, returning one creates no objects.
+# breakdown() returns all three terms of the Doomsday calculation along with
+# the day of the week, computing each term once, where calling doomscentury(),
+# doomsyear(), doomsmonth() and day_of_week() computes each of them twice.
+# breakdown_array() does the same for arrays of dates, filling arrays (which
+# can be allocated once and reused across calls) rather than creating a
+# record per date. (This is kept out of methods, since importing enum would
+# slow down the start up of the command line utility.)
+
+class Weekday(enum.IntEnum):
+    SUNDAY = 0
+    MONDAY = 1
+    TUESDAY = 2
+    WEDNESDAY = 3
+    THURSDAY = 4
+    FRIDAY = 5
+    SATURDAY = 6
+
+    def __str__(self):
+        return DAYS_OF_THE_WEEK_NAMES[self]
+
+    # IntEnum formats as a number from Python 3.11, so f'{weekday}' would
+    # otherwise disagree with str(weekday).
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+# The members by value, since indexing a tuple is much faster than Weekday(n).
+WEEKDAYS = tuple(Weekday)
+
+# The terms of the Doomsday calculation for a date, where weekday is
+# (doomscentury + doomsyear + doomsmonth) mod 7. As a namedtuple, it has no
+# per-instance __dict__.
+Breakdown = collections.namedtuple('Breakdown', 'doomscentury doomsyear doomsmonth weekday')
+
+def weekday(year, month, day):
+    return WEEKDAYS[methods.day_of_week(year, month, day, name=False)]
+
+# The terms of the calculation that depend only on the year, and whether it's
+# a leap year, for the years most recently asked about.
+@functools.lru_cache(maxsize=methods.DEFAULT_ANCHOR_CACHE_SIZE)
+def _year_terms(year):
+    return methods.doomscentury(year), methods.doomsyear(year), methods.leapyear(year)
+
+# Creating a namedtuple with tuple.__new__() skips the Python level __new__()
+# that namedtuple generates, which takes about as long as the calculation.
+_new = tuple.__new__
+
+# Returns the Breakdown of a date, with doomsmonth taken from the month's
+# Doomsday in MONTH_DOOMSDAYS or LEAP_MONTH_DOOMSDAYS (which gives the same
+# value as methods.doomsmonth()).
+def breakdown(year, month, day):
+    century, year_term, leap = _year_terms(year)
+    month_term = day - (LEAP_MONTH_DOOMSDAYS if leap else MONTH_DOOMSDAYS)[month]
+    return _new(Breakdown, (century, year_term, month_term, WEEKDAYS[(century + year_term + month_term) % 7]))
+
+# Returns a Breakdown of arrays for the given number of dates: int8 arrays
+# for the terms (doomsmonth is between -21 and 27) and a uint8 array for the
+# days of the week, as day_of_week_array() returns.
+def empty_breakdown_array(size):
+    np = methods._require_numpy()
+    return Breakdown(np.empty(size, dtype=np.int8), np.empty(size, dtype=np.int8), np.empty(size, dtype=np.int8), np.empty(size, dtype=np.uint8))
+
+# Whole-array version of breakdown(), filling the arrays of out (a Breakdown
+# of arrays the length of the input, as from empty_breakdown_array(), which
+# is called if out isn't given) and returning it.
+def breakdown_array(years, months, days, out=None):
+    np = methods._require_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    if out is None:
+        out = empty_breakdown_array(len(years))
+    out.doomscentury[...] = methods.doomscentury_array(years)
+    out.doomsyear[...] = methods.doomsyear_array(years)
+    out.doomsmonth[...] = methods.doomsmonth_array(years, months, days)
+    # The sum is between -21 and 39, so it fits in an int8 too.
+    out.weekday[...] = (out.doomscentury + out.doomsyear + out.doomsmonth) % 7
+    return out
@@ -0,0 +1,131 @@
+import datetime, random
+from . import methods, query
+from .methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+# Choosing which dates to ask about in `doomsday test` so that practice goes
+# where it's needed. Each step of the Doomsday calculation depends on one
+# component of the date - its century, its year of the century and its month
+# - so we keep a running (exponentially weighted) average of the latency and
+# error rate of the answers for each value of each component, and draw each
+# component with probability proportional to how slow and error prone its
+# answers have been. Values that haven't been asked about yet start out
+# looking slow, so they get tried early on. The weights of each component are
+# kept in a Fenwick tree, so that both drawing a value and updating its
+# weight after an answer take O(log n) time, however long the history is.
+
+# How much each new answer counts towards the running averages.
+ALPHA = 0.3
+
+# The running averages for values that haven't been asked about yet.
+PRIOR_LATENCY = 10.0
+PRIOR_ERROR_RATE = 0.5
+
+# How much more an answer that is always wrong weighs than one always right.
+ERROR_PENALTY = 2.0
+
+# Weights for the values 0 to n - 1, from which a value can be drawn with
+# probability proportional to its weight, both in O(log n) time.
+class WeightTree:
+    def __init__(self, weights):
+        self.weights = [ 0.0 ] * len(weights)
+        self.tree = [ 0.0 ] * (len(weights) + 1)
+        for index, weight in enumerate(weights):
+            self[index] = weight
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __getitem__(self, index):
+        return self.weights[index]
+
+    def __setitem__(self, index, weight):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        index += 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def total(self):
+        total, index = 0.0, len(self.weights)
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    # Returns the value whose weight spans u, for 0 <= u < total().
+    def find(self, u):
+        position, step = 0, 1 << len(self.weights).bit_length()
+        while step:
+            if position + step <= len(self.weights) and self.tree[position + step] <= u:
+                position += step
+                u -= self.tree[position]
+            step >>= 1
+        return min(position, len(self.weights) - 1)
+
+    def sample(self, rng):
+        return self.find(rng.random() * self.total())
+
+# The running averages of the answers for one value of a component.
+class Statistics:
+    __slots__ = [ 'latency', 'error_rate' ]
+
+    def __init__(self):
+        self.latency = PRIOR_LATENCY
+        self.error_rate = PRIOR_ERROR_RATE
+
+    def record(self, latency, correct):
+        self.latency += ALPHA * (latency - self.latency)
+        self.error_rate += ALPHA * ((not correct) - self.error_rate)
+
+    # Squared, so that the slowest values stand out from the rest.
+    def weight(self):
+        return (self.latency * (1 + ERROR_PENALTY * self.error_rate)) ** 2
+
+# Draws dates from first to last (ordinals), weighted towards the values of
+# each component whose answers have been slowest and least accurate, as
+# learned from answers (history.Answer records) and each answer recorded.
+class Scheduler:
+    def __init__(self, answers=(), first=OCTOBER_15TH_1582, last=DECEMBER_31ST_2600, rng=None):
+        self.first, self.last = first, last
+        self.first_century = datetime.date.fromordinal(first).year // 100
+        last_century = datetime.date.fromordinal(last).year // 100
+        self.rng = rng or random.Random()
+        self.statistics = {
+            'century': [ Statistics() for century in range(self.first_century, last_century + 1) ],
+            'year_of_century': [ Statistics() for year in range(100) ],
+            'month': [ Statistics() for month in range(12) ],
+        }
+        for answer in answers:
+            self._update(answer)
+        self.trees = { component: WeightTree([ s.weight() for s in statistics ]) for component, statistics in self.statistics.items() }
+
+    def _indexes(self, answer):
+        return { 'century': answer.century - self.first_century, 'year_of_century': answer.year_of_century, 'month': answer.month - 1 }
+
+    def _update(self, answer):
+        updated = []
+        for component, index in self._indexes(answer).items():
+            if 0 <= index < len(self.statistics[component]):
+                self.statistics[component][index].record(answer.latency, answer.correct)
+                updated.append((component, index))
+        return updated
+
+    def record(self, answer):
+        for component, index in self._update(answer):
+            self.trees[component][index] = self.statistics[component][index].weight()
+
+    # Returns the next date to ask about. The components are drawn
+    # independently, so a combination outside the range of dates (e.g. a
+    # year before 1582 in the 1500s) is simply drawn again.
+    def next_date(self):
+        while True:
+            century = self.first_century + self.trees['century'].sample(self.rng)
+            year = 100 * century + self.trees['year_of_century'].sample(self.rng)
+            month = 1 + self.trees['month'].sample(self.rng)
+            if not 1 <= year <= 9999:
+                continue
+            month_lengths = query.LEAP_MONTH_LENGTHS if methods.leapyear(year) else query.MONTH_LENGTHS
+            date = datetime.date(year, month, self.rng.randint(1, month_lengths[month]))
+            if self.first <= date.toordinal() <= self.last:
+                return date
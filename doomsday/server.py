@@ -0,0 +1,190 @@
+import asyncio, collections, json
+from time import perf_counter as timer
+from urllib.parse import parse_qs, unquote, urlsplit
+from . import bulk, history, methods
+
+# A small HTTP/1.1 server for looking up days of the week, so that other
+# programs can make many requests to one long-running process rather than
+# starting a new one for each date. It is built directly on asyncio streams,
+# so it needs nothing outside the standard library, and keeps connections
+# open between requests unless the client asks otherwise. The endpoints are:
+#
+#   GET  /dayofweek/DATE  {"date": DATE, "day_of_week": "Saturday"}
+#   POST /batch           a JSON array of dates in, an array of days of the
+#                         week out (null for anything that isn't a date)
+#   GET  /stats           request counts and latency percentiles
+#
+# Adding ?numbers=1 gives days of the week as numbers (0 = Sunday).
+
+REASONS = { 200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large' }
+
+# The largest request body accepted, in bytes.
+MAX_BODY_SIZE = 1 << 24
+
+# The number of most recent requests that the latency percentiles cover.
+LATENCY_SAMPLES = 10000
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Counts of requests by endpoint and status, and the latencies (in seconds)
+# of the most recent requests.
+class Stats:
+    def __init__(self):
+        self.started = timer()
+        self.requests = collections.Counter()
+        self.statuses = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, endpoint, status, seconds):
+        self.requests[endpoint] += 1
+        self.statuses[status] += 1
+        self.latencies.append(seconds)
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        return {
+            'uptime': timer() - self.started,
+            'requests': sum(self.requests.values()),
+            'endpoints': dict(self.requests),
+            'statuses': { str(status): count for status, count in self.statuses.items() },
+            'latency_ms': { f'p{p}': None if not latencies else history.percentile(latencies, p) * 1000 for p in [ 50, 90, 99 ] },
+        }
+
+# Returns a date from a /batch request as a line of bytes, which
+# bulk.annotate_chunk() parses and calculates a whole chunk of at a time
+# with NumPy. A date with a newline in it would be split into two lines,
+# and isn't a date anyway, so it's left empty.
+def _line(date):
+    return b'' if '\n' in date else date.encode('utf-8', 'replace')
+
+class Service:
+    def __init__(self):
+        self.stats = Stats()
+
+    def dayofweek(self, text, numbers):
+        date = bulk.parse_line(text)
+        if date is None:
+            raise HTTPError(400, f'invalid date {text!r}')
+        return { 'date': text, 'day_of_week': methods.day_of_week(*date, name=not numbers) }
+
+    def batch(self, body, numbers):
+        try:
+            dates = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, 'the request body must be a JSON array of dates')
+        if not isinstance(dates, list) or not all(isinstance(date, str) for date in dates):
+            raise HTTPError(400, 'the request body must be a JSON array of dates')
+        results, errors = bulk.annotate_chunk(1, [ _line(date) for date in dates ], name=not numbers)
+        if numbers:
+            results = [ None if result is None else int(result) for result in results ]
+        return results
+
+    # Returns the endpoint requested and the JSON response to the request.
+    # A batch is worked out in a thread, so that a large one doesn't hold up
+    # the requests on other connections.
+    async def respond(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        numbers = query.get('numbers', [ '0' ])[-1] not in ('', '0', 'false')
+        if url.path.startswith('/dayofweek/'):
+            endpoint, allowed = 'dayofweek', 'GET'
+        elif url.path == '/batch':
+            endpoint, allowed = 'batch', 'POST'
+        elif url.path == '/stats':
+            endpoint, allowed = 'stats', 'GET'
+        else:
+            return 'other', HTTPError(404, f'no such endpoint {url.path!r}')
+        if method != allowed:
+            return endpoint, HTTPError(405, f'{endpoint} only accepts {allowed} requests')
+        try:
+            if endpoint == 'dayofweek':
+                return endpoint, self.dayofweek(unquote(url.path[len('/dayofweek/'):]), numbers)
+            if endpoint == 'batch':
+                return endpoint, await asyncio.get_running_loop().run_in_executor(None, self.batch, body, numbers)
+            return endpoint, self.stats.to_dict()
+        except HTTPError as e:
+            return endpoint, e
+
+    # Reads a line of a request's head, which asyncio limits the length of.
+    async def read_line(self, reader):
+        try:
+            return await reader.readline()
+        except ValueError:
+            raise HTTPError(400, 'request line or header too long')
+
+    # Reads a request's method, target, version and headers, or returns None
+    # when the client has closed the connection.
+    async def read_head(self, reader):
+        line = await self.read_line(reader)
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, 'malformed request line')
+        headers = {}
+        while True:
+            line = await self.read_line(reader)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await self.read_head(reader)
+                except HTTPError as e:
+                    self.write_response(writer, e.status, { 'error': str(e) }, False)
+                    break
+                if head is None:
+                    break
+                start = timer()
+                method, target, version, headers = head
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                length = headers.get('content-length', '0') or '0'
+                if not length.isdigit():
+                    # The body can't be skipped without knowing its length.
+                    endpoint, payload, keep_alive = 'other', HTTPError(400, 'invalid Content-Length'), False
+                elif int(length) > MAX_BODY_SIZE:
+                    endpoint, payload, keep_alive = 'other', HTTPError(413, 'the request body is too large'), False
+                else:
+                    body = await reader.readexactly(int(length)) if int(length) else b''
+                    endpoint, payload = await self.respond(method, target, body)
+                if isinstance(payload, HTTPError):
+                    status, payload = payload.status, { 'error': str(payload) }
+                else:
+                    status = 200
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                self.stats.record(endpoint, status, timer() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        writer.write((f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                      f'Content-Type: application/json\r\n'
+                      f'Content-Length: {len(body)}\r\n'
+                      f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n').encode() + body)
+
+# Serves requests on host and port until cancelled, calling ready with the
+# asyncio.Server once it is listening (e.g. to find out which port was
+# chosen when port is 0).
+async def serve(host='127.0.0.1', port=8000, ready=None):
+    service = Service()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
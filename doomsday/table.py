@@ -0,0 +1,121 @@
+import datetime, mmap, os
+from . import methods
+
+# A table-driven alternative to methods.day_of_week() for bulk use: since the
+# supported range of dates only spans a few hundred thousand days, we can
+# precompute the day of the week of every one of them, one byte per day,
+# indexed by the date's ordinal. The table is cached in a file and memory
+# mapped on later runs, so loading it costs next to nothing.
+
+# Returns the directory that files computed once and reused across runs are
+# cached in, by default $XDG_CACHE_HOME/doomsday (or ~/.cache/doomsday), or
+# $DOOMSDAY_CACHE_DIR if that is set.
+def cache_directory():
+    directory = os.environ.get('DOOMSDAY_CACHE_DIR')
+    if directory is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(cache_home, 'doomsday')
+    return directory
+
+# Returns where the table for the given range of ordinals is cached.
+def default_path(first=methods.OCTOBER_15TH_1582, last=methods.DECEMBER_31ST_2600):
+    return os.path.join(cache_directory(), f'weekdays-{first}-{last}.bin')
+
+# Checks every entry of the table against the Doomsday rule, raising a
+# ValueError for the first date where they disagree.
+def verify_table(data, first):
+    ordinals = range(first, first + len(data))
+    np = methods._numpy()
+    if np is not None:
+        dates = np.arange(first, first + len(data)) - methods.EPOCH_ORDINAL
+        expected = methods.day_of_week_array(dates.astype('datetime64[D]'))
+        mismatches = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) != expected)
+        if len(mismatches):
+            date = datetime.date.fromordinal(ordinals[mismatches[0]])
+            raise ValueError(f'The weekday table disagrees with the Doomsday rule on {date}.')
+        return
+    for ordinal, dow in zip(ordinals, data):
+        date = datetime.date.fromordinal(ordinal)
+        if dow != methods.day_of_week(date.year, date.month, date.day, name=False):
+            raise ValueError(f'The weekday table disagrees with the Doomsday rule on {date}.')
+
+# Builds the table of days of the week for the ordinals first to last.
+# Consecutive days fall on consecutive days of the week, so after using the
+# Doomsday rule for the first day, we just repeat the week from there, and
+# then verify the result against the Doomsday rule.
+def build_table(first=methods.OCTOBER_15TH_1582, last=methods.DECEMBER_31ST_2600):
+    date = datetime.date.fromordinal(first)
+    dow = methods.day_of_week(date.year, date.month, date.day, name=False)
+    days = last - first + 1
+    week = bytes((dow + i) % 7 for i in range(7))
+    data = (week * (days // 7 + 1))[:days]
+    verify_table(data, first)
+    return data
+
+# Builds the table and writes it to path, via a temporary file so that
+# a concurrently running process never maps a partially written table.
+def write_table(path, first=methods.OCTOBER_15TH_1582, last=methods.DECEMBER_31ST_2600):
+    data = build_table(first, last)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+    return data
+
+class WeekdayTable:
+    # data is any buffer with one byte per day (e.g. an mmap or bytes),
+    # where data[0] is the day of the week of ordinal first.
+    def __init__(self, data, first=methods.OCTOBER_15TH_1582):
+        self.data = data
+        self.first = first
+        self.last = first + len(data) - 1
+
+    def __len__(self):
+        return len(self.data)
+
+    # The day of the week for the date with the given ordinal, as a number.
+    def day_of_week_ordinal(self, ordinal):
+        index = ordinal - self.first
+        if index < 0 or index >= len(self.data):
+            raise ValueError(f'{datetime.date.fromordinal(ordinal)} is outside the range of the weekday table.')
+        return self.data[index]
+
+    # A drop-in replacement for methods.day_of_week().
+    def day_of_week(self, year, month, day, name=True):
+        dow = self.day_of_week_ordinal(datetime.date(year, month, day).toordinal())
+        if name:
+            return methods.DAYS_OF_THE_WEEK_NAMES[dow]
+        else:
+            return dow
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Returns the table for the ordinals first to last, memory mapping the cache
+# file at path (by default, default_path()) if it exists, and otherwise (or
+# if rebuild is True) building the table and writing it there first.
+def load_table(path=None, first=methods.OCTOBER_15TH_1582, last=methods.DECEMBER_31ST_2600, rebuild=False):
+    if path is None:
+        path = default_path(first, last)
+    if rebuild or not os.path.exists(path) or os.path.getsize(path) != last - first + 1:
+        write_table(path, first, last)
+    with open(path, 'rb') as f:
+        return WeekdayTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), first)
+
+_default_table = None
+
+# Returns the table for the default range, loading it on first use, so that
+# each process (including batch workers) maps the cache file at most once.
+def default_table():
+    global _default_table
+    if _default_table is None:
+        _default_table = load_table()
+    return _default_table
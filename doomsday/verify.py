@@ -0,0 +1,106 @@
+import collections, datetime, os
+from . import methods
+
+# Exhaustively checking the Doomsday calculations against Python's datetime,
+# which has its own (independent) implementation of the proleptic Gregorian
+# calendar. For every date we check that:
+#
+#   day_of_week()      is the day of the week of the date,
+#   doomsmonth()       is, mod 7, the days of the week from the year's
+#                      Doomsday (the last day of February) to the date,
+#   doomscentury()     is the day of the week of the Doomsday of the first
+#                      year of the century, and
+#   doomsyear()        is the days of the week from that to the Doomsday of
+#                      the year,
+#
+# along with the array versions of each of them, if NumPy is installed. The
+# range of dates is split into chunks, which can be checked in parallel.
+
+# The number of days checked at a time.
+DEFAULT_CHUNK_DAYS = 1 << 15
+
+# The number of mismatches reported for each chunk (and in all).
+MAX_MISMATCHES = 10
+
+Mismatch = collections.namedtuple('Mismatch', 'function date expected actual')
+
+ONE_DAY = datetime.timedelta(days=1)
+
+# The day of the week of a date (0 = Sunday), according to datetime.
+def _weekday(date):
+    return (date.weekday() + 1) % 7
+
+# The day of the week of the Doomsday of year, according to datetime, which
+# doesn't have a year 0, but the calendar repeats every 400 years.
+def _doomsday_weekday(year):
+    return _weekday(datetime.date(year or 400, 3, 1) - ONE_DAY)
+
+# Checks the dates with ordinals first to last against datetime, returning
+# the number of dates checked and (up to limit of) the mismatches found.
+def verify_range(first, last, limit=MAX_MISMATCHES):
+    dates = [ datetime.date.fromordinal(ordinal) for ordinal in range(first, last + 1) ]
+    mismatches = []
+    def check(function, date, expected, actual):
+        if expected != actual and len(mismatches) < limit:
+            mismatches.append(Mismatch(function, date, expected, int(actual)))
+    # The Doomsdays of each year and of the first year of its century.
+    anchors = {}
+    weekdays, doomsdays, centuries = [], [], []
+    for date in dates:
+        year = date.year
+        if year not in anchors:
+            doomsday, century = anchors[year] = _doomsday_weekday(year), _doomsday_weekday(year - year % 100)
+            check('doomscentury', date, century, methods.doomscentury(year))
+            check('doomsyear', date, (doomsday - century) % 7, methods.doomsyear(year))
+        doomsday, century = anchors[year]
+        dow = _weekday(date)
+        check('doomsmonth', date, (dow - doomsday) % 7, methods.doomsmonth(year, date.month, date.day) % 7)
+        check('day_of_week', date, dow, methods.day_of_week(year, date.month, date.day, name=False))
+        weekdays.append(dow)
+        doomsdays.append(doomsday)
+        centuries.append(century)
+    np = methods._numpy()
+    if np is not None and dates:
+        years, months, days = methods._split_datetime64(np.arange(first, last + 1) - methods.EPOCH_ORDINAL)
+        weekdays, doomsdays, centuries = np.array(weekdays), np.array(doomsdays), np.array(centuries)
+        for function, expected, actual in [
+                ('doomscentury_array', centuries, methods.doomscentury_array(years)),
+                ('doomsyear_array', (doomsdays - centuries) % 7, methods.doomsyear_array(years)),
+                ('doomsmonth_array', (weekdays - doomsdays) % 7, methods.doomsmonth_array(years, months, days) % 7),
+                ('day_of_week_array', weekdays, methods.day_of_week_array(years, months, days))]:
+            for index in np.flatnonzero(expected != actual)[:limit]:
+                check(function, dates[index], int(expected[index]), actual[index])
+    return len(dates), mismatches
+
+# Splits the ordinals first to last into (first, last) pairs of at most size days.
+def chunks(first, last, size=DEFAULT_CHUNK_DAYS):
+    return [ (start, min(start + size - 1, last)) for start in range(first, last + 1, size) ]
+
+def _verify_chunk(bounds):
+    return verify_range(*bounds)
+
+# Checks the dates with ordinals first to last against datetime, with the
+# chunks spread across a pool of workers processes (by default, one per
+# CPU), returning the number of dates checked and (up to limit of) the
+# mismatches found, in date order.
+def verify(first=methods.OCTOBER_15TH_1582, last=None, workers=None, chunk_days=DEFAULT_CHUNK_DAYS, limit=MAX_MISMATCHES):
+    if last is None:
+        last = datetime.date(methods.MAX_YEAR, 12, 31).toordinal()
+    workers = workers or os.cpu_count() or 1
+    bounds = chunks(first, last, chunk_days)
+    if workers <= 1 or len(bounds) <= 1:
+        results = map(_verify_chunk, bounds)
+        return _combine(results, limit)
+    # A check in a single process, e.g. of a short range, returns above without
+    # paying for importing concurrent.futures, which is slow to import.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(workers) as executor:
+        return _combine(executor.map(_verify_chunk, bounds), limit)
+
+def _combine(results, limit):
+    checked, mismatches = 0, []
+    for count, found in results:
+        checked += count
+        mismatches.extend(found)
+    mismatches.sort(key=lambda mismatch: mismatch.date)
+    return checked, mismatches[:limit]
@@ -22,10 +22,10 @@ setup(
     packages=find_packages(),
     install_requires=["click>=8.0.1"],
     setup_requires=["pytest-runner"],
-    extras_require={"test": ["pytest"]},
+    extras_require={"numpy": ["numpy"], "test": ["pytest", "numpy"]},
     entry_points="""
         [console_scripts]
-        doomsday=doomsday.cli:cli
+        doomsday=doomsday.__main__:main
     """,
     tests_require=["doomsday[test]"],
     url="https://github.com/bradleypallen/doomsday",
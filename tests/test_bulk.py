@@ -0,0 +1,34 @@
+from doomsday import bulk, table
+
+def test_chunks():
+    assert list(bulk.chunks(['a', 'b', 'c', 'd', 'e'], 2)) == [(1, ['a', 'b']), (3, ['c', 'd']), (5, ['e'])]
+    assert list(bulk.chunks([], 2)) == []
+
+def test_annotate():
+    lines = ['2022-03-26\n', '2022-02-30\n', '1958-11-26\n']
+    assert list(bulk.annotate(lines, chunk_size=2)) == [(['Saturday', None], [(2, '2022-02-30')]), (['Wednesday'], [])]
+    assert list(bulk.annotate(lines, name=False)) == [(['6', None, '3'], [(2, '2022-02-30')])]
+
+def test_annotate_workers():
+    lines = ['2022-03-26', 'bad', '1958-11-26', '2021-01-15', '2000-01-01'] * 5
+    stats = {}
+    assert list(bulk.annotate(lines, chunk_size=3, workers=2, max_pending=1, stats=stats)) == list(bulk.annotate(lines, chunk_size=3))
+    assert sum(lines for lines, seconds in stats.values()) == 25
+
+def test_annotate_bytes(tmp_path, monkeypatch):
+    monkeypatch.setenv('DOOMSDAY_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(table, '_default_table', None)
+    lines = [ '2022-03-26\n', '2022-02-30\n', '1958-11-26 01:02:03\n', '2022-3-5\n', '1500-01-01\n' ]
+    byte_lines = [ line.encode() for line in lines ]
+    assert list(bulk.annotate(byte_lines, chunk_size=2)) == list(bulk.annotate(lines, chunk_size=2))
+    assert list(bulk.annotate(byte_lines, use_table=True)) == list(bulk.annotate(lines, use_table=True))
+    assert list(bulk.annotate(byte_lines, name=False, engine='zeller')) == [ ([ '6', None, '3', '6', '1' ], [ (2, '2022-02-30') ]) ]
+
+REGION_LINES = ['1752-09-02 GB', '1752-09-14 GB', '1752-09-10 GB', '1700-02-29 RU', '1700-02-29', '1918-01-31', '1918-01-31 10:00:00 RU', '1582-10-04 XX']
+
+def test_annotate_regions(monkeypatch):
+    expected = (['Wednesday', 'Thursday', None, 'Thursday', 'Thursday', 'Wednesday', 'Wednesday', None],
+                [(3, '1752-09-10 GB'), (8, '1582-10-04 XX')])
+    assert bulk.annotate_chunk(1, [ line.encode() for line in REGION_LINES ], region='RU') == expected
+    monkeypatch.setattr(bulk.methods, '_numpy', lambda: None)
+    assert bulk.annotate_chunk(1, REGION_LINES, region='RU') == expected
@@ -0,0 +1,46 @@
+import datetime
+import pytest
+from doomsday import business
+
+HOLIDAYS = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 15), datetime.date(2024, 5, 27), datetime.date(2024, 7, 4),
+            datetime.date(2024, 9, 2), datetime.date(2024, 12, 25), datetime.date(2024, 12, 26), datetime.date(2024, 12, 28)]
+
+def test_count_business_days():
+    assert business.count_business_days(datetime.date(2024, 1, 1), datetime.date(2024, 1, 8)) == 5
+    assert business.count_business_days(datetime.date(2024, 1, 6), datetime.date(2024, 1, 8)) == 0
+    assert business.count_business_days(datetime.date(2024, 1, 8), datetime.date(2024, 1, 1)) == -5
+    assert business.count_business_days(datetime.date(2024, 1, 6), datetime.date(2024, 1, 1)) == -4
+    assert business.count_business_days(datetime.date(2024, 1, 8), datetime.date(2024, 1, 6)) == -1
+    assert business.count_business_days(datetime.date(2024, 1, 7), datetime.date(2024, 1, 5)) == 0
+    assert business.count_business_days(datetime.date(2024, 12, 28), datetime.date(2024, 12, 24), HOLIDAYS) == -1
+    assert business.count_business_days(datetime.date(2024, 1, 1), datetime.date(2024, 1, 8), HOLIDAYS) == 4
+    assert business.count_business_days(datetime.date(2024, 1, 1), datetime.date(2025, 1, 1), HOLIDAYS) == 262 - 7
+
+def test_add_business_days():
+    assert business.add_business_days(datetime.date(2024, 1, 5), 1) == datetime.date(2024, 1, 8)
+    assert business.add_business_days(datetime.date(2024, 1, 6), 0) == datetime.date(2024, 1, 8)
+    assert business.add_business_days(datetime.date(2024, 1, 8), -1) == datetime.date(2024, 1, 5)
+    assert business.add_business_days(datetime.date(2024, 12, 24), 1, HOLIDAYS) == datetime.date(2024, 12, 27)
+    assert business.add_business_days(datetime.date(2024, 12, 27), -1, HOLIDAYS) == datetime.date(2024, 12, 24)
+
+def test_against_numpy():
+    np = pytest.importorskip('numpy')
+    rng = np.random.default_rng(0)
+    starts = (rng.integers(0, 3000, 2000) + np.datetime64('2022-01-01', 'D')).astype('datetime64[D]')
+    ends = starts + rng.integers(-100, 100, 2000)
+    offsets = rng.integers(-60, 60, 2000)
+    holidays = np.array(HOLIDAYS + [datetime.date(2025, 1, 1), datetime.date(2025, 1, 2), datetime.date(2025, 1, 3)], dtype='datetime64[D]')
+    # NumPy before 1.25 counts reversed ranges differently, so those are
+    # checked against count_business_days() (and the examples above) instead.
+    forward = starts <= ends
+    for holiday_list in [None, holidays]:
+        kwargs = {} if holiday_list is None else {'holidays': holiday_list}
+        counts = business.count_business_days_array(starts, ends, holiday_list)
+        assert (counts[forward] == np.busday_count(starts[forward], ends[forward], **kwargs)).all()
+        assert (business.add_business_days_array(starts, offsets, holiday_list) == np.busday_offset(starts, offsets, roll='forward', **kwargs)).all()
+        calendar = business.Holidays(holiday_list.astype(datetime.date)) if holiday_list is not None else None
+        for start, end, offset, count in list(zip(starts.astype(datetime.date), ends.astype(datetime.date), offsets.tolist(), counts.tolist()))[:300]:
+            assert business.count_business_days(start, end, calendar) == count
+            if start <= end:
+                assert count == np.busday_count(start, end, **kwargs)
+            assert business.add_business_days(start, offset, calendar) == np.busday_offset(start, offset, roll='forward', **kwargs).astype(datetime.date)
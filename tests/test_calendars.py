@@ -0,0 +1,53 @@
+import calendar, io, json
+from doomsday import calendars
+
+def test_year_grid():
+    weeks = calendar.Calendar(firstweekday=6)
+    for year in range(1583, 2601):
+        grid = calendars.year_grid(year)
+        for month in range(1, 13):
+            assert [ [ day or 0 for day in week ] for week in grid[month - 1] ] == weeks.monthdayscalendar(year, month)
+
+def test_render_years():
+    text = ''.join(calendars.render_years(2023, 2025))
+    assert text.count('January') == 3
+    assert text == '\n'.join(calendars.render_year(year) for year in range(2023, 2026))
+    assert text.splitlines()[2:5] == ['      January               February               March',
+                                      'Su Mo Tu We Th Fr Sa  Su Mo Tu We Th Fr Sa  Su Mo Tu We Th Fr Sa',
+                                      ' 1  2  3  4  5  6  7            1  2  3  4            1  2  3  4']
+    rows = ''.join(calendars.render_years(2023, 2024, 'csv')).splitlines()
+    assert rows[0] == 'year,month,week,Sunday,Monday,Tuesday,Wednesday,Thursday,Friday,Saturday'
+    assert rows[1] == '2023,1,1,1,2,3,4,5,6,7'
+    assert rows[-1] == '2024,12,5,29,30,31,,,,'
+    years = [ json.loads(line) for line in ''.join(calendars.render_years(2024, 2025, 'json')).splitlines() ]
+    assert [ year['year'] for year in years ] == [2024, 2025]
+    assert years[0]['months'][1] == { 'month': 2, 'name': 'February', 'weeks': [[None, None, None, None, 1, 2, 3], [4, 5, 6, 7, 8, 9, 10], [11, 12, 13, 14, 15, 16, 17], [18, 19, 20, 21, 22, 23, 24], [25, 26, 27, 28, 29, None, None]] }
+
+def test_write_calendars():
+    # Years sharing a template differ only in the year.
+    output = io.StringIO()
+    assert calendars.write_calendars(output, 1583, 2600, 'csv', chunk_years=7) == 1018
+    rows = output.getvalue().splitlines()
+    assert rows[0] == calendars.CSV_HEADER.strip()
+    assert calendars.template(2024) == calendars.template(1996)
+    assert calendars.render_year(2024, 'csv') == calendars.render_year(1996, 'csv').replace('1996', '2024')
+    assert output.getvalue() == ''.join(calendars.render_years(1583, 2600, 'csv'))
+
+def test_template_index():
+    index = calendars.TemplateIndex(1900, 2100)
+    assert len(index.years) == 14
+    assert index.same_years(2024) == [1912, 1940, 1968, 1996, 2052, 2080]
+    assert index.previous(2024) == 1996 and index.next(2024) == 2052
+    assert index.previous(1901) is None and index.next(2100) is None
+    # Years outside the index are looked up by their template too.
+    assert index.next(1800) == index.years[calendars.template(1800)][0]
+    for year in range(1900, 2101):
+        assert calendar.Calendar(6).yeardayscalendar(year) == calendar.Calendar(6).yeardayscalendar(index.next(year) or index.previous(year))
+
+def test_template_index_arrays():
+    import pytest
+    np = pytest.importorskip('numpy')
+    index = calendars.TemplateIndex(1900, 2100)
+    years = np.arange(1850, 2150)
+    assert index.previous_array(years).tolist() == [ index.previous(year) or 0 for year in years.tolist() ]
+    assert index.next_array(years).tolist() == [ index.next(year) or 0 for year in years.tolist() ]
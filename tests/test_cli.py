@@ -1,6 +1,15 @@
+import json, os, subprocess, sys
 import click
 from click.testing import CliRunner
-from doomsday import cli
+from doomsday import __main__, cli
+
+# A runner keeping stderr out of result.stdout, which click before 8.2 only
+# does when asked to (and click 8.2 always does, no longer taking mix_stderr).
+def separate_runner():
+    try:
+        return CliRunner(mix_stderr=False)
+    except TypeError:
+        return CliRunner()
 
 DAYOFWEEK_TEST_OUTPUT_1 = """1) Calculate the doomsyear for the 22nd year of the 21st century.
 doomsyear   = 7's complement of ((22/2)+11 mod 7)
@@ -170,3 +179,207 @@ def test_leapyear():
     result = runner.invoke(cli.leapyear, ['1900', '--explain'])
     assert result.exit_code == 0
     assert result.output == LEAPYEAR_TEST_OUTPUT_3
+
+BATCH_TEST_INPUT = """2022-03-26
+not a date
+2021-01-15T10:00:00
+1958-11-26 01:02:03
+"""
+
+def test_batch():
+    runner = separate_runner()
+    result = runner.invoke(cli.batch, ['--chunk-size', '2'], input=BATCH_TEST_INPUT)
+    assert result.exit_code == 0
+    assert result.stdout == "Saturday\n\nFriday\nWednesday\n"
+    assert "Line 2: invalid date 'not a date'" in result.stderr
+    result = runner.invoke(cli.batch, ['--numbers', '--skip-invalid'], input=BATCH_TEST_INPUT)
+    assert result.exit_code == 0
+    assert result.stdout == "6\n5\n3\n"
+    assert result.stderr == ""
+
+def test_batch_workers():
+    runner = separate_runner()
+    result = runner.invoke(cli.batch, ['--chunk-size', '1', '--workers', '2'], input=BATCH_TEST_INPUT)
+    assert result.exit_code == 0
+    assert result.stdout == "Saturday\n\nFriday\nWednesday\n"
+    assert "Total: 4 lines" in result.stderr
+
+DOOMSYEAR_TEST_OUTPUT_3 = """doomsyear   = 7's complement of ((45+11)/2 mod 7)
+            = 7's complement of (28 mod 7)
+            = 7's complement of 0
+            = 0, i.e. Sunday
+"""
+
+def test_doomsyear_any_year():
+    runner = CliRunner()
+    result = runner.invoke(cli.doomsyear, ['12345', '--explain'])
+    assert result.exit_code == 2
+    env = dict(os.environ, DOOMSDAY_MAX_YEAR='99999')
+    result = subprocess.run([sys.executable, '-m', 'doomsday.cli', 'doomsyear', '12345', '--explain'], env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout == DOOMSYEAR_TEST_OUTPUT_3
+
+def test_anchor_cache():
+    runner = separate_runner()
+    try:
+        result = runner.invoke(cli.cli, ['--anchor-cache', '8', '--cache-stats', 'batch'], input=BATCH_TEST_INPUT)
+    finally:
+        cli.methods.disable_anchor_cache()
+    assert result.exit_code == 0
+    assert result.stdout == "Saturday\n\nFriday\nWednesday\n"
+    assert "Anchor cache: 0 hits, 3 misses, 0 evictions, 3/8 years." in result.stderr
+
+def test_fast_path(capsys):
+    runner = CliRunner()
+    for args in [['leapyear', '2024'], ['doomscentury', '1903'], ['doomsyear', '2022'], ['doomsmonth', '2021-01-15'],
+                 ['dayofweek', '1958-11-26'], ['dayofweek', '2022-03-26T10:11:12'], ['dayofweek', '2022-03-26 10:11:12']]:
+        assert __main__._compute(*args) is not None
+        assert __main__.main(args) == 0
+        assert capsys.readouterr().out == runner.invoke(cli.cli, args).output
+    # Anything the fast path can't handle goes to the full command line interface.
+    for args in [['leapyear', '1000'], ['dayofweek', '2022-3-26'], ['dayofweek', '2022-02-30'], ['dayofweek', '2022-03-26T24:00:00']]:
+        assert __main__._compute(*args) is None
+
+RANGE_TEST_OUTPUT = """{"date": "2021-01-08", "day_of_week": "Friday"}
+{"date": "2021-01-22", "day_of_week": "Friday"}
+"""
+
+def test_range():
+    runner = CliRunner()
+    result = runner.invoke(cli.date_range, ['2020-12-31', '2021-01-03'])
+    assert result.exit_code == 0
+    assert result.output == "2020-12-31 Thursday\n2021-01-01 Friday\n2021-01-02 Saturday\n2021-01-03 Sunday\n"
+    result = runner.invoke(cli.date_range, ['2020-12-31', '2021-01-31', '--step', '2', '--weekday', 'friday', '--format', 'jsonl'])
+    assert result.exit_code == 0
+    assert result.output == RANGE_TEST_OUTPUT
+
+def test_find():
+    runner = CliRunner()
+    result = runner.invoke(cli.find, ['--weekday', 'Sunday', '--day', '25', '--month', '12', '--from', '2000', '--to', '2020'])
+    assert result.exit_code == 0
+    assert result.output == "2005-12-25\n2011-12-25\n2016-12-25\n"
+    result = runner.invoke(cli.find, ['--weekday', 'friday', '--day', '13', '--count'])
+    assert result.exit_code == 0
+    assert result.output == "1752\n"
+
+def test_busdays():
+    runner = CliRunner()
+    result = runner.invoke(cli.busdays, ['2024-01-01', '2025-01-01', '--holiday', '2024-12-25', '--holiday', '2024-12-28'])
+    assert result.exit_code == 0
+    assert result.output == "261\n"
+    result = runner.invoke(cli.addbusdays, ['2024-12-24', '1', '--holidays', '-'], input="2024-12-25\n2024-12-26\n")
+    assert result.exit_code == 0
+    assert result.output == "2024-12-27\n"
+    result = runner.invoke(cli.addbusdays, ['2024-01-08', '-5'])
+    assert result.exit_code == 0
+    assert result.output == "2024-01-01\n"
+
+def test_explain():
+    runner = separate_runner()
+    result = runner.invoke(cli.explain, input="2022-03-26\nnot a date\n1958-11-26\n")
+    assert result.exit_code == 0
+    assert result.stdout == DAYOFWEEK_TEST_OUTPUT_1 + "\n" + DAYOFWEEK_TEST_OUTPUT_3 + "\n"
+    assert "Line 2: invalid date 'not a date'" in result.stderr
+    result = runner.invoke(cli.explain, ['--format', 'json'], input="2022-03-26\n1958-11-26\n")
+    assert result.exit_code == 0
+    assert [ json.loads(line)['day_of_week_name'] for line in result.output.splitlines() ] == ['Saturday', 'Wednesday']
+
+def test_history(tmp_path):
+    runner = CliRunner()
+    history_file = str(tmp_path / 'history.bin')
+    result = runner.invoke(cli.test, ['-n', '3', '--history-file', history_file], input="Monday\nMonday\nMonday\n")
+    assert result.exit_code == 0
+    result = runner.invoke(cli.report, ['--history-file', history_file])
+    assert result.exit_code == 0
+    assert result.output.startswith("Answers:  3 over 1 sessions")
+    assert "Slowest by month:" in result.output
+    result = runner.invoke(cli.report, ['--history-file', history_file, '--json'])
+    assert json.loads(result.output)['overall']['answers'] == 3
+    result = runner.invoke(cli.report, ['--history-file', str(tmp_path / 'missing.bin')])
+    assert result.exit_code == 1
+
+def test_adaptive(tmp_path):
+    runner = CliRunner()
+    history_file = str(tmp_path / 'history.bin')
+    result = runner.invoke(cli.test, ['-n', '2', '--adaptive', '--no-history', '--history-file', history_file], input="Monday\nMonday\n")
+    assert result.exit_code == 0
+    assert "over 2 tests" in result.output
+
+def test_coprocess():
+    runner = CliRunner()
+    result = runner.invoke(cli.coprocess, input="dayofweek 2022-03-26\n\nleapyear 2024\ndoomsyear 2022 --explain\ndayofweek 2022-13-01\nnope\ndoomsmonth 2022-03-26\n")
+    assert result.exit_code == 0
+    assert result.output == ("Saturday\nTrue\n" + DOOMSYEAR_TEST_OUTPUT_1 + "\n"
+                             "error: Invalid value for '[%Y-%m-%d|%Y-%m-%dT%H:%M:%S|%Y-%m-%d %H:%M:%S]': '2022-13-01' does not match the formats '%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S'.\n"
+                             "error: unknown command 'nope'\n19\n")
+
+def test_batch_engine():
+    runner = separate_runner()
+    for engine in [ 'zeller', 'sakamoto', 'ordinal' ]:
+        result = runner.invoke(cli.batch, ['--engine', engine], input=BATCH_TEST_INPUT)
+        assert result.exit_code == 0
+        assert result.stdout == "Saturday\n\nFriday\nWednesday\n"
+
+def test_verify():
+    runner = CliRunner()
+    result = runner.invoke(cli.check_calculations, ['--from', '2000-01-01', '--to', '2000-12-31', '-w', '1'])
+    assert result.exit_code == 0
+    assert result.output.startswith("Checked 366 dates from 2000-01-01 to 2000-12-31")
+
+def test_profile(tmp_path):
+    runner = separate_runner()
+    result = runner.invoke(cli.cli, ['--profile', 'dayofweek', '2021-01-15'])
+    assert result.exit_code == 0
+    assert result.stdout == "Friday\n"
+    phases = [ line.split()[0] for line in result.stderr.splitlines() ]
+    assert phases == ['phase', 'parse', 'compute', 'output', 'other', 'total']
+    result = runner.invoke(cli.cli, ['batch'], input=BATCH_TEST_INPUT, env={'DOOMSDAY_PROFILE_OUTPUT': str(tmp_path / 'batch.pstats')})
+    assert result.exit_code == 0
+    assert result.stdout == "Saturday\n\nFriday\nWednesday\n"
+    assert 'compute' in result.stderr
+    assert (tmp_path / 'batch.pstats').exists()
+
+def test_calendar(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['calendar', '2024'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0].strip() == '2024'
+    result = runner.invoke(cli.cli, ['calendar', '2024..2025', '--format', 'json', '-o', str(tmp_path / 'calendars.json')])
+    assert result.exit_code == 0
+    assert [ json.loads(line)['year'] for line in (tmp_path / 'calendars.json').read_text().splitlines() ] == [2024, 2025]
+    assert runner.invoke(cli.cli, ['calendar', '2025..2024']).exit_code == 2
+    assert runner.invoke(cli.cli, ['calendar', '1000']).exit_code == 2
+
+def test_sameyear():
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['sameyear', '2024', '--next'])
+    assert result.exit_code == 0
+    assert result.output == "2052\n"
+    result = runner.invoke(cli.cli, ['sameyear', '2024', '1583', '--previous'])
+    assert result.output == "1996\n\n"
+    result = runner.invoke(cli.cli, ['sameyear', '2024'])
+    assert result.output.split()[:3] == ['1596', '1624', '1652']
+
+def test_region():
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ['dayofweek', '1752-09-02', '--region', 'gb'])
+    assert result.exit_code == 0
+    assert result.output == "Wednesday\n"
+    result = runner.invoke(cli.cli, ['dayofweek', '1752-09-02', '--region', 'GB', '--explain'])
+    assert result.output.startswith("Great Britain used the Julian calendar until September 2nd, 1752, so September 2nd, 1752 was a Julian date.\n")
+    assert "Calculate the anchor day for the 18th century of the Julian calendar." in result.output
+    assert result.output.endswith("= 3, i.e. Wednesday\n")
+    result = runner.invoke(cli.cli, ['dayofweek', '1752-09-02', '--region', 'GB', '--explain', '--format', 'json'])
+    assert json.loads(result.output)['calendar'] == 'julian'
+    assert runner.invoke(cli.cli, ['dayofweek', '1752-09-10', '--region', 'GB']).exit_code == 2
+    # February 29th, 1700 was only a date where the Julian calendar was in use.
+    assert runner.invoke(cli.cli, ['dayofweek', '1700-02-29', '--region', 'GB']).output == "Thursday\n"
+    result = runner.invoke(cli.cli, ['dayofweek', '1700-02-29', '--region', 'RU', '--explain', '--format', 'json'])
+    assert json.loads(result.output)['date'] == '1700-02-29'
+    assert runner.invoke(cli.cli, ['dayofweek', '1700-02-29']).exit_code == 2
+    assert runner.invoke(cli.cli, ['dayofweek', '1700-02-29', '--region', 'IT']).exit_code == 2
+    result = runner.invoke(cli.cli, ['explain', '--region', 'GB', '--format', 'markdown'], input="1700-02-29\n")
+    assert result.output.startswith("## February 29th, 1700 (Julian): Thursday\n")
+    result = runner.invoke(cli.cli, ['batch', '--region', 'GB'], input="1752-09-02\n1752-09-14\n1918-01-31 RU\n")
+    assert result.exit_code == 0
+    assert result.stdout == "Wednesday\nThursday\nWednesday\n"
@@ -0,0 +1,51 @@
+import datetime
+import pytest
+from click.testing import CliRunner
+from doomsday import cli, columnar, methods
+
+np = pytest.importorskip('numpy')
+
+DATES = [datetime.date(1582, 10, 15), datetime.date(1958, 11, 26), datetime.date(2020, 2, 29), datetime.date(2021, 1, 15), datetime.date(2600, 12, 31)]
+EXPECTED = [methods.day_of_week(d.year, d.month, d.day, name=False) for d in DATES]
+
+def test_weekdays_from_ordinals(tmp_path):
+    np.array([d.toordinal() for d in DATES], dtype='<i4').tofile(tmp_path / 'ordinals.bin')
+    assert columnar.weekdays_from_ordinals(tmp_path / 'ordinals.bin', tmp_path / 'out.bin', window=2) == (len(DATES), 0)
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.uint8).tolist() == EXPECTED
+    (tmp_path / 'empty.bin').write_bytes(b'')
+    assert columnar.weekdays_from_ordinals(tmp_path / 'empty.bin', tmp_path / 'out.bin') == (0, 0)
+    assert (tmp_path / 'out.bin').read_bytes() == b''
+
+def test_weekdays_from_columns(tmp_path):
+    np.array([d.year for d in DATES], dtype='<i2').tofile(tmp_path / 'years.bin')
+    np.array([d.month for d in DATES], dtype='i1').tofile(tmp_path / 'months.bin')
+    np.array([d.day for d in DATES], dtype='i1').tofile(tmp_path / 'days.bin')
+    runner = CliRunner()
+    result = runner.invoke(cli.columns, [str(tmp_path / 'out.bin'), '--window', '3', '--ymd', str(tmp_path / 'years.bin'), str(tmp_path / 'months.bin'), str(tmp_path / 'days.bin')])
+    assert result.exit_code == 0
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.uint8).tolist() == EXPECTED
+    columnar.weekdays_from_columns(tmp_path / 'years.bin', tmp_path / 'months.bin', tmp_path / 'days.bin', tmp_path / 'out.bin', engine='sakamoto')
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.uint8).tolist() == EXPECTED
+    (tmp_path / 'short.bin').write_bytes(b'\x01\x02')
+    with pytest.raises(ValueError):
+        columnar.weekdays_from_columns(tmp_path / 'years.bin', tmp_path / 'months.bin', tmp_path / 'short.bin', tmp_path / 'out2.bin')
+
+def test_invalid_rows(tmp_path):
+    np.array([0, DATES[1].toordinal(), -7], dtype='<i4').tofile(tmp_path / 'ordinals.bin')
+    assert columnar.weekdays_from_ordinals(tmp_path / 'ordinals.bin', tmp_path / 'out.bin') == (3, 2)
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.uint8).tolist() == [columnar.INVALID, EXPECTED[1], columnar.INVALID]
+    rows = [(2021, 1, 15), (2021, 13, 1), (2021, 0, 1), (2021, -1, 1), (2021, 2, 29), (2020, 2, 29), (2021, 4, 31), (2021, 4, 0)]
+    for values, name, dtype in zip(zip(*rows), ['years', 'months', 'days'], ['<i2', 'i1', 'i1']):
+        np.array(values, dtype=dtype).tofile(tmp_path / f'{name}.bin')
+    runner = CliRunner()
+    result = runner.invoke(cli.columns, [str(tmp_path / 'out.bin'), '--window', '3', '--ymd', str(tmp_path / 'years.bin'), str(tmp_path / 'months.bin'), str(tmp_path / 'days.bin')])
+    assert result.exit_code == 0
+    assert "8 rows written" in result.output and "6 of them invalid" in result.output
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.uint8).tolist() == [5, 255, 255, 255, 255, 6, 255, 255]
+    result = runner.invoke(cli.columns, [str(tmp_path / 'out.bin'), '--ymd', str(tmp_path / 'years.bin'), str(tmp_path / 'months.bin'), str(tmp_path / 'ordinals.bin')])
+    assert result.exit_code == 1
+    assert result.output == "Error: The year, month and day columns have different lengths.\n"
+    (tmp_path / 'odd.bin').write_bytes(b'\x01\x02\x03')
+    result = runner.invoke(cli.columns, [str(tmp_path / 'out.bin'), '--ymd', str(tmp_path / 'odd.bin'), str(tmp_path / 'months.bin'), str(tmp_path / 'days.bin')])
+    assert result.exit_code == 1
+    assert result.output.startswith("Error: The size of")
@@ -0,0 +1,50 @@
+import datetime
+import pytest
+from doomsday import engines, methods
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('DOOMSDAY_CACHE_DIR', str(tmp_path))
+
+def test_engines():
+    for engine in engines.ENGINES.values():
+        assert engine.day_of_week(1582, 10, 15) == 5
+        assert engine.day_of_week(2000, 2, 29) == 2
+        assert engine.day_of_week(2022, 3, 26) == 6
+        assert engine.day_of_week(2600, 12, 31) == methods.day_of_week(2600, 12, 31, name=False)
+
+def test_engine_arrays():
+    np = pytest.importorskip('numpy')
+    years, months, days = np.array([ 1582, 2000, 2022 ]), np.array([ 10, 2, 3 ]), np.array([ 15, 29, 26 ])
+    for engine in engines.ENGINES.values():
+        assert engine.day_of_week_array(years, months, days).tolist() == [ 5, 2, 6 ]
+    with pytest.raises(ValueError):
+        engines.ENGINES['table'].day_of_week_array(np.array([ 1582 ]), np.array([ 10 ]), np.array([ 14 ]))
+
+def test_cross_validate():
+    first, last = methods.OCTOBER_15TH_1582, datetime.date(1700, 12, 31).toordinal()
+    assert engines.cross_validate(first, last) == []
+    engines.register('broken', "Off by one on Sundays.", lambda y, m, d: methods.day_of_week(y, m, d, name=False) or 1,
+                     lambda y, m, d: methods.day_of_week_array(y, m, d))
+    try:
+        disagreements = engines.cross_validate(first, last, [ 'doomsday', 'broken' ])
+    finally:
+        del engines.ENGINES['broken']
+    assert disagreements == [ engines.Disagreement('broken', 'scalar', datetime.date(1582, 10, 17), 0, 1) ]
+
+def test_auto_select(tmp_path):
+    results = engines.benchmark(size=100, runs=1)
+    assert set(results['scalar']) == set(engines.ENGINES)
+    path = str(tmp_path / 'benchmark.json')
+    cached = engines.cached_benchmark(path)
+    assert engines.cached_benchmark(path) == cached
+    assert engines.select('scalar', path) in engines.ENGINES
+    assert engines.select('batch', path) in engines.ENGINES
+    # The table engine doesn't cover every date, so auto never picks it.
+    timings = { name: 1.0 for name in engines.ENGINES }
+    timings['table'] = 0.5
+    timings['zeller'] = 0.75
+    assert engines.fastest(timings) == 'zeller'
+    assert engines.get('zeller').name == 'zeller'
+    with pytest.raises(ValueError):
+        engines.get('nope')
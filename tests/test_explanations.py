@@ -0,0 +1,26 @@
+import json
+from doomsday import explanations
+
+def test_explain_day_of_week():
+    explanation = explanations.explain_day_of_week(2000, 1, 1)
+    assert explanation.century is explanations.explain_day_of_week(2099, 12, 31).century
+    assert explanation.year is explanations.explain_day_of_week(1900, 6, 15).year
+    assert explanation.month is explanations.explain_day_of_week(2400, 1, 20).month
+    assert (explanation.doomsmonth, explanation.total, explanation.day_of_week) == (-10, -8, 6)
+    assert explanations.day_of_week_sum_text(explanation).endswith("""            = -8 mod 7
+            = 7's complement of (8 mod 7)
+            = 7's complement of 1
+            = 6, i.e. Saturday
+""")
+
+def test_renderers():
+    explanation = explanations.explain_day_of_week(1958, 11, 26)
+    d = json.loads(explanations.day_of_week_json(explanation))
+    assert d['date'] == '1958-11-26'
+    assert d['day_of_week_name'] == 'Wednesday'
+    assert d['century']['doomscentury'] == 3
+    assert d['year']['expression'] == '(58/2)+11'
+    assert d['month'] == {'month': 11, 'leap': False, 'doomsday': 7}
+    markdown = explanations.day_of_week_markdown(explanation)
+    assert markdown.startswith('## November 26th, 1958: Wednesday\n\n1. Calculate the doomsyear for the 58th year of the 20th century.\n')
+    assert list(explanations.explain_many([(1958, 11, 26)])) == [explanations.day_of_week_text(explanation)]
@@ -0,0 +1,43 @@
+import datetime
+from click.testing import CliRunner
+from doomsday import cli, history
+
+def test_append_and_read(tmp_path):
+    path = str(tmp_path / 'history' / 'history.bin')
+    assert history.read(path) == []
+    first = history.answer(datetime.date(2024, 2, 29), 4.5, True, 1000, 1001.0)
+    second = history.answer(datetime.date(1958, 11, 26), 12.0, False, 2000, 2001.0)
+    history.append(path, [ first ])
+    history.append(path, [ second ])
+    assert history.read(path) == [ first, second ]
+    assert first.century == 20 and first.year_of_century == 24 and first.month == 2 and first.leap
+    # A partly written record at the end is ignored.
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 5)
+    assert history.read(path) == [ first, second ]
+    # ... and cut off before appending, so later records stay aligned.
+    third = history.answer(datetime.date(2021, 1, 15), 3.0, True, 3000, 3001.0)
+    history.append(path, [ third ])
+    assert history.read(path) == [ first, second, third ]
+    result = CliRunner().invoke(cli.report, ['--history-file', path])
+    assert result.exit_code == 0
+    assert result.output.startswith("Answers:  3 over 3 sessions")
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert history.percentile(values, 50) == 50
+    assert history.percentile(values, 90) == 90
+    assert history.percentile(values, 99) == 99
+    assert history.percentile([ 7 ], 99) == 7
+    assert history.percentile([], 50) is None
+
+def test_report():
+    answers = [ history.answer(datetime.date(2024, 1, 1), 2.0, True, 1, 1.0),
+                history.answer(datetime.date(1900, 6, 1), 10.0, False, 1, 2.0),
+                history.answer(datetime.date(2024, 6, 2), 4.0, True, 2, 3.0) ]
+    summary = history.report(answers)
+    assert summary['overall']['answers'] == 3
+    assert summary['sessions'] == 2
+    assert summary['by_component']['century'][0]['value'] == 19
+    assert summary['by_component']['month'][0] == dict(summary['by_component']['month'][0], value=6, answers=2, accuracy=0.5, mean=7.0)
+    assert [ session['answers'] for session in summary['trend'] ] == [ 2, 1 ]
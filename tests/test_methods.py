@@ -1,3 +1,5 @@
+import datetime, subprocess, sys
+import pytest
 from click.testing import CliRunner
 from doomsday import methods
 
@@ -133,3 +135,61 @@ def test_day_of_week():
     assert methods.day_of_week(1800, 7, 8) == 'Tuesday'
     assert methods.day_of_week(2424, 11, 22) == 'Friday'
     assert methods.day_of_week(1728, 9, 20) == 'Monday'
+
+def test_day_of_week_array():
+    np = pytest.importorskip('numpy')
+    ordinals = np.arange(datetime.date(1582, 10, 15).toordinal(), datetime.date(2600, 12, 31).toordinal() + 1, 37)
+    dates = [datetime.date.fromordinal(int(o)) for o in ordinals]
+    years = np.array([d.year for d in dates])
+    months = np.array([d.month for d in dates])
+    days = np.array([d.day for d in dates])
+    expected = np.array([methods.day_of_week(d.year, d.month, d.day, name=False) for d in dates], dtype=np.uint8)
+    result = methods.day_of_week_array(years, months, days)
+    assert result.dtype == np.uint8
+    assert (result == expected).all()
+    assert (methods.day_of_week_array(np.array(dates, dtype='datetime64[D]')) == expected).all()
+    assert (methods.doomscentury_array(years) == [methods.doomscentury(y) for y in years]).all()
+    assert (methods.doomsyear_array(years) == [methods.doomsyear(y) for y in years]).all()
+    assert (methods.doomsmonth_array(years, months, days) == [methods.doomsmonth(d.year, d.month, d.day) for d in dates]).all()
+
+def test_split_datetime64_fresh_interpreter():
+    pytest.importorskip('numpy')
+    # NumPy is imported on first use, so this has to run before any other
+    # array function has imported it, i.e. in an interpreter of its own.
+    code = "import numpy; from doomsday import methods; print([a.tolist() for a in methods._split_datetime64(numpy.array(['2021-01-15'], dtype='datetime64[D]'))])"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "[[2021], [1], [15]]\n"
+
+def test_day_of_week_any_year():
+    # Years 1 to 9999 can be checked against datetime directly ...
+    for year in list(range(1, 1100)) + list(range(9000, 10000)):
+        for month, day in [(1, 1), (2, 28), (3, 1), (12, 31)]:
+            expected = (datetime.date(year, month, day).weekday() + 1) % 7
+            assert methods.day_of_week(year, month, day, name=False) == expected
+    # ... and the Gregorian calendar repeats every 400 years otherwise.
+    for year in [-2401, -400, -101, -1, 0, 10000, 12345, 99999, 123456]:
+        base = year % 400 + 2000
+        for month, day in [(1, 1), (2, 29 if methods.leapyear(base) else 28), (7, 4), (12, 31)]:
+            assert methods.day_of_week(year, month, day) == methods.day_of_week(base, month, day)
+    assert methods.doomscentury(258) == methods.doomscentury(2258)
+    assert methods.doomsyear(258) == methods.doomsyear(1958)
+
+def test_anchor_cache():
+    dates = [(1901, 1, 1), (1901, 2, 28), (2020, 2, 29), (1901, 12, 31), (2020, 3, 1), (2000, 1, 1)]
+    expected = [methods.day_of_week(*date) for date in dates]
+    cache = methods.enable_anchor_cache(maxsize=2)
+    try:
+        assert [methods.day_of_week(*date) for date in dates] == expected
+        assert cache.info() == {'hits': 3, 'misses': 3, 'evictions': 1, 'size': 2, 'maxsize': 2}
+    finally:
+        methods.disable_anchor_cache()
+    assert methods.anchor_cache is None
+
+def test_anchor_cache_array():
+    np = pytest.importorskip('numpy')
+    years, months, days = np.array([[1901, 1, 1], [2020, 2, 29], [1901, 12, 31], [2020, 3, 1], [2000, 1, 1]]).T
+    cache = methods.YearAnchorCache(maxsize=8)
+    assert cache.day_of_week_array(years, months, days).tolist() == methods.day_of_week_array(years, months, days).tolist()
+    assert cache.info() == {'hits': 0, 'misses': 3, 'evictions': 0, 'size': 3, 'maxsize': 8}
+    assert cache.day_of_week_array(years[:0], months[:0], days[:0]).tolist() == []
@@ -0,0 +1,18 @@
+import pytest
+from doomsday import parsing
+
+LINES = [ b'2022-03-26', b' 2021-01-15T10:00:00\r', b'1958-11-26 01:02:03', b'2000-02-29', b'1900-02-29', b'2022-3-26', b'2022-13-01',
+          b'2022-00-10', b'0000-01-01', b'2021-01-15T24:00:00', b'2021-01-15 10:60:00', b'2021-01-15X10:00:00', b'not a date', b'' ]
+EXPECTED = [ (2022, 3, 26), (2021, 1, 15), (1958, 11, 26), (2000, 2, 29), None, None, None, None, None, None, None, None, None, None ]
+
+def test_parse_date():
+    assert [ parsing.parse_date(line) for line in LINES ] == EXPECTED
+    assert parsing.parse_date(memoryview(b'xx2022-03-26')[2:]) == (2022, 3, 26)
+
+def test_parse_dates():
+    pytest.importorskip('numpy')
+    years, months, days, valid = parsing.parse_dates(b'\n'.join(LINES) + b'\n')
+    assert [ (y, m, d) if ok else None for y, m, d, ok in zip(years.tolist(), months.tolist(), days.tolist(), valid.tolist()) ] == EXPECTED
+    years, months, days, valid = parsing.parse_dates(b'2022-03-26\n\n1958-11-26')
+    assert valid.tolist() == [ True, False, True ]
+    assert len(parsing.parse_dates(b'')[3]) == 0
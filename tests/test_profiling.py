@@ -0,0 +1,29 @@
+import io, pstats
+from doomsday import profiling
+
+def test_phases():
+    assert profiling.phase('compute') is profiling.NO_PHASE
+    stream = io.StringIO()
+    with profiling.Profiler(stream=stream) as profiler:
+        assert profiling.active is profiler
+        for i in range(3):
+            with profiling.phase('compute'):
+                with profiling.phase('output'):
+                    pass
+    assert profiling.active is None
+    assert [ (name, calls) for name, (wall, cpu, calls) in profiler.phases.items() ] == [('output', 3), ('compute', 3), ('other', 1)]
+    # Nested phases aren't counted twice.
+    total = sum(wall for wall, cpu, calls in profiler.phases.values())
+    lines = stream.getvalue().splitlines()
+    assert lines[0].split() == ['phase', 'wall', 'ms', 'cpu', 'ms', 'calls']
+    assert [ line.split()[0] for line in lines[1:] ] == ['output', 'compute', 'other', 'total']
+    assert abs(float(lines[-1].split()[1]) - total * 1000) < 0.01
+
+def test_cprofile_output(tmp_path):
+    output = tmp_path / 'doomsday.pstats'
+    with profiling.Profiler(str(output)):
+        with profiling.phase('compute'):
+            sorted(range(1000), key=str)
+    assert output.exists()
+    stats = pstats.Stats(str(output))
+    assert stats.total_calls > 0
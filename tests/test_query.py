@@ -0,0 +1,18 @@
+import datetime
+import pytest
+from doomsday import methods, query
+
+# Checks every candidate date, the slow way.
+def brute_force(weekday, day, months, start_year, end_year):
+    return [ datetime.date(year, month, day) for year in range(start_year, end_year + 1) for month in months
+             if day <= query.MONTH_LENGTHS[month] + (month == 2 and methods.leapyear(year))
+             and methods.day_of_week(year, month, day, name=False) == weekday ]
+
+def test_find_dates():
+    assert list(query.find_dates(5, 13, start_year=2024, end_year=2025)) == [datetime.date(2024, 9, 13), datetime.date(2024, 12, 13), datetime.date(2025, 6, 13)]
+    for weekday, day, months, start_year, end_year in [(5, 13, range(1, 13), 1582, 2600), (0, 25, [12], 1, 1000), (4, 29, [2], 1599, 2401), (2, 31, [1, 4, 12], 1900, 2100)]:
+        assert list(query.find_dates(weekday, day, months, start_year, end_year)) == brute_force(weekday, day, months, start_year, end_year)
+    with pytest.raises(ValueError):
+        list(query.find_dates(7, 13))
+    with pytest.raises(ValueError):
+        list(query.find_dates(5, 13, months=[13]))
@@ -0,0 +1,17 @@
+import datetime
+import pytest
+from doomsday import methods, ranges
+
+def test_day_of_week_range():
+    start, end = datetime.date(1582, 10, 15), datetime.date(1600, 3, 31)
+    expected = [ (start + datetime.timedelta(days), methods.day_of_week(*(start + datetime.timedelta(days)).timetuple()[:3], name=False))
+                 for days in range((end - start).days + 1) ]
+    assert list(ranges.day_of_week_range(start, end)) == expected
+    assert list(ranges.day_of_week_range(start, end, step=3)) == expected[::3]
+    assert list(ranges.day_of_week_range(start, end, step=7)) == expected[::7]
+    fridays_and_mondays = [ (date, dow) for date, dow in expected[::2] if dow in (1, 5) ]
+    assert list(ranges.day_of_week_range(start, end, step=2, weekdays={1, 5})) == fridays_and_mondays
+    assert list(ranges.day_of_week_range(start, end, step=7, weekdays={1})) == []
+    assert list(ranges.day_of_week_range(end, start)) == []
+    with pytest.raises(ValueError):
+        list(ranges.day_of_week_range(start, end, step=0))
@@ -0,0 +1,44 @@
+import pytest
+from doomsday import methods, regions
+
+# The Julian day number of a date in the Julian calendar, by the usual
+# astronomical formula, which counts days independently of the Doomsday rule.
+def julian_day_number(year, month, day):
+    a = (14 - month) // 12
+    y, m = year + 4800 - a, month + 12 * a - 3
+    return day + (153 * m + 2) // 5 + 365 * y + y // 4 - 32083
+
+def test_julian_day_of_week():
+    for year in range(1, 3000):
+        for month, day in [(1, 1), (2, 28), (3, 1), (12, 31)] + ([(2, 29)] if year % 4 == 0 else []):
+            assert methods.julian_day_of_week(year, month, day, name=False) == (julian_day_number(year, month, day) + 1) % 7
+    assert methods.julian_day_of_week(1582, 10, 4) == 'Thursday'
+    assert methods.julian_day_of_week(1752, 9, 2) == 'Wednesday'
+
+def test_calendar():
+    assert regions.calendar('GB', 1752, 9, 2) == regions.JULIAN
+    assert regions.calendar('GB', 1752, 9, 14) == regions.GREGORIAN
+    assert regions.calendar('IT', 1752, 9, 2) == regions.GREGORIAN
+    assert regions.calendar('RU', 1900, 2, 29) == regions.JULIAN
+    assert regions.calendar('ru', 1900, 2, 28) == regions.calendar('Julian', 1900, 2, 28) == regions.JULIAN
+    assert regions.day_of_week('GB', 1752, 9, 14) == 'Thursday'
+    assert regions.day_of_week('RU', 1918, 1, 31, name=False) == 3
+    for date in [('GB', 1752, 9, 3), ('GB', 1752, 9, 13), ('GB', 1800, 2, 29), ('RU', 1900, 2, 30), ('XX', 2000, 1, 1)]:
+        with pytest.raises(ValueError):
+            regions.calendar(*date)
+
+def test_day_of_week_array():
+    np = pytest.importorskip('numpy')
+    dates = [ (code, year, month, day) for code in list(regions.REGIONS) + ['XX']
+              for year in (1582, 1700, 1752, 1918) for month in (0, 2, 3, 9, 10) for day in (1, 2, 4, 5, 14, 28, 29, 30) ]
+    codes, years, months, days = zip(*dates)
+    dows, calendars, valid = regions.day_of_week_array(np.asarray(codes, dtype=object), years, months, days)
+    for date, dow, calendar, ok in zip(dates, dows.tolist(), calendars.tolist(), valid.tolist()):
+        try:
+            expected = (regions.day_of_week(*date, name=False), regions.calendar(*date))
+        except ValueError:
+            assert not ok and calendar == -1
+        else:
+            assert ok and (dow, regions.CALENDARS[calendar]) == expected
+    dows, calendars, valid = regions.day_of_week_array('gb', [1752, 1752], [9, 9], [2, 14])
+    assert dows.tolist() == [3, 4] and valid.all()
@@ -0,0 +1,28 @@
+import datetime
+import pytest
+from doomsday import methods, results
+
+def test_breakdown():
+    for date in [datetime.date(1582, 10, 15), datetime.date(1900, 2, 28), datetime.date(2000, 1, 1), datetime.date(2020, 2, 29), datetime.date(2600, 12, 31)]:
+        breakdown = results.breakdown(date.year, date.month, date.day)
+        assert breakdown == (methods.doomscentury(date.year), methods.doomsyear(date.year), methods.doomsmonth(date.year, date.month, date.day),
+                             methods.day_of_week(date.year, date.month, date.day, name=False))
+        assert breakdown.weekday is results.weekday(date.year, date.month, date.day)
+        assert str(breakdown.weekday) == methods.day_of_week(date.year, date.month, date.day)
+    assert results.Weekday.SUNDAY == 0 and str(results.Weekday.SATURDAY) == 'Saturday'
+    assert f'{results.Weekday.SATURDAY}' == 'Saturday' and f'{results.Weekday.MONDAY:>8}' == '  Monday'
+
+def test_breakdown_array():
+    np = pytest.importorskip('numpy')
+    dates = np.arange('1582-10-15', '2601-01-01', dtype='datetime64[D]')
+    starts = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = starts.astype(np.int64) % 12 + 1
+    days = (dates - starts).astype(np.int64) + 1
+    out = results.empty_breakdown_array(len(dates))
+    assert results.breakdown_array(years, months, days, out=out) is out
+    assert (out.doomscentury == methods.doomscentury_array(years)).all()
+    assert (out.doomsyear == methods.doomsyear_array(years)).all()
+    assert (out.doomsmonth == methods.doomsmonth_array(years, months, days)).all()
+    assert (out.weekday == methods.day_of_week_array(dates)).all()
+    assert [ terms.tolist() for terms in results.breakdown_array([2021], [1], [15]) ] == [[2], [5], [5], [5]]
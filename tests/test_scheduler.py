@@ -0,0 +1,30 @@
+import collections, datetime, random
+from doomsday import history, scheduler
+from doomsday.methods import OCTOBER_15TH_1582, DECEMBER_31ST_2600
+
+def test_weight_tree():
+    tree = scheduler.WeightTree([ 1.0, 0.0, 2.0, 3.0, 4.0 ])
+    assert tree.total() == 10.0
+    assert [ tree.find(u) for u in [ 0.0, 0.99, 1.0, 2.99, 3.0, 5.99, 6.0, 9.99 ] ] == [ 0, 0, 2, 2, 3, 3, 4, 4 ]
+    tree[1] = 5.0
+    tree[4] = 0.0
+    assert tree.total() == 11.0
+    assert [ tree.find(u) for u in [ 0.5, 1.0, 5.99, 6.0, 8.0, 10.99 ] ] == [ 0, 1, 1, 2, 3, 3 ]
+
+def test_scheduler():
+    rng = random.Random(1958)
+    plan = scheduler.Scheduler(rng=rng)
+    for i in range(1000):
+        date = plan.next_date()
+        assert OCTOBER_15TH_1582 <= date.toordinal() <= DECEMBER_31ST_2600
+        # Answers about February are slow, and about every other month quick.
+        plan.record(history.answer(date, 20.0 if date.month == 2 else 2.0, True, 0, 0.0))
+    months = collections.Counter(plan.next_date().month for i in range(1000))
+    assert months.most_common(1)[0][0] == 2
+    assert months[2] > 500
+
+def test_scheduler_from_history():
+    answers = [ history.answer(datetime.date(1900 + year, 1, 1), 2.0, True, 0, 0.0) for year in range(100) for i in range(5) ]
+    plan = scheduler.Scheduler(answers, rng=random.Random(0))
+    centuries = collections.Counter(plan.next_date().year // 100 for i in range(1000))
+    assert centuries[19] < 100
@@ -0,0 +1,57 @@
+import asyncio, http.client, json, socket, threading
+import pytest
+from doomsday import server
+
+@pytest.fixture
+def port():
+    started = threading.Event()
+    listening = {}
+    def ready(s):
+        listening['server'], listening['loop'] = s, asyncio.get_running_loop()
+        started.set()
+    def run():
+        try:
+            asyncio.run(server.serve('127.0.0.1', 0, ready))
+        except asyncio.CancelledError:
+            pass
+    thread = threading.Thread(target=run)
+    thread.start()
+    started.wait(5)
+    yield listening['server'].sockets[0].getsockname()[1]
+    listening['loop'].call_soon_threadsafe(listening['server'].close)
+    thread.join(5)
+
+def request(connection, method, path, body=None):
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_server(port):
+    # All of these requests are made over the one connection.
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    assert request(connection, 'GET', '/dayofweek/2022-03-26') == (200, { 'date': '2022-03-26', 'day_of_week': 'Saturday' })
+    assert request(connection, 'GET', '/dayofweek/1958-11-26?numbers=1') == (200, { 'date': '1958-11-26', 'day_of_week': 3 })
+    assert request(connection, 'POST', '/batch', json.dumps([ '2022-03-26', 'not a date', '1958-11-26' ])) == (200, [ 'Saturday', None, 'Wednesday' ])
+    assert request(connection, 'POST', '/batch?numbers=1', '[ "2022-03-26" ]') == (200, [ 6 ])
+    assert request(connection, 'POST', '/batch', json.dumps([ '2022-03-26', '2022-\n03-26', '1958-11-26' ])) == (200, [ 'Saturday', None, 'Wednesday' ])
+    assert request(connection, 'GET', '/dayofweek/not-a-date')[0] == 400
+    assert request(connection, 'POST', '/batch', '{')[0] == 400
+    assert request(connection, 'GET', '/batch')[0] == 405
+    assert request(connection, 'GET', '/nowhere')[0] == 404
+    status, stats = request(connection, 'GET', '/stats')
+    assert status == 200
+    assert stats['requests'] == 9
+    assert stats['endpoints'] == { 'dayofweek': 3, 'batch': 5, 'other': 1 }
+    assert stats['latency_ms']['p50'] is not None
+    connection.close()
+
+# Sends a raw request, returning the status line of the response.
+def raw_request(port, data):
+    with socket.create_connection(('127.0.0.1', port)) as connection:
+        connection.sendall(data)
+        return connection.makefile('rb').readline()
+
+def test_malformed_head(port):
+    assert raw_request(port, b'POST /batch HTTP/1.1\r\nContent-Length: abc\r\n\r\n[]').startswith(b'HTTP/1.1 400 ')
+    assert raw_request(port, b'POST /batch HTTP/1.1\r\nContent-Length: -1\r\n\r\n').startswith(b'HTTP/1.1 400 ')
+    assert raw_request(port, b'GET /stats HTTP/1.1\r\nX-Long: ' + b'x' * (1 << 17) + b'\r\n\r\n').startswith(b'HTTP/1.1 400 ')
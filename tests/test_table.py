@@ -0,0 +1,32 @@
+import datetime, os
+import pytest
+from doomsday import methods, table
+
+def test_build_table():
+    data = table.build_table()
+    assert len(data) == methods.DECEMBER_31ST_2600 - methods.OCTOBER_15TH_1582 + 1
+    weekdays = table.WeekdayTable(data)
+    assert weekdays.day_of_week(1582, 10, 15) == 'Friday'
+    assert weekdays.day_of_week(2022, 3, 26) == 'Saturday'
+    assert weekdays.day_of_week(2600, 12, 31, name=False) == methods.day_of_week(2600, 12, 31, name=False)
+    with pytest.raises(ValueError):
+        weekdays.day_of_week(1582, 10, 14)
+    with pytest.raises(ValueError):
+        weekdays.day_of_week(2601, 1, 1)
+
+def test_verify_table():
+    data = bytearray(table.build_table())
+    data[1000] = (data[1000] + 1) % 7
+    with pytest.raises(ValueError, match=str(datetime.date.fromordinal(methods.OCTOBER_15TH_1582 + 1000))):
+        table.verify_table(data, methods.OCTOBER_15TH_1582)
+
+def test_load_table(tmp_path):
+    path = str(tmp_path / 'weekdays.bin')
+    with table.load_table(path) as weekdays:
+        assert os.path.getsize(path) == len(weekdays)
+        assert weekdays.day_of_week(1958, 11, 26) == 'Wednesday'
+    # The second time around, the cached file is mapped instead of being rebuilt.
+    modified = os.path.getmtime(path)
+    with table.load_table(path) as weekdays:
+        assert weekdays.day_of_week(2021, 1, 15) == 'Friday'
+    assert os.path.getmtime(path) == modified
@@ -0,0 +1,20 @@
+import datetime
+from doomsday import methods, verify
+
+def test_verify_range():
+    first, last = methods.OCTOBER_15TH_1582, datetime.date(1700, 12, 31).toordinal()
+    assert verify.verify_range(first, last) == (last - first + 1, [])
+    assert verify.verify_range(datetime.date(1, 1, 1).toordinal(), datetime.date(1, 12, 31).toordinal()) == (365, [])
+
+def test_verify_mismatches(monkeypatch):
+    doomsyear = methods.doomsyear
+    monkeypatch.setattr(methods, 'doomsyear', lambda year: (doomsyear(year) + (year == 1999)) % 7)
+    first, last = datetime.date(1998, 12, 25).toordinal(), datetime.date(2000, 1, 5).toordinal()
+    checked, mismatches = verify.verify(first, last, workers=1, chunk_days=100, limit=3)
+    assert checked == last - first + 1
+    assert mismatches == [ verify.Mismatch('doomsyear', datetime.date(1999, 1, 1), 4, 5),
+                           verify.Mismatch('day_of_week', datetime.date(1999, 1, 1), 5, 6),
+                           verify.Mismatch('day_of_week', datetime.date(1999, 1, 2), 6, 0) ]
+
+def test_chunks():
+    assert verify.chunks(1, 10, 4) == [ (1, 4), (5, 8), (9, 10) ]